@@ -81,16 +81,24 @@ class CLI:
         *,
         outdir: str = "",
         quality: str = "original",
+        use_chunks: bool = False,
+        workers: Optional[int] = None,
     ) -> None:
         """
         Download the requested frame numbers for a task and save images as
         task_<ID>_frame_<FRAME>.jpg.
         """
+        if workers is None:
+            # separate frame requests are expensive for the server
+            workers = 4 if use_chunks else 1
+
         self.client.tasks.retrieve(obj_id=task_id).download_frames(
             frame_ids=frame_ids,
             outdir=outdir,
             quality=quality,
             filename_pattern=f"task_{task_id}" + "_frame_{frame_id:06d}{frame_ext}",
+            use_chunks=use_chunks,
+            max_workers=workers,
         )
 
     def tasks_dump(
@@ -314,6 +314,20 @@ def make_cmdline_parser() -> argparse.ArgumentParser:
         default="original",
         help="choose quality of images (default: %(default)s)",
     )
+    frames_parser.add_argument(
+        "--use-chunks",
+        dest="use_chunks",
+        default=False,
+        action="store_true",
+        help="download the frames in data chunks, which is faster for many frames."
+        " The images are saved in the original format",
+    )
+    frames_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="the number of parallel downloads (default: 4 with --use-chunks, 1 otherwise)",
+    )
 
     #######################################################################
     # Dump
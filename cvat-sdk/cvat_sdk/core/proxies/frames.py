@@ -0,0 +1,181 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import io
+import mimetypes
+import os
+import shutil
+import tempfile
+import zipfile
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    from _typeshed import StrPath, SupportsWrite
+
+_DEFAULT_DOWNLOAD_WORKERS = 4
+
+
+def _normalize_image_extension(extension: str) -> str:
+    extension = "." + extension.strip(".").lower()
+
+    # replace '.jpe' or '.jpeg' with a more used '.jpg'
+    if extension in (".jpe", ".jpeg"):
+        extension = ".jpg"
+
+    return extension
+
+
+class DownloadFramesMixin(ABC):
+    @abstractmethod
+    def get_frame(
+        self,
+        frame_id: int,
+        *,
+        quality: Optional[str] = None,
+    ) -> io.RawIOBase: ...
+
+    @abstractmethod
+    def _get_frame_chunk_position(self, frame_id: int, quality: str) -> Optional[Tuple[int, int]]:
+        """
+        Returns the chunk index and the index of the frame file in the chunk,
+        if the frame can be extracted from an image chunk.
+        """
+
+    @abstractmethod
+    def _download_frame_chunk(
+        self, chunk_index: int, output_file: SupportsWrite[bytes], *, quality: str
+    ) -> None: ...
+
+    def download_frames(
+        self,
+        frame_ids: Sequence[int],
+        *,
+        image_extension: Optional[str] = None,
+        outdir: StrPath = ".",
+        quality: str = "original",
+        filename_pattern: str = "frame_{frame_id:06d}{frame_ext}",
+        use_chunks: bool = False,
+        max_workers: int = _DEFAULT_DOWNLOAD_WORKERS,
+    ) -> Optional[List[Image.Image]]:
+        """
+        Download the requested frame numbers and save images as outdir/filename_pattern
+
+        If use_chunks is True, the frames are extracted from the data chunks, where possible.
+        This is much faster when many frames are requested. The frame files are saved
+        without reencoding, unless image_extension requires a different format.
+
+        The frames or chunks are downloaded in parallel in up to max_workers threads.
+        """
+        # TODO: add arg descriptions in schema
+
+        outdir = Path(outdir)
+        outdir.mkdir(parents=True, exist_ok=True)
+
+        chunk_frames: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        separate_frames: List[int] = []
+        for frame_id in frame_ids:
+            chunk_position = (
+                self._get_frame_chunk_position(frame_id, quality) if use_chunks else None
+            )
+            if chunk_position:
+                chunk_index, member_index = chunk_position
+                chunk_frames[chunk_index].append((member_index, frame_id))
+            else:
+                separate_frames.append(frame_id)
+
+        def _save_frame(frame_id: int) -> None:
+            self._save_frame(
+                frame_id,
+                image_extension=image_extension,
+                outdir=outdir,
+                quality=quality,
+                filename_pattern=filename_pattern,
+            )
+
+        def _save_chunk_frames(chunk_item: Tuple[int, List[Tuple[int, int]]]) -> None:
+            self._save_chunk_frames(
+                *chunk_item,
+                image_extension=image_extension,
+                outdir=outdir,
+                quality=quality,
+                filename_pattern=filename_pattern,
+            )
+
+        with ThreadPoolExecutor(max(1, max_workers)) as pool:
+            for _ in pool.map(_save_chunk_frames, sorted(chunk_frames.items())):
+                # just need to loop through all results so that any exceptions are propagated
+                pass
+
+            for _ in pool.map(_save_frame, separate_frames):
+                pass
+
+    def _save_frame(
+        self,
+        frame_id: int,
+        *,
+        image_extension: Optional[str],
+        outdir: Path,
+        quality: str,
+        filename_pattern: str,
+    ) -> None:
+        frame_bytes = self.get_frame(frame_id, quality=quality)
+
+        im = Image.open(frame_bytes)
+        if image_extension is None:
+            mime_type = im.get_format_mimetype() or "image/jpg"
+
+            # FIXME It is better to use meta information from the server
+            # to determine the extension
+            im_ext = _normalize_image_extension(mimetypes.guess_extension(mime_type) or ".jpg")
+        else:
+            im_ext = f".{image_extension.strip('.')}"
+
+        outfile = filename_pattern.format(frame_id=frame_id, frame_ext=im_ext)
+        im.save(outdir / outfile)
+
+    def _save_chunk_frames(
+        self,
+        chunk_index: int,
+        frames: Sequence[Tuple[int, int]],
+        *,
+        image_extension: Optional[str],
+        outdir: Path,
+        quality: str,
+        filename_pattern: str,
+    ) -> None:
+        with tempfile.TemporaryFile() as chunk_file:
+            self._download_frame_chunk(chunk_index, chunk_file, quality=quality)
+            chunk_file.seek(0)
+
+            with zipfile.ZipFile(chunk_file, "r") as chunk_zip:
+                chunk_members = chunk_zip.infolist()
+
+                for member_index, frame_id in frames:
+                    chunk_member = chunk_members[member_index]
+                    member_ext = _normalize_image_extension(
+                        os.path.splitext(chunk_member.filename)[1]
+                    )
+
+                    if image_extension is None:
+                        im_ext = member_ext
+                    else:
+                        im_ext = f".{image_extension.strip('.')}"
+
+                    outfile = outdir / filename_pattern.format(frame_id=frame_id, frame_ext=im_ext)
+
+                    with chunk_zip.open(chunk_member) as frame_file:
+                        if _normalize_image_extension(im_ext) == member_ext:
+                            # no conversion is needed, keep the original file
+                            with open(outfile, "wb") as output_file:
+                                shutil.copyfileobj(frame_file, output_file)
+                        else:
+                            Image.open(frame_file).save(outfile)
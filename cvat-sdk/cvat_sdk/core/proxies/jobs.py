@@ -5,16 +5,15 @@
 from __future__ import annotations
 
 import io
-import mimetypes
+import shutil
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional, Sequence
-
-from PIL import Image
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
 
 from cvat_sdk.api_client import apis, models
 from cvat_sdk.core.helpers import get_paginated_collection
 from cvat_sdk.core.progress import ProgressReporter
 from cvat_sdk.core.proxies.annotations import AnnotationCrudMixin
+from cvat_sdk.core.proxies.frames import DownloadFramesMixin
 from cvat_sdk.core.proxies.issues import Issue
 from cvat_sdk.core.proxies.model_proxy import (
     ExportDatasetMixin,
@@ -26,7 +25,7 @@ from cvat_sdk.core.proxies.model_proxy import (
 from cvat_sdk.core.uploading import AnnotationUploader
 
 if TYPE_CHECKING:
-    from _typeshed import StrPath
+    from _typeshed import StrPath, SupportsWrite
 
 _JobEntityBase, _JobRepoBase = build_model_bases(
     models.JobRead, apis.JobsApi, api_member_name="jobs_api"
@@ -39,6 +38,7 @@ class Job(
     ModelUpdateMixin[models.IPatchedJobWriteRequest],
     AnnotationCrudMixin,
     ExportDatasetMixin,
+    DownloadFramesMixin,
 ):
     _model_partial_update_arg = "patched_job_write_request"
     _put_annotations_data_param = "job_annotations_update_request"
@@ -85,41 +85,31 @@ class Job(
         (_, response) = self.api.retrieve_preview(self.id)
         return io.BytesIO(response.data)
 
-    def download_frames(
-        self,
-        frame_ids: Sequence[int],
-        *,
-        image_extension: Optional[str] = None,
-        outdir: StrPath = ".",
-        quality: str = "original",
-        filename_pattern: str = "frame_{frame_id:06d}{frame_ext}",
-    ) -> Optional[List[Image.Image]]:
-        """
-        Download the requested frame numbers for a job and save images as outdir/filename_pattern
-        """
-        # TODO: add arg descriptions in schema
-
-        outdir = Path(outdir)
-        outdir.mkdir(parents=True, exist_ok=True)
-
-        for frame_id in frame_ids:
-            frame_bytes = self.get_frame(frame_id, quality=quality)
-
-            im = Image.open(frame_bytes)
-            if image_extension is None:
-                mime_type = im.get_format_mimetype() or "image/jpg"
-                im_ext = mimetypes.guess_extension(mime_type)
-
-                # FIXME It is better to use meta information from the server
-                # to determine the extension
-                # replace '.jpe' or '.jpeg' with a more used '.jpg'
-                if im_ext in (".jpe", ".jpeg", None):
-                    im_ext = ".jpg"
-            else:
-                im_ext = f".{image_extension.strip('.')}"
+    def _get_frame_chunk_position(self, frame_id: int, quality: str) -> Optional[Tuple[int, int]]:
+        chunk_type = (
+            self.data_original_chunk_type
+            if quality == "original"
+            else self.data_compressed_chunk_type
+        )
+        if (
+            str(chunk_type) != "imageset"
+            # the ground truth job frames are not contiguous
+            or str(self.type) == "ground_truth"
+            or not self.start_frame <= frame_id <= self.stop_frame
+        ):
+            return None
+
+        return divmod(frame_id - self.start_frame, self.data_chunk_size)
+
+    def _download_frame_chunk(
+        self, chunk_index: int, output_file: SupportsWrite[bytes], *, quality: str
+    ) -> None:
+        (_, response) = self.api.retrieve_data(
+            self.id, index=chunk_index, quality=quality, type="chunk", _parse_response=False
+        )
 
-            outfile = filename_pattern.format(frame_id=frame_id, frame_ext=im_ext)
-            im.save(outdir / outfile)
+        with response:
+            shutil.copyfileobj(response, output_file)
 
     def get_meta(self) -> models.IDataMetaRead:
         (meta, _) = self.api.retrieve_data_meta(self.id)
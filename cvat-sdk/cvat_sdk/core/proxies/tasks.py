@@ -6,19 +6,17 @@ from __future__ import annotations
 
 import io
 import json
-import mimetypes
 import shutil
 from enum import Enum
 from pathlib import Path
 from time import sleep
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
-
-from PIL import Image
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
 from cvat_sdk.api_client import apis, exceptions, models
 from cvat_sdk.core.helpers import get_paginated_collection
 from cvat_sdk.core.progress import ProgressReporter
 from cvat_sdk.core.proxies.annotations import AnnotationCrudMixin
+from cvat_sdk.core.proxies.frames import DownloadFramesMixin
 from cvat_sdk.core.proxies.jobs import Job
 from cvat_sdk.core.proxies.model_proxy import (
     DownloadBackupMixin,
@@ -62,6 +60,7 @@ class Task(
     AnnotationCrudMixin,
     ExportDatasetMixin,
     DownloadBackupMixin,
+    DownloadFramesMixin,
 ):
     _model_partial_update_arg = "patched_task_write_request"
     _put_annotations_data_param = "task_annotations_update_request"
@@ -217,40 +216,21 @@ class Task(
         with response:
             shutil.copyfileobj(response, output_file)
 
-    def download_frames(
-        self,
-        frame_ids: Sequence[int],
-        *,
-        image_extension: Optional[str] = None,
-        outdir: StrPath = ".",
-        quality: str = "original",
-        filename_pattern: str = "frame_{frame_id:06d}{frame_ext}",
-    ) -> Optional[List[Image.Image]]:
-        """
-        Download the requested frame numbers for a task and save images as outdir/filename_pattern
-        """
-
-        outdir = Path(outdir)
-        outdir.mkdir(parents=True, exist_ok=True)
-
-        for frame_id in frame_ids:
-            frame_bytes = self.get_frame(frame_id, quality=quality)
+    def _get_frame_chunk_position(self, frame_id: int, quality: str) -> Optional[Tuple[int, int]]:
+        chunk_type = (
+            self.data_original_chunk_type
+            if quality == "original"
+            else self.data_compressed_chunk_type
+        )
+        if str(chunk_type) != "imageset" or not 0 <= frame_id < self.size:
+            return None
 
-            im = Image.open(frame_bytes)
-            if image_extension is None:
-                mime_type = im.get_format_mimetype() or "image/jpg"
-                im_ext = mimetypes.guess_extension(mime_type)
+        return divmod(frame_id, self.data_chunk_size)
 
-                # FIXME It is better to use meta information from the server
-                # to determine the extension
-                # replace '.jpe' or '.jpeg' with a more used '.jpg'
-                if im_ext in (".jpe", ".jpeg", None):
-                    im_ext = ".jpg"
-            else:
-                im_ext = f".{image_extension.strip('.')}"
-
-            outfile = filename_pattern.format(frame_id=frame_id, frame_ext=im_ext)
-            im.save(outdir / outfile)
+    def _download_frame_chunk(
+        self, chunk_index: int, output_file: SupportsWrite[bytes], *, quality: str
+    ) -> None:
+        self.download_chunk(chunk_index, output_file, quality=quality)
 
     def get_jobs(self) -> List[Job]:
         return [
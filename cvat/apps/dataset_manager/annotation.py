@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+from collections import defaultdict
 from copy import copy, deepcopy
 
 import math
@@ -11,7 +12,9 @@ import numpy as np
 from itertools import chain
 from scipy.optimize import linear_sum_assignment
 from shapely import geometry
+from shapely.strtree import STRtree
 
+from cvat.apps.engine.lazy_list import PackedFloatList, as_float_array
 from cvat.apps.engine.models import ShapeType, DimensionType
 from cvat.apps.engine.serializers import LabeledDataSerializer
 from cvat.apps.dataset_manager.util import deepcopy_simple
@@ -231,6 +234,16 @@ class ObjectManager:
     def _calc_objects_similarity(obj0, obj1, start_frame, overlap, dimension):
         raise NotImplementedError()
 
+    @classmethod
+    def _calc_objects_similarity_matrix(cls, objects0, objects1, start_frame, overlap, dimension):
+        similarity_matrix = np.empty(shape=(len(objects0), len(objects1)), dtype=float)
+        for i, obj0 in enumerate(objects0):
+            for j, obj1 in enumerate(objects1):
+                similarity_matrix[i][j] = cls._calc_objects_similarity(
+                    obj0, obj1, start_frame, overlap, dimension)
+
+        return similarity_matrix
+
     @staticmethod
     def _unite_objects(obj0, obj1):
         raise NotImplementedError()
@@ -271,13 +284,9 @@ class ObjectManager:
             if frame in old_objects_by_frame:
                 int_objects = int_objects_by_frame[frame]
                 old_objects = old_objects_by_frame[frame]
-                cost_matrix = np.empty(shape=(len(int_objects), len(old_objects)),
-                    dtype=float)
                 # 5.1 Construct cost matrix for the frame.
-                for i, int_obj in enumerate(int_objects):
-                    for j, old_obj in enumerate(old_objects):
-                        cost_matrix[i][j] = 1 - self._calc_objects_similarity(
-                            int_obj, old_obj, start_frame, overlap, dimension)
+                cost_matrix = 1 - self._calc_objects_similarity_matrix(
+                    int_objects, old_objects, start_frame, overlap, dimension)
 
                 # 6. Find optimal solution using Hungarian algorithm.
                 row_ind, col_ind = linear_sum_assignment(cost_matrix)
@@ -430,6 +439,44 @@ class ShapeManager(ObjectManager):
                 return 0 # FIXME: need some similarity for points, polylines, ellipses and 2D cuboids
         return 0
 
+    @classmethod
+    def _calc_objects_similarity_matrix(cls, objects0, objects1, start_frame, overlap, dimension):
+        # The same as computing _calc_objects_similarity() for each pair of objects,
+        # but the objects are processed in batches
+        similarity_matrix = np.zeros(shape=(len(objects0), len(objects1)), dtype=float)
+
+        def _group_objects(objects):
+            groups = defaultdict(list)
+            for i, obj in enumerate(objects):
+                groups[(str(obj["type"]), obj.get("label_id"))].append(i)
+            return groups
+
+        groups1 = _group_objects(objects1)
+        for group_key, indices0 in _group_objects(objects0).items():
+            indices1 = groups1.get(group_key)
+            if not indices1:
+                continue
+
+            shape_type = group_key[0]
+            # the packed points are read without unpacking them into lists
+            points0 = [as_float_array(objects0[i]["points"]) for i in indices0]
+            points1 = [as_float_array(objects1[j]["points"]) for j in indices1]
+
+            if shape_type == ShapeType.RECTANGLE:
+                # FIXME: need to consider rotated boxes
+                group_similarity = _calc_boxes_iou(np.stack(points0), np.stack(points1))
+            elif shape_type == ShapeType.CUBOID and dimension == DimensionType.DIM_3D:
+                group_similarity = _calc_cuboids_3d_similarity(
+                    np.stack(points0), np.stack(points1))
+            elif shape_type == ShapeType.POLYGON:
+                group_similarity = _calc_polygons_iou(points0, points1)
+            else:
+                continue # FIXME: need some similarity for points, polylines, ellipses and 2D cuboids
+
+            similarity_matrix[np.ix_(indices0, indices1)] = group_similarity
+
+        return similarity_matrix
+
     @staticmethod
     def _unite_objects(obj0, obj1):
         # TODO: improve the trivial implementation
@@ -438,6 +485,94 @@ class ShapeManager(ObjectManager):
     def _modify_unmatched_object(self, obj, end_frame):
         pass
 
+def _calc_boxes_iou(boxes0: np.ndarray, boxes1: np.ndarray) -> np.ndarray:
+    """
+    Computes IoU for each pair of boxes, given as [N, 4] and [M, 4] arrays of
+    (x0, y0, x1, y1). Empty boxes have 0 similarity with other boxes.
+    """
+
+    def _normalize(boxes):
+        boxes = boxes.reshape(-1, 4)
+        return np.minimum(boxes[:, :2], boxes[:, 2:]), np.maximum(boxes[:, :2], boxes[:, 2:])
+
+    min0, max0 = _normalize(boxes0)
+    min1, max1 = _normalize(boxes1)
+
+    area0 = np.prod(max0 - min0, axis=1)
+    area1 = np.prod(max1 - min1, axis=1)
+
+    intersection_sizes = np.clip(
+        np.minimum(max0[:, None], max1[None]) - np.maximum(min0[:, None], min1[None]),
+        0, None
+    )
+    intersection_area = np.prod(intersection_sizes, axis=2)
+    union_area = area0[:, None] + area1[None] - intersection_area
+
+    valid_pairs = (area0[:, None] != 0) & (area1[None] != 0)
+    return np.divide(intersection_area, union_area,
+        out=np.zeros_like(intersection_area), where=valid_pairs)
+
+def _calc_cuboids_3d_similarity(cuboids0: np.ndarray, cuboids1: np.ndarray) -> np.ndarray:
+    """
+    Computes similarity for each pair of 3d cuboids as a product of
+    the top view IoU and the side view IoU.
+    """
+
+    def _get_views(cuboids):
+        centers = cuboids[:, 0:3]
+        half_sizes = cuboids[:, 6:9] / 2
+        mins = centers - half_sizes
+        maxs = centers + half_sizes
+
+        top_view = np.stack([mins[:, 0], mins[:, 1], maxs[:, 0], maxs[:, 1]], axis=1)
+        side_view = np.stack([mins[:, 0], mins[:, 2], maxs[:, 0], maxs[:, 2]], axis=1)
+        return top_view, side_view
+
+    top_view0, side_view0 = _get_views(cuboids0)
+    top_view1, side_view1 = _get_views(cuboids1)
+
+    return _calc_boxes_iou(top_view0, top_view1) * _calc_boxes_iou(side_view0, side_view1)
+
+def _calc_polygons_iou(points0: Sequence[np.ndarray], points1: Sequence[np.ndarray]):
+    """
+    Computes IoU for each pair of polygons. Only the pairs with intersecting
+    bounding boxes are compared. Invalid and empty polygons have 0 similarity
+    with other polygons.
+    """
+
+    def _make_polygons(points):
+        polygons = {}
+        for i, polygon_points in enumerate(points):
+            polygon = geometry.Polygon(pairwise(polygon_points))
+            if polygon.is_valid and polygon.area != 0:
+                polygons[i] = polygon
+        return polygons
+
+    polygons0 = _make_polygons(points0)
+    polygons1 = _make_polygons(points1)
+
+    similarity_matrix = np.zeros(shape=(len(points0), len(points1)), dtype=float)
+    if not polygons0 or not polygons1:
+        return similarity_matrix
+
+    tree_polygons = list(polygons1.values())
+    tree_indices = list(polygons1.keys())
+    polygon_indices = {id(p): i for i, p in zip(tree_indices, tree_polygons)}
+    tree = STRtree(tree_polygons)
+
+    for i, p0 in polygons0.items():
+        for candidate in tree.query(p0):
+            if isinstance(candidate, (int, np.integer)):
+                j = tree_indices[candidate]
+            else:
+                j = polygon_indices[id(candidate)]
+
+            p1 = polygons1[j]
+            overlap_area = p0.intersection(p1).area
+            similarity_matrix[i][j] = overlap_area / (p0.area + p1.area - overlap_area)
+
+    return similarity_matrix
+
 class TrackManager(ObjectManager):
     def __init__(self, objects, dimension):
         self._dimension = dimension
@@ -587,6 +722,9 @@ class TrackManager(ObjectManager):
 
             if isinstance(points, np.ndarray):
                 points = points.tolist()
+            elif isinstance(points, PackedFloatList):
+                # the packed data is shared, the values are unpacked only if modified
+                points = deepcopy(points)
             else:
                 points = points.copy()
 
@@ -608,14 +746,15 @@ class TrackManager(ObjectManager):
         def simple_interpolation(shape0, shape1):
             shapes = []
             distance = shape1["frame"] - shape0["frame"]
-            diff = np.subtract(shape1["points"], shape0["points"])
+            points0 = as_float_array(shape0["points"])
+            diff = as_float_array(shape1["points"]) - points0
 
             for frame in range(shape0["frame"] + 1, shape1["frame"]):
                 offset = (frame - shape0["frame"]) / distance
                 rotation = (shape0["rotation"] + find_angle_diff(
                     shape1["rotation"], shape0["rotation"],
                 ) * offset + 360) % 360
-                points = shape0["points"] + diff * offset
+                points = points0 + diff * offset
 
                 if included_frames is None or frame in included_frames:
                     shapes.append(copy_shape(shape0, frame, points, rotation))
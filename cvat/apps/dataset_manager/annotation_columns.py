@@ -0,0 +1,326 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import attrs
+import numpy as np
+
+from cvat.apps.dataset_manager.annotation import AnnotationIR
+from cvat.apps.engine.lazy_list import as_float_array
+from cvat.apps.engine.models import ShapeType
+
+_SHAPE_TYPES = [str(t) for t in ShapeType]
+_SHAPE_TYPE_CODES = {t: i for i, t in enumerate(_SHAPE_TYPES)}
+_NO_VALUE = -1
+
+
+def _ragged_offsets(lengths: Sequence[int]) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _take_ragged(
+    offsets: np.ndarray, values: np.ndarray, indices: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    lengths = offsets[indices + 1] - offsets[indices]
+    new_offsets = _ragged_offsets(lengths)
+    positions = np.repeat(offsets[indices] - new_offsets[:-1], lengths) + np.arange(
+        new_offsets[-1], dtype=np.int64
+    )
+    return new_offsets, values[positions]
+
+
+@attrs.define
+class AnnotationColumns:
+    """
+    Tags or shapes, stored as a struct of arrays.
+    Variable length fields (points, attributes, skeleton elements) are stored
+    in flat arrays, with offsets for each object.
+
+    The objects are restored with the original values, except for the following:
+    - the points are returned as lists of floats
+    - the missing optional fields are returned with the default values:
+      None for "id", "label_id", "group" and "source", False for "occluded" and "outside",
+      0 for "z_order" and "rotation", an empty list for "elements" of shapes
+    """
+
+    is_shape: bool
+
+    id: np.ndarray
+    frame: np.ndarray
+    label_id: np.ndarray
+    group: np.ndarray
+    source: np.ndarray
+    sources: list[Optional[str]]
+
+    attribute_offsets: np.ndarray
+    attribute_spec_id: np.ndarray
+    attribute_value: np.ndarray
+
+    # shape fields
+    type: Optional[np.ndarray] = None
+    occluded: Optional[np.ndarray] = None
+    outside: Optional[np.ndarray] = None
+    z_order: Optional[np.ndarray] = None
+    rotation: Optional[np.ndarray] = None
+    points_offsets: Optional[np.ndarray] = None
+    points: Optional[np.ndarray] = None
+
+    element_offsets: Optional[np.ndarray] = None
+    elements: Optional[AnnotationColumns] = None
+
+    _frame_order: Optional[np.ndarray] = attrs.field(default=None, init=False)
+    _sorted_frames: Optional[np.ndarray] = attrs.field(default=None, init=False)
+
+    @classmethod
+    def from_objects(
+        cls, objects: Sequence[dict[str, Any]], *, is_shape: bool, with_elements: bool = True
+    ) -> AnnotationColumns:
+        count = len(objects)
+
+        def _column(key: str, dtype, default=_NO_VALUE) -> np.ndarray:
+            return np.fromiter(
+                (default if (v := obj.get(key)) is None else v for obj in objects),
+                dtype=dtype,
+                count=count,
+            )
+
+        object_sources = [obj.get('source') for obj in objects]
+        sources = list(dict.fromkeys(object_sources))
+        source_codes = {source: i for i, source in enumerate(sources)}
+
+        attributes = [obj.get('attributes', []) for obj in objects]
+
+        columns = cls(
+            is_shape=is_shape,
+            id=_column('id', np.int64),
+            frame=_column('frame', np.int64),
+            label_id=_column('label_id', np.int64),
+            group=_column('group', np.int64),
+            source=np.fromiter(
+                (source_codes[source] for source in object_sources), dtype=np.int16, count=count
+            ),
+            sources=sources,
+            attribute_offsets=_ragged_offsets([len(a) for a in attributes]),
+            attribute_spec_id=np.array(
+                [attr['spec_id'] for a in attributes for attr in a], dtype=np.int64
+            ),
+            attribute_value=np.array(
+                [attr['value'] for a in attributes for attr in a], dtype=object
+            ),
+        )
+
+        if is_shape:
+            # the packed points are read without unpacking them into lists
+            points = [
+                as_float_array(p) if (p := obj.get('points')) is not None else np.empty(0)
+                for obj in objects
+            ]
+
+            columns.type = np.fromiter(
+                (_SHAPE_TYPE_CODES[str(obj['type'])] for obj in objects),
+                dtype=np.int8,
+                count=count,
+            )
+            columns.occluded = _column('occluded', bool, False)
+            columns.outside = _column('outside', bool, False)
+            columns.z_order = _column('z_order', np.int32, 0)
+            columns.rotation = _column('rotation', np.float64, 0)
+            columns.points_offsets = _ragged_offsets([len(p) for p in points])
+            columns.points = (
+                np.concatenate(points) if count else np.empty(0, dtype=np.float64)
+            )
+
+            if with_elements:
+                elements = [obj.get('elements') or [] for obj in objects]
+                columns.element_offsets = _ragged_offsets([len(e) for e in elements])
+                columns.elements = cls.from_objects(
+                    [element for e in elements for element in e],
+                    is_shape=True, with_elements=False,
+                )
+
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def take(self, indices: np.ndarray) -> AnnotationColumns:
+        """
+        Returns the objects with the specified indices as a new instance.
+        """
+
+        indices = np.asarray(indices, dtype=np.int64)
+
+        attribute_offsets, attribute_spec_id = _take_ragged(
+            self.attribute_offsets, self.attribute_spec_id, indices
+        )
+        _, attribute_value = _take_ragged(self.attribute_offsets, self.attribute_value, indices)
+
+        columns = AnnotationColumns(
+            is_shape=self.is_shape,
+            id=self.id[indices],
+            frame=self.frame[indices],
+            label_id=self.label_id[indices],
+            group=self.group[indices],
+            source=self.source[indices],
+            sources=self.sources,
+            attribute_offsets=attribute_offsets,
+            attribute_spec_id=attribute_spec_id,
+            attribute_value=attribute_value,
+        )
+
+        if self.is_shape:
+            columns.type = self.type[indices]
+            columns.occluded = self.occluded[indices]
+            columns.outside = self.outside[indices]
+            columns.z_order = self.z_order[indices]
+            columns.rotation = self.rotation[indices]
+            columns.points_offsets, columns.points = _take_ragged(
+                self.points_offsets, self.points, indices
+            )
+
+            if self.elements is not None:
+                element_indices = _take_ragged(
+                    self.element_offsets,
+                    np.arange(len(self.elements), dtype=np.int64),
+                    indices,
+                )
+                columns.element_offsets = element_indices[0]
+                columns.elements = self.elements.take(element_indices[1])
+
+        return columns
+
+    def slice(self, start: int, stop: int) -> AnnotationColumns:
+        """
+        Returns the objects on the frames from the [start; stop] range,
+        keeping the original order of the objects.
+        """
+
+        if self._frame_order is None:
+            self._frame_order = np.argsort(self.frame, kind='stable')
+            self._sorted_frames = self.frame[self._frame_order]
+
+        begin = np.searchsorted(self._sorted_frames, start, side='left')
+        end = np.searchsorted(self._sorted_frames, stop, side='right')
+        return self.take(np.sort(self._frame_order[begin:end]))
+
+    def _get_attributes(self, index: int) -> list[dict[str, Any]]:
+        begin, end = self.attribute_offsets[index : index + 2]
+        return [
+            {'spec_id': spec_id, 'value': value}
+            for spec_id, value in zip(
+                self.attribute_spec_id[begin:end].tolist(), self.attribute_value[begin:end]
+            )
+        ]
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        """
+        Materializes the object with the specified index.
+        """
+
+        obj_id = int(self.id[index])
+        label_id = int(self.label_id[index])
+        group = int(self.group[index])
+        obj = {
+            'id': obj_id if obj_id != _NO_VALUE else None,
+            'frame': int(self.frame[index]),
+            'label_id': label_id if label_id != _NO_VALUE else None,
+            'group': group if group != _NO_VALUE else None,
+            'source': self.sources[self.source[index]],
+            'attributes': self._get_attributes(index),
+        }
+
+        if self.is_shape:
+            points_begin, points_end = self.points_offsets[index : index + 2]
+            obj.update({
+                'type': _SHAPE_TYPES[self.type[index]],
+                'occluded': bool(self.occluded[index]),
+                'outside': bool(self.outside[index]),
+                'z_order': int(self.z_order[index]),
+                'rotation': float(self.rotation[index]),
+                'points': self.points[points_begin:points_end].tolist(),
+            })
+
+            if self.elements is not None:
+                elements_begin, elements_end = self.element_offsets[index : index + 2]
+                obj['elements'] = [
+                    self.elements[i] for i in range(elements_begin, elements_end)
+                ]
+
+        return obj
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class ColumnarAnnotationIR:
+    """
+    An alternative to AnnotationIR, with tags and shapes stored in a columnar form.
+    It is more compact and allows to slice annotations by frames quickly.
+    The annotations are converted to dicts only when requested.
+
+    Tracks have a nested structure, and their number is typically much lower,
+    so they are kept as is.
+    """
+
+    def __init__(
+        self,
+        dimension,
+        *,
+        version: int = 0,
+        tags: AnnotationColumns,
+        shapes: AnnotationColumns,
+        tracks: Iterable[dict[str, Any]] = (),
+    ):
+        self.dimension = dimension
+        self.version = version
+        self.tags = tags
+        self.shapes = shapes
+        self.tracks = list(tracks)
+
+    @classmethod
+    def from_ir(cls, ir: AnnotationIR) -> ColumnarAnnotationIR:
+        return cls(
+            ir.dimension,
+            version=ir.version,
+            tags=AnnotationColumns.from_objects(ir.tags, is_shape=False),
+            shapes=AnnotationColumns.from_objects(ir.shapes, is_shape=True),
+            tracks=ir.tracks,
+        )
+
+    def slice(self, start: int, stop: int) -> ColumnarAnnotationIR:
+        # makes a data copy from specified frame interval
+        splitted_tracks = []
+        for t in self.tracks:
+            if AnnotationIR._is_track_inside(t, start, stop):
+                track = AnnotationIR._slice_track(t, start, stop, self.dimension)
+                if 0 < len(track['shapes']):
+                    splitted_tracks.append(track)
+
+        return ColumnarAnnotationIR(
+            self.dimension,
+            version=self.version,
+            tags=self.tags.slice(start, stop),
+            shapes=self.shapes.slice(start, stop),
+            tracks=splitted_tracks,
+        )
+
+    def to_ir(self) -> AnnotationIR:
+        ir = AnnotationIR(self.dimension)
+        ir.data = self.data
+        return ir
+
+    @property
+    def data(self) -> dict[str, Any]:
+        return {
+            'version': self.version,
+            'tags': list(self.tags),
+            'shapes': list(self.shapes),
+            'tracks': self.tracks,
+        }
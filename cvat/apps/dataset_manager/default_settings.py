@@ -12,3 +12,12 @@ DATASET_CACHE_LOCK_TIMEOUT = int(os.getenv("CVAT_DATASET_CACHE_LOCK_TIMEOUT", 10
 
 DATASET_EXPORT_LOCKED_RETRY_INTERVAL = int(os.getenv("CVAT_DATASET_EXPORT_LOCKED_RETRY_INTERVAL", 60))
 "Retry interval for cases the export cache lock was unavailable, in seconds"
+
+JOB_ANNOTATIONS_STREAMING_MIN_OBJECTS = int(
+    os.getenv("CVAT_JOB_ANNOTATIONS_STREAMING_MIN_OBJECTS", 100000)
+)
+"""
+The job annotations are sent in a streamed response, if the job has at least this number
+of tags, shapes and tracks. Such responses are written as the annotations are read from the DB,
+so they are not kept in memory. 0 disables streamed responses.
+"""
@@ -3,14 +3,21 @@
 #
 # SPDX-License-Identifier: MIT
 
+import io
+import json
 import os
 from collections import OrderedDict
 from copy import deepcopy
 from enum import Enum
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, Sequence
 from tempfile import TemporaryDirectory
 from datumaro.components.errors import DatasetError, DatasetImportError, DatasetNotFoundError
 
 from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.query import Prefetch
 from django.conf import settings
 from rest_framework.exceptions import ValidationError
@@ -23,6 +30,7 @@ from cvat.apps.events.handlers import handle_annotations_change
 from cvat.apps.profiler import silk_profile
 
 from cvat.apps.dataset_manager.annotation import AnnotationIR, AnnotationManager
+from cvat.apps.dataset_manager.annotation_columns import ColumnarAnnotationIR
 from cvat.apps.dataset_manager.bindings import TaskData, JobData, CvatImportError, CvatDatasetNotFoundError
 from cvat.apps.dataset_manager.formats.registry import make_exporter, make_importer
 from cvat.apps.dataset_manager.util import add_prefetch_fields, bulk_create, get_cached
@@ -78,6 +86,8 @@ def merge_table_rows(rows, keys_for_merge, field_id):
     return list(merged_rows.values())
 
 class JobAnnotation:
+    _DB_ITERATOR_CHUNK_SIZE = 2000
+
     @classmethod
     def add_prefetch_info(cls, queryset):
         assert issubclass(queryset.model, models.Job)
@@ -518,19 +528,56 @@ class JobAnnotation:
 
     @staticmethod
     def _extend_attributes(attributeval_set, default_attribute_values):
-        shape_attribute_specs_set = set(attr.spec_id for attr in attributeval_set)
+        shape_attribute_specs_set = set(attr['spec_id'] for attr in attributeval_set)
         for db_attr in default_attribute_values:
-            if db_attr.spec_id not in shape_attribute_specs_set:
-                attributeval_set.append(dotdict([
-                    ('spec_id', db_attr.spec_id),
-                    ('value', db_attr.value),
-                ]))
+            if db_attr['spec_id'] not in shape_attribute_specs_set:
+                attributeval_set.append({
+                    'spec_id': db_attr['spec_id'],
+                    'value': db_attr['value'],
+                })
 
-    def _init_tags_from_db(self):
+    @staticmethod
+    def _collect_attributes(rows, prefix='attribute__'):
+        # The rows can be repeated because of the other joined tables
+        attributes = OrderedDict()
+        for row in rows:
+            attr_id = row[prefix + 'id']
+            if attr_id is not None and attr_id not in attributes:
+                attributes[attr_id] = {
+                    'spec_id': row[prefix + 'spec_id'],
+                    'value': row[prefix + 'value'],
+                }
+
+        return list(attributes.values())
+
+    @staticmethod
+    def _attach_elements(objects, elements):
+        """
+        Adds the elements to their parent objects. The objects must be ordered by job, frame and id,
+        the elements - by the parent job, frame and id. The elements are read along with
+        the objects, so there is no need to keep all of them in memory.
+        """
+
+        elements = iter(elements)
+        parent_key, element = next(elements, (None, None))
+
+        for obj_key, obj in objects:
+            obj['elements'] = []
+
+            while element is not None and parent_key <= obj_key:
+                if parent_key == obj_key:
+                    obj['elements'].append(element)
+
+                parent_key, element = next(elements, (None, None))
+
+            yield obj_key, obj
+
+    def _read_tags_from_db(self, queryset) -> Iterator[tuple[tuple, dict]]:
         # NOTE: do not use .prefetch_related() with .values() since it's useless:
         # https://github.com/cvat-ai/cvat/pull/7748#issuecomment-2063695007
-        db_tags = self.db_job.labeledimage_set.values(
+        db_tags = queryset.values(
             'id',
+            'job_id',
             'frame',
             'label_id',
             'group',
@@ -538,32 +585,43 @@ class JobAnnotation:
             'attribute__spec_id',
             'attribute__value',
             'attribute__id',
-        ).order_by('frame').iterator(chunk_size=2000)
-
-        db_tags = merge_table_rows(
-            rows=db_tags,
-            keys_for_merge={
-                "attributes": [
-                    'attribute__spec_id',
-                    'attribute__value',
-                    'attribute__id',
-                ],
-            },
-            field_id='id',
-        )
+        ).order_by('job_id', 'frame', 'id').iterator(chunk_size=self._DB_ITERATOR_CHUNK_SIZE)
+
+        for _, tag_rows in groupby(db_tags, key=itemgetter('id')):
+            tag_rows = list(tag_rows)
+            db_tag = tag_rows[0]
+
+            tag = {
+                'id': db_tag['id'],
+                'label_id': db_tag['label_id'],
+                'frame': db_tag['frame'],
+                'group': db_tag['group'],
+                'source': db_tag['source'],
+                'attributes': self._collect_attributes(tag_rows),
+            }
+            self._extend_attributes(tag['attributes'],
+                self.db_attributes[tag['label_id']]["all"].values())
 
-        for db_tag in db_tags:
-            self._extend_attributes(db_tag.attributes,
-                self.db_attributes[db_tag.label_id]["all"].values())
+            yield (db_tag['job_id'], db_tag['frame'], db_tag['id']), tag
 
-        serializer = serializers.LabeledImageSerializerFromDB(db_tags, many=True)
-        self.ir_data.tags = serializer.data
+    def iter_tags_from_db(self) -> Iterator[dict]:
+        "Reads the job tags ordered by frame"
+
+        for _, tag in self._read_tags_from_db(self.db_job.labeledimage_set):
+            yield tag
+
+    def _read_shapes_from_db(self, queryset, *, elements: bool) -> Iterator[tuple[tuple, dict]]:
+        queryset = queryset.filter(parent__isnull=not elements)
+        if elements:
+            queryset = queryset.order_by('job_id', 'parent__frame', 'parent_id', 'id')
+        else:
+            queryset = queryset.order_by('job_id', 'frame', 'id')
 
-    def _init_shapes_from_db(self):
         # NOTE: do not use .prefetch_related() with .values() since it's useless:
         # https://github.com/cvat-ai/cvat/pull/7748#issuecomment-2063695007
-        db_shapes = self.db_job.labeledshape_set.values(
+        db_shapes = queryset.values(
             'id',
+            'job_id',
             'label_id',
             'type',
             'frame',
@@ -575,57 +633,75 @@ class JobAnnotation:
             'rotation',
             'points',
             'parent',
+            'parent__frame',
             'attribute__spec_id',
             'attribute__value',
             'attribute__id',
-        ).order_by('frame').iterator(chunk_size=2000)
-
-        db_shapes = merge_table_rows(
-            rows=db_shapes,
-            keys_for_merge={
-                'attributes': [
-                    'attribute__spec_id',
-                    'attribute__value',
-                    'attribute__id',
-                ],
-            },
-            field_id='id',
-        )
+        ).iterator(chunk_size=self._DB_ITERATOR_CHUNK_SIZE)
+
+        for _, shape_rows in groupby(db_shapes, key=itemgetter('id')):
+            shape_rows = list(shape_rows)
+            db_shape = shape_rows[0]
+
+            shape = {
+                'id': db_shape['id'],
+                'label_id': db_shape['label_id'],
+                'type': db_shape['type'],
+                'frame': db_shape['frame'],
+                'group': db_shape['group'],
+                'source': db_shape['source'],
+                'occluded': db_shape['occluded'],
+                'outside': db_shape['outside'],
+                'z_order': db_shape['z_order'],
+                'rotation': db_shape['rotation'],
+                'points': db_shape['points'],
+                'attributes': self._collect_attributes(shape_rows),
+            }
+            self._extend_attributes(shape['attributes'],
+                self.db_attributes[shape['label_id']]["all"].values())
 
-        shapes = {}
-        elements = {}
-        for db_shape in db_shapes:
-            self._extend_attributes(db_shape.attributes,
-                self.db_attributes[db_shape.label_id]["all"].values())
-            if db_shape['type'] == str(models.ShapeType.SKELETON):
+            if shape['type'] == str(models.ShapeType.SKELETON):
                 # skeletons themselves should not have points as they consist of other elements
                 # here we ensure that it was initialized correctly
-                db_shape['points'] = []
+                shape['points'] = []
 
-            if db_shape.parent is None:
-                db_shape.elements = []
-                shapes[db_shape.id] = db_shape
+            if elements:
+                yield (db_shape['job_id'], db_shape['parent__frame'], db_shape['parent']), shape
             else:
-                if db_shape.parent not in elements:
-                    elements[db_shape.parent] = []
-                elements[db_shape.parent].append(db_shape)
+                yield (db_shape['job_id'], db_shape['frame'], db_shape['id']), shape
 
-        for shape_id, shape_elements in elements.items():
-            shapes[shape_id].elements = shape_elements
+    def _read_shapes_with_elements_from_db(self, queryset) -> Iterator[tuple[tuple, dict]]:
+        return self._attach_elements(
+            self._read_shapes_from_db(queryset, elements=False),
+            self._read_shapes_from_db(queryset, elements=True),
+        )
 
-        serializer = serializers.LabeledShapeSerializerFromDB(list(shapes.values()), many=True)
-        self.ir_data.shapes = serializer.data
+    def iter_shapes_from_db(self) -> Iterator[dict]:
+        "Reads the job shapes with their elements ordered by frame"
+
+        for _, shape in self._read_shapes_with_elements_from_db(self.db_job.labeledshape_set):
+            yield shape
+
+    def _read_tracks_from_db(self, queryset, *, elements: bool) -> Iterator[tuple[tuple, dict]]:
+        queryset = queryset.filter(parent__isnull=not elements)
+        if elements:
+            queryset = queryset.order_by(
+                'job_id', 'parent__frame', 'parent_id', 'id', 'shape__frame', 'shape__id'
+            )
+        else:
+            queryset = queryset.order_by('job_id', 'frame', 'id', 'shape__frame', 'shape__id')
 
-    def _init_tracks_from_db(self):
         # NOTE: do not use .prefetch_related() with .values() since it's useless:
         # https://github.com/cvat-ai/cvat/pull/7748#issuecomment-2063695007
-        db_tracks = self.db_job.labeledtrack_set.values(
+        db_tracks = queryset.values(
             "id",
+            "job_id",
             "frame",
             "label_id",
             "group",
             "source",
             "parent",
+            "parent__frame",
             "attribute__spec_id",
             "attribute__value",
             "attribute__id",
@@ -640,75 +716,106 @@ class JobAnnotation:
             "shape__attribute__spec_id",
             "shape__attribute__value",
             "shape__attribute__id",
-        ).order_by('id', 'shape__frame').iterator(chunk_size=2000)
-
-        db_tracks = merge_table_rows(
-            rows=db_tracks,
-            keys_for_merge={
-                "attributes": [
-                    "attribute__spec_id",
-                    "attribute__value",
-                    "attribute__id",
-                ],
-                "shapes":[
-                    "shape__type",
-                    "shape__occluded",
-                    "shape__z_order",
-                    "shape__points",
-                    "shape__rotation",
-                    "shape__id",
-                    "shape__frame",
-                    "shape__outside",
-                    "shape__attribute__spec_id",
-                    "shape__attribute__value",
-                    "shape__attribute__id",
-                ],
-            },
-            field_id="id",
-        )
+        ).iterator(chunk_size=self._DB_ITERATOR_CHUNK_SIZE)
+
+        for _, track_rows in groupby(db_tracks, key=itemgetter('id')):
+            track_rows = list(track_rows)
+            db_track = track_rows[0]
+
+            track = {
+                'id': db_track['id'],
+                'label_id': db_track['label_id'],
+                'frame': db_track['frame'],
+                'group': db_track['group'],
+                'source': db_track['source'],
+                'shapes': [],
+                'attributes': self._collect_attributes(track_rows),
+            }
+            self._extend_attributes(track['attributes'],
+                self.db_attributes[track['label_id']]["immutable"].values())
+
+            default_attribute_values = self.db_attributes[track['label_id']]["mutable"].values()
+            for shape_id, shape_rows in groupby(track_rows, key=itemgetter('shape__id')):
+                if shape_id is None:
+                    continue
+
+                shape_rows = list(shape_rows)
+                db_shape = shape_rows[0]
+
+                shape = {
+                    'id': shape_id,
+                    'type': db_shape['shape__type'],
+                    'frame': db_shape['shape__frame'],
+                    'occluded': db_shape['shape__occluded'],
+                    'outside': db_shape['shape__outside'],
+                    'z_order': db_shape['shape__z_order'],
+                    'rotation': db_shape['shape__rotation'],
+                    'points': db_shape['shape__points'],
+                    'attributes': self._collect_attributes(shape_rows, 'shape__attribute__'),
+                }
 
-        tracks = {}
-        elements = {}
-        for db_track in db_tracks:
-            db_track["shapes"] = merge_table_rows(db_track["shapes"], {
-                'attributes': [
-                    'attribute__value',
-                    'attribute__spec_id',
-                    'attribute__id',
-                ]
-            }, 'id')
-
-            # A result table can consist many equal rows for track/shape attributes
-            # We need filter unique attributes manually
-            db_track["attributes"] = list(set(db_track["attributes"]))
-            self._extend_attributes(db_track.attributes,
-                self.db_attributes[db_track.label_id]["immutable"].values())
-
-            default_attribute_values = self.db_attributes[db_track.label_id]["mutable"].values()
-            for db_shape in db_track["shapes"]:
-                db_shape["attributes"] = list(set(db_shape["attributes"]))
                 # in case of trackedshapes need to interpolate attribute values and extend it
                 # by previous shape attribute values (not default values)
-                self._extend_attributes(db_shape["attributes"], default_attribute_values)
-                if db_shape['type'] == str(models.ShapeType.SKELETON):
+                self._extend_attributes(shape['attributes'], default_attribute_values)
+                if shape['type'] == str(models.ShapeType.SKELETON):
                     # skeletons themselves should not have points as they consist of other elements
                     # here we ensure that it was initialized correctly
-                    db_shape['points'] = []
-                default_attribute_values = db_shape["attributes"]
+                    shape['points'] = []
+                default_attribute_values = shape['attributes']
+
+                track['shapes'].append(shape)
 
-            if db_track.parent is None:
-                db_track.elements = []
-                tracks[db_track.id] = db_track
+            if elements:
+                yield (db_track['job_id'], db_track['parent__frame'], db_track['parent']), track
             else:
-                if db_track.parent not in elements:
-                    elements[db_track.parent] = []
-                elements[db_track.parent].append(db_track)
+                yield (db_track['job_id'], db_track['frame'], db_track['id']), track
+
+    def _read_tracks_with_elements_from_db(self, queryset) -> Iterator[tuple[tuple, dict]]:
+        return self._attach_elements(
+            self._read_tracks_from_db(queryset, elements=False),
+            self._read_tracks_from_db(queryset, elements=True),
+        )
+
+    def iter_tracks_from_db(self) -> Iterator[dict]:
+        "Reads the job tracks with their elements ordered by frame"
+
+        for _, track in self._read_tracks_with_elements_from_db(self.db_job.labeledtrack_set):
+            yield track
+
+    def read_jobs_data_from_db(self, job_ids: Sequence[int]) -> dict[int, AnnotationIR]:
+        """
+        Reads annotations of several jobs at once, with the same number of queries as for one job.
+        The jobs must use the same labels as this job, i.e. belong to the same task.
+        """
 
-        for track_id, track_elements in elements.items():
-            tracks[track_id].elements = track_elements
+        jobs_data = {
+            job_id: AnnotationIR(self.ir_data.dimension) for job_id in job_ids
+        }
+
+        for field, objects in (
+            ('tags', self._read_tags_from_db(
+                models.LabeledImage.objects.filter(job_id__in=job_ids)
+            )),
+            ('shapes', self._read_shapes_with_elements_from_db(
+                models.LabeledShape.objects.filter(job_id__in=job_ids)
+            )),
+            ('tracks', self._read_tracks_with_elements_from_db(
+                models.LabeledTrack.objects.filter(job_id__in=job_ids)
+            )),
+        ):
+            for job_id, job_objects in groupby(objects, key=lambda item: item[0][0]):
+                jobs_data[job_id][field] = [obj for _, obj in job_objects]
 
-        serializer = serializers.LabeledTrackSerializerFromDB(list(tracks.values()), many=True)
-        self.ir_data.tracks = serializer.data
+        return jobs_data
+
+    def _init_tags_from_db(self):
+        self.ir_data.tags = list(self.iter_tags_from_db())
+
+    def _init_shapes_from_db(self):
+        self.ir_data.shapes = list(self.iter_shapes_from_db())
+
+    def _init_tracks_from_db(self):
+        self.ir_data.tracks = list(self.iter_tracks_from_db())
 
     def _init_version_from_db(self):
         self.ir_data.version = 0 # FIXME: should be removed in the future
@@ -779,9 +886,17 @@ class TaskAnnotation:
 
     def _patch_data(self, data, action):
         _data = data if isinstance(data, AnnotationIR) else AnnotationIR(self.db_task.dimension, data)
+
+        db_jobs = list(self.db_jobs)
+        if 1 < len(db_jobs):
+            # The columnar form allows to split the data between many jobs quickly,
+            # the job annotations are converted back to dicts only when they are saved.
+            # For a single job, the conversion costs more than it saves
+            _data = ColumnarAnnotationIR.from_ir(_data)
+
         splitted_data = {}
         jobs = {}
-        for db_job in self.db_jobs:
+        for db_job in db_jobs:
             jid = db_job.id
             start = db_job.segment.start_frame
             stop = db_job.segment.stop_frame
@@ -789,6 +904,8 @@ class TaskAnnotation:
             splitted_data[jid] = _data.slice(start, stop)
 
         for jid, job_data in splitted_data.items():
+            if isinstance(job_data, ColumnarAnnotationIR):
+                job_data = job_data.to_ir()
             _data = AnnotationIR(self.db_task.dimension)
             if action is None:
                 _data.data = put_job_data(jid, job_data)
@@ -821,19 +938,27 @@ class TaskAnnotation:
     def init_from_db(self):
         self.reset()
 
-        for db_job in self.db_jobs:
-            if db_job.type != models.JobType.ANNOTATION:
-                continue
+        db_jobs = [
+            db_job for db_job in self.db_jobs.select_for_update()
+            if db_job.type == models.JobType.ANNOTATION
+        ]
+        if not db_jobs:
+            return
+
+        # The annotations of all the jobs are read with a few queries
+        # instead of several queries per job. The job data is merged in the job order.
+        annotation = JobAnnotation(db_jobs[0].id, is_prefetched=True)
+        jobs_data = annotation.read_jobs_data_from_db([db_job.id for db_job in db_jobs])
 
-            annotation = JobAnnotation(db_job.id, is_prefetched=True)
-            annotation.init_from_db()
-            if annotation.ir_data.version > self.ir_data.version:
-                self.ir_data.version = annotation.ir_data.version
+        for db_job in db_jobs:
+            job_data = jobs_data[db_job.id]
+            if job_data.version > self.ir_data.version:
+                self.ir_data.version = job_data.version
             db_segment = db_job.segment
             start_frame = db_segment.start_frame
             overlap = self.db_task.overlap
             dimension = self.db_task.dimension
-            self._merge_data(annotation.ir_data, start_frame, overlap, dimension)
+            self._merge_data(job_data, start_frame, overlap, dimension)
 
     def export(self, dst_file, exporter, host='', **options):
         task_data = TaskData(
@@ -887,6 +1012,67 @@ def get_job_data(pk):
 
     return annotation.data
 
+def _count_job_objects(pk) -> int:
+    def _count_objects(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(job_id=OuterRef('id')).order_by()
+                .values('job_id').annotate(count=Count('id')).values('count')
+        ), 0)
+
+    # all the numbers are computed in a single query
+    return models.Job.objects.filter(id=pk).annotate(objects_count=
+        _count_objects(models.LabeledImage.objects.all()) +
+        _count_objects(models.LabeledShape.objects.filter(parent__isnull=True)) +
+        _count_objects(models.LabeledTrack.objects.filter(parent__isnull=True))
+    ).values_list('objects_count', flat=True).get()
+
+def is_job_data_streaming_needed(pk) -> bool:
+    min_objects = settings.JOB_ANNOTATIONS_STREAMING_MIN_OBJECTS
+    if not min_objects:
+        return False
+
+    return min_objects <= _count_job_objects(pk)
+
+def stream_job_data(pk) -> Iterator[bytes]:
+    """
+    Returns the job annotations in the JSON format in parts.
+    The annotations are read from the DB in the process, so they are not kept in memory.
+    """
+
+    annotation = JobAnnotation(pk)
+    annotation._init_version_from_db()
+
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    buffer_size = 64 * 1024
+
+    def _stream():
+        buffer = io.StringIO()
+        buffer.write('{"version":%d' % annotation.ir_data.version)
+
+        for field, objects in (
+            ('tags', annotation.iter_tags_from_db()),
+            ('shapes', annotation.iter_shapes_from_db()),
+            ('tracks', annotation.iter_tracks_from_db()),
+        ):
+            buffer.write(f',"{field}":[')
+
+            for i, obj in enumerate(objects):
+                if i:
+                    buffer.write(',')
+                buffer.write(encoder.encode(obj))
+
+                if buffer_size <= buffer.tell():
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            buffer.write(']')
+
+        buffer.write('}')
+        yield buffer.getvalue().encode()
+
+    return _stream()
+
 @silk_profile(name="POST job data")
 @transaction.atomic
 def put_job_data(pk, data):
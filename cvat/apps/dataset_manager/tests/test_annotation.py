@@ -2,10 +2,15 @@
 #
 # SPDX-License-Identifier: MIT
 
-from cvat.apps.dataset_manager.annotation import TrackManager
+from cvat.apps.dataset_manager.annotation import (
+    AnnotationIR, ObjectManager, ShapeManager, TrackManager
+)
+from cvat.apps.dataset_manager.annotation_columns import ColumnarAnnotationIR
 
 from unittest import TestCase
 
+import numpy as np
+
 
 class TrackManagerTest(TestCase):
     def _check_interpolation(self, track):
@@ -324,3 +329,124 @@ class TrackManagerTest(TestCase):
 
         interpolated_shapes = TrackManager.get_interpolated_shapes(track, 0, 3, '2d')
         self.assertEqual(expected_shapes, interpolated_shapes)
+
+
+class ColumnarAnnotationIRTest(TestCase):
+    def _make_shape(self, frame, **kwargs):
+        return {
+            "id": None,
+            "frame": frame,
+            "label_id": 1,
+            "group": None,
+            "source": "manual",
+            "attributes": [{"spec_id": 1, "value": str(frame)}],
+            "type": "rectangle",
+            "occluded": False,
+            "outside": False,
+            "z_order": 0,
+            "rotation": 0.0,
+            "points": [float(frame), 1.0, 2.0, 3.0],
+            "elements": [],
+            **kwargs,
+        }
+
+    def _make_data(self):
+        shapes = [self._make_shape(frame) for frame in [5, 0, 3, 10, 3, 7]]
+        shapes.append(self._make_shape(4, id=15, type="skeleton", points=[], elements=[
+            self._make_shape(4, id=16, type="points", points=[1.0, 2.0], group=2,
+                source="auto", attributes=[]),
+            self._make_shape(4, id=17, type="points", points=[3.0, 4.0], outside=True),
+        ]))
+        for element in shapes[-1]["elements"]:
+            element.pop("elements")
+
+        tags = [
+            {"id": 1, "frame": frame, "label_id": 2, "group": 0, "source": "file", "attributes": []}
+            for frame in [1, 9, 2]
+        ]
+
+        return {"version": 0, "tags": tags, "shapes": shapes, "tracks": []}
+
+    def test_can_convert_annotations(self):
+        data = self._make_data()
+
+        columnar_ir = ColumnarAnnotationIR.from_ir(AnnotationIR("2d", data))
+
+        self.assertEqual(data, columnar_ir.to_ir().data)
+
+    def test_can_keep_original_values(self):
+        data = self._make_data()
+        data["shapes"][0].update(
+            label_id=None, source=None, attributes=[{"spec_id": 1, "value": 5}],
+        )
+        data["tags"][0].update(source=None)
+
+        columnar_ir = ColumnarAnnotationIR.from_ir(AnnotationIR("2d", data))
+
+        self.assertEqual(data, columnar_ir.to_ir().data)
+
+    def test_can_restore_default_values(self):
+        data = self._make_data()
+        data["shapes"][0].update(occluded=None, outside=None, z_order=None, rotation=None)
+        data["shapes"][1].pop("z_order")
+
+        columnar_ir = ColumnarAnnotationIR.from_ir(AnnotationIR("2d", data))
+
+        restored_shapes = columnar_ir.to_ir().data["shapes"]
+        for restored_shape in restored_shapes[:2]:
+            self.assertEqual(restored_shape["occluded"], False)
+            self.assertEqual(restored_shape["outside"], False)
+            self.assertEqual(restored_shape["z_order"], 0)
+            self.assertEqual(restored_shape["rotation"], 0.0)
+
+    def test_can_slice_annotations(self):
+        data = self._make_data()
+        ir = AnnotationIR("2d", data)
+        columnar_ir = ColumnarAnnotationIR.from_ir(ir)
+
+        for start, stop in [(0, 3), (3, 4), (4, 4), (6, 6), (8, 20), (0, 20)]:
+            with self.subTest(start=start, stop=stop):
+                self.assertEqual(
+                    ir.slice(start, stop).data, columnar_ir.slice(start, stop).to_ir().data
+                )
+
+
+class ShapeManagerTest(TestCase):
+    def _make_shapes(self):
+        rectangles = [
+            {"type": "rectangle", "label_id": 1, "points": [0.0, 0.0, 10.0, 10.0]},
+            {"type": "rectangle", "label_id": 1, "points": [15.0, 15.0, 5.0, 5.0]},
+            {"type": "rectangle", "label_id": 1, "points": [5.0, 5.0, 5.0, 20.0]},
+            {"type": "rectangle", "label_id": 2, "points": [0.0, 0.0, 10.0, 10.0]},
+        ]
+        polygons = [
+            {"type": "polygon", "label_id": 1, "points": [0.0, 0.0, 10.0, 0.0, 5.0, 10.0]},
+            {"type": "polygon", "label_id": 1, "points": [2.0, 2.0, 12.0, 2.0, 12.0, 8.0]},
+            {"type": "polygon", "label_id": 1, "points": [50.0, 50.0, 60.0, 50.0, 60.0, 60.0]},
+            # self-intersecting
+            {"type": "polygon", "label_id": 1,
+                "points": [0.0, 0.0, 10.0, 10.0, 10.0, 0.0, 0.0, 10.0]},
+        ]
+        cuboids = [
+            {"type": "cuboid", "label_id": 1,
+                "points": [x, 1.0, 2.0, 0.0, 0.0, 0.0, 4.0, 2.0, 3.0] + [0.0] * 7}
+            for x in [0.0, 1.0, 3.5, 10.0]
+        ]
+        others = [
+            {"type": "points", "label_id": 1, "points": [1.0, 2.0]},
+        ]
+        return rectangles + polygons + cuboids + others
+
+    def test_similarity_matrix_matches_pairwise_similarity(self):
+        shapes0 = self._make_shapes()
+        shapes1 = list(reversed(self._make_shapes()))
+
+        for dimension in ["2d", "3d"]:
+            with self.subTest(dimension=dimension):
+                expected = ObjectManager._calc_objects_similarity_matrix.__func__(
+                    ShapeManager, shapes0, shapes1, 0, 0, dimension)
+                actual = ShapeManager._calc_objects_similarity_matrix(
+                    shapes0, shapes1, 0, 0, dimension)
+
+                self.assertTrue(np.any(expected))
+                self.assertTrue(np.array_equal(expected, actual))
@@ -29,12 +29,13 @@ from datumaro.components.dataset import Dataset
 from datumaro.components.operations import ExactComparator
 from datumaro.util.test_utils import TestDir
 from django.contrib.auth.models import Group, User
+from django.test import override_settings
 from PIL import Image
 from rest_framework import status
 
 import cvat.apps.dataset_manager as dm
 from cvat.apps.dataset_manager.bindings import CvatTaskOrJobDataExtractor, TaskData
-from cvat.apps.dataset_manager.task import TaskAnnotation
+from cvat.apps.dataset_manager.task import JobAnnotation, TaskAnnotation
 from cvat.apps.dataset_manager.util import get_export_cache_lock
 from cvat.apps.dataset_manager.views import clear_export_cache, export, parse_export_file_path
 from cvat.apps.engine.models import Task
@@ -1291,6 +1292,253 @@ class TaskDumpUploadTest(_DbTestBase):
                             self._upload_file(url, binary_file, self.admin)
 
 
+class JobAnnotationsStreamingTest(_DbTestBase):
+    def _create_task_with_annotations(self):
+        task = self._create_task({
+            "name": "streamed job annotations",
+            "overlap": 0,
+            "segment_size": 10,
+            "labels": [
+                {
+                    "name": "car",
+                    "attributes": [
+                        {
+                            "name": "model",
+                            "mutable": False,
+                            "input_type": "select",
+                            "default_value": "bmw",
+                            "values": ["bmw", "mazda"],
+                        },
+                        {
+                            "name": "color",
+                            "mutable": True,
+                            "input_type": "select",
+                            "default_value": "red",
+                            "values": ["red", "blue"],
+                        },
+                    ],
+                },
+                tasks["many jobs skeleton"]["labels"][0],
+            ],
+        }, self._generate_task_images(20))
+
+        labels = {label["name"]: label for label in task["labels"]}
+        car, skeleton = labels["car"], labels["skeleton"]
+        model_id, color_id = (attr["id"] for attr in car["attributes"])
+        skeleton_attr_id = skeleton["attributes"][0]["id"]
+
+        def _shape(frame, label_id, shape_type, points, attributes=(), **kwargs):
+            return {
+                "type": shape_type, "frame": frame, "label_id": label_id, "points": points,
+                "occluded": False, "outside": False, "z_order": 0, "rotation": 0,
+                "group": 0, "source": "manual", "attributes": list(attributes), **kwargs,
+            }
+
+        def _track_shape(frame, shape_type, points, attributes=(), **kwargs):
+            shape = _shape(frame, None, shape_type, points, attributes, **kwargs)
+            for field in ["label_id", "group", "source"]:
+                shape.pop(field)
+            return shape
+
+        def _skeleton_elements(frame, offset):
+            return [
+                _shape(frame, sublabel["id"], "points", [offset + i, offset + 2 * i])
+                for i, sublabel in enumerate(skeleton["sublabels"])
+            ]
+
+        def _skeleton_element_tracks(frame, offset):
+            return [
+                {
+                    "frame": frame, "label_id": sublabel["id"], "group": 0,
+                    "source": "manual", "attributes": [],
+                    "shapes": [
+                        _track_shape(frame, "points", [offset + i, offset + 2 * i]),
+                        _track_shape(frame + 3, "points", [offset + i + 1, offset + 2 * i]),
+                    ],
+                }
+                for i, sublabel in enumerate(skeleton["sublabels"])
+            ]
+
+        car_attributes = [
+            {"spec_id": model_id, "value": "mazda"},
+            {"spec_id": color_id, "value": "blue"},
+        ]
+
+        job_annotations = {
+            "version": 0,
+            "tags": [
+                {
+                    "frame": frame, "label_id": car["id"], "group": 0, "source": "manual",
+                    "attributes": car_attributes,
+                }
+                for frame in [0, 3, 3]
+            ],
+            "shapes": [
+                _shape(1, car["id"], "rectangle", [1.5, 2.25, 10, 20.125], car_attributes),
+                _shape(1, car["id"], "rectangle", [3, 4, 30, 40], car_attributes, z_order=1),
+                _shape(2, car["id"], "polygon", [1, 1, 5, 1, 5, 5], car_attributes[:1]),
+                _shape(4, skeleton["id"], "skeleton", [],
+                    [{"spec_id": skeleton_attr_id, "value": "2"}],
+                    elements=_skeleton_elements(4, 10),
+                ),
+                _shape(4, skeleton["id"], "skeleton", [], elements=_skeleton_elements(4, 20)),
+            ],
+            "tracks": [
+                {
+                    "frame": 0, "label_id": car["id"], "group": 0, "source": "manual",
+                    "attributes": [{"spec_id": model_id, "value": "bmw"}],
+                    "shapes": [
+                        _track_shape(frame, "rectangle", [frame, frame, 10 + frame, 10],
+                            [{"spec_id": color_id, "value": color}], outside=outside)
+                        for frame, color, outside in [
+                            (0, "red", False), (2, "blue", False),
+                            (5, "blue", False), (7, "red", True),
+                        ]
+                    ],
+                },
+                {
+                    "frame": 3, "label_id": skeleton["id"], "group": 0, "source": "manual",
+                    "attributes": [{"spec_id": skeleton_attr_id, "value": "3"}],
+                    "shapes": [
+                        _track_shape(3, "skeleton", []),
+                        _track_shape(6, "skeleton", []),
+                    ],
+                    "elements": _skeleton_element_tracks(3, 5),
+                },
+            ],
+        }
+
+        job_id = min(self._get_jobs(task["id"]), key=lambda job: job["start_frame"])["id"]
+        response = self._put_api_v2_job_id_annotations(job_id, job_annotations)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, msg=response.json())
+
+        return job_id
+
+    def _get_job_annotations(self, job_id, *, streaming_min_objects):
+        with override_settings(JOB_ANNOTATIONS_STREAMING_MIN_OBJECTS=streaming_min_objects):
+            response = self._get_request(f"/api/jobs/{job_id}/annotations", self.admin)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_can_get_streamed_job_annotations(self):
+        job_id = self._create_task_with_annotations()
+
+        response = self._get_job_annotations(job_id, streaming_min_objects=0)
+        self.assertFalse(response.streaming)
+        expected = response.json()
+        self.assertEqual([3, 5, 2], [len(expected[f]) for f in ["tags", "shapes", "tracks"]])
+
+        response = self._get_job_annotations(job_id, streaming_min_objects=1)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(expected, json.loads(b"".join(response.streaming_content)))
+
+    def test_can_get_non_streamed_job_annotations_below_threshold(self):
+        job_id = self._create_task_with_annotations()
+
+        response = self._get_job_annotations(job_id, streaming_min_objects=11)
+        self.assertFalse(response.streaming)
+
+        response = self._get_job_annotations(job_id, streaming_min_objects=10)
+        self.assertTrue(response.streaming)
+
+
+class TaskAnnotationLoadingTest(_DbTestBase):
+    def _create_task_with_annotations(self):
+        task = self._create_task(tasks["many jobs skeleton"], self._generate_task_images(25))
+        skeleton = task["labels"][0]
+        skeleton_attributes = [{"spec_id": skeleton["attributes"][0]["id"], "value": "2"}]
+
+        def _shape(frame, label_id, shape_type, points, attributes=()):
+            return {
+                "type": shape_type, "frame": frame, "label_id": label_id, "points": points,
+                "occluded": False, "outside": False, "z_order": 0, "rotation": 0,
+                "group": 0, "source": "manual", "attributes": list(attributes),
+            }
+
+        def _skeleton_shape(frame, offset):
+            shape = _shape(frame, skeleton["id"], "skeleton", [], skeleton_attributes)
+            shape["elements"] = [
+                _shape(frame, sublabel["id"], "points", [offset + 10 * i, offset + 5 * i])
+                for i, sublabel in enumerate(skeleton["sublabels"])
+            ]
+            return shape
+
+        def _track_shapes(shape_type, points, frames):
+            return [
+                {
+                    "type": shape_type, "frame": frame, "points": points(frame),
+                    "occluded": False, "outside": frame == frames[-1], "z_order": 0,
+                    "rotation": 0, "attributes": [],
+                }
+                for frame in frames
+            ]
+
+        # the track goes through all the jobs, the keyframes are in the job overlaps
+        track_frames = [2, 8, 13, 24]
+        skeleton_track = {
+            "frame": track_frames[0], "label_id": skeleton["id"], "group": 0,
+            "source": "manual", "attributes": skeleton_attributes,
+            "shapes": _track_shapes("skeleton", lambda frame: [], track_frames),
+            "elements": [
+                {
+                    "frame": track_frames[0], "label_id": sublabel["id"], "group": 0,
+                    "source": "manual", "attributes": [],
+                    "shapes": _track_shapes(
+                        "points", lambda frame, i=i: [frame + 10 * i, frame], track_frames
+                    ),
+                }
+                for i, sublabel in enumerate(skeleton["sublabels"])
+            ],
+        }
+
+        response = self._put_api_v2_task_id_annotations(task["id"], {
+            "version": 0,
+            "tags": [],
+            "shapes": [_skeleton_shape(frame, 10 * frame) for frame in [3, 7, 12, 17, 22]],
+            "tracks": [skeleton_track],
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # make the job annotations in an overlap different
+        second_job = sorted(self._get_jobs(task["id"]), key=lambda job: job["start_frame"])[1]
+        with ForceLogin(self.admin, self.client):
+            response = self.client.patch(
+                f"/api/jobs/{second_job['id']}/annotations?action=create",
+                data={
+                    "version": 0, "tags": [], "tracks": [],
+                    "shapes": [_skeleton_shape(12, 121), _skeleton_shape(14, 140)],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return task["id"]
+
+    def test_can_load_task_annotations_from_several_jobs(self):
+        task_id = self._create_task_with_annotations()
+
+        # the job annotations are read and merged one by one
+        expected = TaskAnnotation(task_id)
+        for db_job in expected.db_jobs.select_for_update():
+            job_annotation = JobAnnotation(db_job.id)
+            job_annotation.init_from_db()
+            if job_annotation.ir_data.version > expected.ir_data.version:
+                expected.ir_data.version = job_annotation.ir_data.version
+            expected._merge_data(
+                job_annotation.ir_data, db_job.segment.start_frame,
+                expected.db_task.overlap, expected.db_task.dimension,
+            )
+
+        actual = TaskAnnotation(task_id)
+        actual.init_from_db()
+
+        self.assertLess(1, len(actual.db_jobs))
+        self.assertTrue(actual.ir_data.shapes)
+        self.assertTrue(actual.ir_data.tracks)
+        self.assertEqual(expected.ir_data.data, actual.ir_data.data)
+
+
 class ExportBehaviorTest(_DbTestBase):
     @define
     class SharedBase:
@@ -22,6 +22,7 @@ from django.conf import settings
 from django.db import models
 from pottery import Redlock
 
+from cvat.apps.engine.lazy_list import PackedFloatList
 from cvat.apps.engine.models import Job, Project, Task
 
 
@@ -86,6 +87,9 @@ def deepcopy_simple(v):
 
     if isinstance(v, dict):
         return {k: deepcopy_simple(vv) for k, vv in v.items()}
+    elif isinstance(v, PackedFloatList):
+        # can be copied without unpacking
+        return deepcopy(v)
     elif isinstance(v, (list, tuple, set)):
         return type(v)(deepcopy_simple(vv) for vv in v)
     elif isinstance(v, (int, float, str, bool)) or v is None:
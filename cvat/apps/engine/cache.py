@@ -5,13 +5,18 @@
 
 from __future__ import annotations
 
+import hashlib
 import io
 import os
 import os.path
 import pickle  # nosec
 import tempfile
+import threading
+import time
 import zipfile
 import zlib
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 from contextlib import ExitStack, closing
 from datetime import datetime, timezone
 from itertools import groupby, pairwise
@@ -26,22 +31,21 @@ from typing import (
     Tuple,
     Type,
     Union,
-    overload,
 )
+from uuid import uuid4
 
 import av
 import cv2
 import PIL.Image
 import PIL.ImageOps
-from django.core.cache import caches
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.exceptions import NotFound, ValidationError
 
 from cvat.apps.engine import models
-from cvat.apps.engine.cloud_provider import (
-    Credentials,
-    db_storage_to_storage_instance,
-    get_cloud_storage_instance,
-)
+from cvat.apps.engine.cloud_provider import db_storage_to_storage_instance
+from cvat.apps.engine.disk_store import DiskFileStore
 from cvat.apps.engine.log import ServerLogManager
 from cvat.apps.engine.media_extractors import (
     FrameQuality,
@@ -61,12 +65,214 @@ slogger = ServerLogManager(__name__)
 
 
 DataWithMime = Tuple[io.BytesIO, str]
-_CacheItem = Tuple[io.BytesIO, str, int]
+DataWithMimeAndChecksum = Tuple[io.BytesIO, str, int]
+_CacheItem = DataWithMimeAndChecksum
+
+
+class _LocalCache:
+    """
+    A process-local LRU cache for media cache items, limited by the total item size
+    """
+
+    def __init__(self, *, max_size: int, ttl: int) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._size = 0
+        self._items: OrderedDict[str, Tuple[bytes, str, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[_CacheItem]:
+        with self._lock:
+            entry = self._items.get(key)
+            if not entry:
+                return None
+
+            data, mime, checksum, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+
+            self._items.move_to_end(key)
+
+        # BytesIO shares the immutable bytes object until it is modified
+        return io.BytesIO(data), mime, checksum
+
+    def set(self, key: str, item: _CacheItem) -> None:
+        data = item[0].getvalue()
+        if not data or self._max_size < len(data):
+            return
+
+        with self._lock:
+            self._remove(key)
+
+            self._items[key] = (data, item[1], item[2], time.monotonic() + self._ttl)
+            self._size += len(data)
+
+            while self._max_size < self._size:
+                self._remove(next(iter(self._items)))
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._items if k.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._items.pop(key, None)
+        if entry:
+            self._size -= len(entry[0])
+
+
+_local_cache: Optional[_LocalCache] = None
+
+
+def _get_local_cache() -> Optional[_LocalCache]:
+    global _local_cache
+
+    if not settings.MEDIA_CACHE_LOCAL_MAX_SIZE:
+        return None
+
+    if _local_cache is None:
+        _local_cache = _LocalCache(
+            max_size=settings.MEDIA_CACHE_LOCAL_MAX_SIZE, ttl=settings.MEDIA_CACHE_LOCAL_TTL
+        )
+
+    return _local_cache
+
+
+class _ItemStorage(metaclass=ABCMeta):
+    @abstractmethod
+    def get(self, key: str) -> Optional[_CacheItem]: ...
+
+    @abstractmethod
+    def set(self, key: str, item: _CacheItem) -> None: ...
+
+    @abstractmethod
+    def has_key(self, key: str) -> bool: ...
+
+
+class _CacheItemStorage(_ItemStorage):
+    """
+    Stores the items in the "media" cache
+    """
+
+    @property
+    def _cache(self) -> BaseCache:
+        return caches["media"]
+
+    def get(self, key: str) -> Optional[_CacheItem]:
+        return self._cache.get(key)
+
+    def set(self, key: str, item: _CacheItem) -> None:
+        self._cache.set(key, item)
+
+    def has_key(self, key: str) -> bool:
+        return self._cache.has_key(key)
+
+
+class _DiskItemStorage(_ItemStorage):
+    """
+    Stores the item data in content-addressed files in a directory,
+    and the item metadata in the "media" cache.
+
+    The files are written atomically, so readers never see partially written data.
+    The total size of the files is limited, the least recently used files are removed
+    in a background thread.
+    """
+
+    def __init__(self, root_dir: str, *, max_size: int, sweep_interval: int) -> None:
+        self._files = DiskFileStore(
+            "media_cache_disk_storage",
+            root_dir,
+            max_size=max_size,
+            sweep_interval=sweep_interval,
+        )
+
+    @property
+    def _cache(self) -> BaseCache:
+        return caches["media"]
+
+    def _make_metadata_key(self, key: str) -> str:
+        return f"{key}_disk"
+
+    def _get_data_path(self, digest: str) -> str:
+        return self._files.get_path(digest[:2], digest[2:4], digest)
+
+    def _get_metadata(self, key: str) -> Optional[Tuple[str, str, int]]:
+        return self._cache.get(self._make_metadata_key(key))
+
+    def get(self, key: str) -> Optional[_CacheItem]:
+        metadata = self._get_metadata(key)
+        if not metadata:
+            return None
+
+        digest, mime, checksum = metadata
+        data = self._files.read_file(self._get_data_path(digest))
+        if data is None:
+            # the file was removed because of the size limit
+            self._cache.delete(self._make_metadata_key(key))
+            return None
+
+        return io.BytesIO(data), mime, checksum
+
+    def set(self, key: str, item: _CacheItem) -> None:
+        with item[0].getbuffer() as data:
+            digest = hashlib.sha256(data).hexdigest()
+            data_path = self._get_data_path(digest)
+
+            if not self._files.touch_file(data_path):
+                self._files.write_file(data_path, data)
+
+        self._cache.set(self._make_metadata_key(key), (digest, item[1], item[2]))
+
+    def has_key(self, key: str) -> bool:
+        metadata = self._get_metadata(key)
+        return bool(metadata) and os.path.isfile(self._get_data_path(metadata[0]))
+
+
+_item_storage: Optional[_ItemStorage] = None
+
+
+def _get_item_storage() -> _ItemStorage:
+    global _item_storage
+
+    if _item_storage is None:
+        if settings.MEDIA_CACHE_STORAGE == "redis":
+            _item_storage = _CacheItemStorage()
+        elif settings.MEDIA_CACHE_STORAGE == "disk":
+            _item_storage = _DiskItemStorage(
+                settings.MEDIA_CACHE_DISK_ROOT or os.path.join(settings.CACHE_ROOT, "media"),
+                max_size=settings.MEDIA_CACHE_DISK_MAX_SIZE,
+                sweep_interval=settings.MEDIA_CACHE_DISK_SWEEP_INTERVAL,
+            )
+        else:
+            raise ImproperlyConfigured(
+                f"Unknown media cache storage '{settings.MEDIA_CACHE_STORAGE}'"
+            )
+
+    return _item_storage
 
 
 class MediaCache:
+    _METRIC_BUILDS = "builds"
+    _METRIC_LOCK_WAITS = "lock_waits"
+    _METRIC_LOCK_WAIT_HITS = "lock_wait_hits"
+    _METRIC_LOCK_WAIT_TIMEOUTS = "lock_wait_timeouts"
+    _METRICS = (
+        _METRIC_BUILDS,
+        _METRIC_LOCK_WAITS,
+        _METRIC_LOCK_WAIT_HITS,
+        _METRIC_LOCK_WAIT_TIMEOUTS,
+    )
+
     def __init__(self) -> None:
         self._cache = caches["media"]
+        self._storage = _get_item_storage()
+        self._local_cache = _get_local_cache()
 
     def _get_checksum(self, value: bytes) -> int:
         return zlib.crc32(value)
@@ -82,36 +288,162 @@ class MediaCache:
             item_data_bytes = item_data[0].getvalue()
             item = (item_data[0], item_data[1], self._get_checksum(item_data_bytes))
             if item_data_bytes:
-                self._cache.set(key, item)
+                self._storage.set(key, item)
+
+                if self._local_cache:
+                    self._local_cache.set(key, item)
 
             return item
 
         item = self._get_cache_item(key)
+        if item and not self._validate_cache_item(item):
+            slogger.glob.info(f"Recreating cache item {key} due to checksum mismatch")
+            item = None
+
         if not item:
-            item = create_item()
-        else:
-            # compare checksum
-            item_data = item[0].getbuffer() if isinstance(item[0], io.BytesIO) else item[0]
-            item_checksum = item[2] if len(item) == 3 else None
-            if item_checksum != self._get_checksum(item_data):
-                slogger.glob.info(f"Recreating cache item {key} due to checksum mismatch")
-                item = create_item()
+            item = self._create_cache_item_once(key, create_item)
+
+        return item
+
+    def _validate_cache_item(self, item: _CacheItem) -> bool:
+        item_data = item[0].getbuffer() if isinstance(item[0], io.BytesIO) else item[0]
+        item_checksum = item[2] if len(item) == 3 else None
+        return item_checksum == self._get_checksum(item_data)
+
+    def _make_build_lock_key(self, key: str) -> str:
+        return f"{key}_build_lock"
+
+    def _create_cache_item_once(
+        self, key: str, create_item: Callable[[], _CacheItem]
+    ) -> _CacheItem:
+        # Many workers can request the same missing item at the same time
+        # (e.g. when several annotators open a new job). Only one of them
+        # builds the item, the others wait until it appears in the cache.
+        lock_key = self._make_build_lock_key(key)
+        lock_token = uuid4().hex
+        lock_timeout = settings.MEDIA_CACHE_BUILD_LOCK_TIMEOUT
+        wait_deadline = time.monotonic() + lock_timeout
+        is_waiting = False
+
+        while True:
+            # add() is atomic in the cache backend and works as a lock with expiration
+            if self._cache.add(lock_key, lock_token, timeout=lock_timeout):
+                try:
+                    if is_waiting:
+                        # The item could be created between the last check and the lock release
+                        item = self._get_cache_item_nowait(key)
+                        if item:
+                            self._increment_metric(self._METRIC_LOCK_WAIT_HITS)
+                            return item
+
+                    self._increment_metric(self._METRIC_BUILDS)
+                    return create_item()
+                finally:
+                    # The lock could expire and be taken by another worker,
+                    # don't release a lock that doesn't belong to this worker
+                    if self._cache.get(lock_key) == lock_token:
+                        self._cache.delete(lock_key)
+
+            if not is_waiting:
+                self._increment_metric(self._METRIC_LOCK_WAITS)
+                slogger.glob.info(
+                    f"Waiting for another worker to prepare chunk: key {key}, "
+                    f"media cache build metrics: {self.get_metrics()}"
+                )
+                is_waiting = True
+
+            time.sleep(settings.MEDIA_CACHE_BUILD_WAIT_POLL_INTERVAL)
+
+            item = self._get_cache_item_nowait(key)
+            if item:
+                self._increment_metric(self._METRIC_LOCK_WAIT_HITS)
+                return item
+
+            if wait_deadline < time.monotonic():
+                self._increment_metric(self._METRIC_LOCK_WAIT_TIMEOUTS)
+                self._increment_metric(self._METRIC_BUILDS)
+                slogger.glob.warning(
+                    f"Timed out waiting for another worker to prepare chunk: key {key}, "
+                    f"media cache build metrics: {self.get_metrics()}"
+                )
+                return create_item()
+
+    def _get_cache_item_nowait(self, key: str) -> Optional[_CacheItem]:
+        try:
+            item = self._storage.get(key)
+        except pickle.UnpicklingError:
+            item = None
+
+        if item and not self._validate_cache_item(item):
+            item = None
 
         return item
 
+    def _make_metric_key(self, metric: str) -> str:
+        return f"media_cache_metrics_{metric}"
+
+    def _increment_metric(self, metric: str) -> None:
+        metric_key = self._make_metric_key(metric)
+        try:
+            self._cache.add(metric_key, 0, timeout=None)
+            self._cache.incr(metric_key)
+        except Exception:
+            # metrics must not affect data access
+            slogger.glob.warning(f"Failed to update media cache metric {metric}", exc_info=True)
+
+    def get_metrics(self) -> dict[str, int]:
+        """
+        Returns the media cache item build counters, shared by all the server workers:
+        - builds - the number of items built by workers
+        - lock_waits - the number of requests that waited for another worker to build the item
+        - lock_wait_hits - the number of waiting requests that received the built item
+        - lock_wait_timeouts - the number of waiting requests that had to build the item
+        """
+
+        values = self._cache.get_many([self._make_metric_key(m) for m in self._METRICS])
+        return {m: int(values.get(self._make_metric_key(m), 0)) for m in self._METRICS}
+
     def _get_cache_item(self, key: str) -> Optional[_CacheItem]:
+        if self._local_cache and (item := self._local_cache.get(key)):
+            return item
+
         slogger.glob.info(f"Starting to get chunk from cache: key {key}")
         try:
-            item = self._cache.get(key)
+            item = self._storage.get(key)
         except pickle.UnpicklingError:
             slogger.glob.error(f"Unable to get item from cache: key {key}", exc_info=True)
             item = None
         slogger.glob.info(f"Ending to get chunk from cache: key {key}, is_cached {bool(item)}")
 
+        if item and self._local_cache and self._validate_cache_item(item):
+            self._local_cache.set(key, item)
+
         return item
 
     def _has_key(self, key: str) -> bool:
-        return self._cache.has_key(key)
+        if self._local_cache and self._local_cache.get(key):
+            return True
+
+        return self._storage.has_key(key)
+
+    def remove_local_items(
+        self,
+        db_obj: Union[models.Task, models.Segment, models.Job, models.CloudStorage, models.Data],
+    ) -> None:
+        """
+        Removes the items related to the object from the in-process cache.
+        The shared cache items are not affected.
+        """
+
+        if not self._local_cache:
+            return
+
+        if isinstance(db_obj, models.Data):
+            prefix = f"context_image_{db_obj.id}"
+        else:
+            prefix = self._make_cache_key_prefix(db_obj)
+
+        self._local_cache.delete_prefix(prefix + "_")
 
     def _make_cache_key_prefix(
         self, obj: Union[models.Task, models.Segment, models.Job, models.CloudStorage]
@@ -151,35 +483,26 @@ class MediaCache:
     def _make_context_image_preview_key(self, db_data: models.Data, frame_number: int) -> str:
         return f"context_image_{db_data.id}_{frame_number}_preview"
 
-    @overload
-    def _to_data_with_mime(self, cache_item: _CacheItem) -> DataWithMime: ...
-
-    @overload
-    def _to_data_with_mime(self, cache_item: Optional[_CacheItem]) -> Optional[DataWithMime]: ...
-
-    def _to_data_with_mime(self, cache_item: Optional[_CacheItem]) -> Optional[DataWithMime]:
-        if not cache_item:
-            return None
-
-        return cache_item[:2]
-
     def get_or_set_segment_chunk(
         self, db_segment: models.Segment, chunk_number: int, *, quality: FrameQuality
-    ) -> DataWithMime:
-        return self._to_data_with_mime(
-            self._get_or_set_cache_item(
-                key=self._make_chunk_key(db_segment, chunk_number, quality=quality),
-                create_callback=lambda: self.prepare_segment_chunk(
-                    db_segment, chunk_number, quality=quality
-                ),
-            )
+    ) -> DataWithMimeAndChecksum:
+        return self._get_or_set_cache_item(
+            key=self._make_chunk_key(db_segment, chunk_number, quality=quality),
+            create_callback=lambda: self.prepare_segment_chunk(
+                db_segment, chunk_number, quality=quality
+            ),
         )
 
+    def has_segment_chunk(
+        self, db_segment: models.Segment, chunk_number: int, *, quality: FrameQuality
+    ) -> bool:
+        return self._has_key(self._make_chunk_key(db_segment, chunk_number, quality=quality))
+
     def get_task_chunk(
         self, db_task: models.Task, chunk_number: int, *, quality: FrameQuality
-    ) -> Optional[DataWithMime]:
-        return self._to_data_with_mime(
-            self._get_cache_item(key=self._make_chunk_key(db_task, chunk_number, quality=quality))
+    ) -> Optional[DataWithMimeAndChecksum]:
+        return self._get_cache_item(
+            key=self._make_chunk_key(db_task, chunk_number, quality=quality)
         )
 
     def get_or_set_task_chunk(
@@ -189,21 +512,17 @@ class MediaCache:
         *,
         quality: FrameQuality,
         set_callback: Callable[[], DataWithMime],
-    ) -> DataWithMime:
-        return self._to_data_with_mime(
-            self._get_or_set_cache_item(
-                key=self._make_chunk_key(db_task, chunk_number, quality=quality),
-                create_callback=set_callback,
-            )
+    ) -> DataWithMimeAndChecksum:
+        return self._get_or_set_cache_item(
+            key=self._make_chunk_key(db_task, chunk_number, quality=quality),
+            create_callback=set_callback,
         )
 
     def get_segment_task_chunk(
         self, db_segment: models.Segment, chunk_number: int, *, quality: FrameQuality
-    ) -> Optional[DataWithMime]:
-        return self._to_data_with_mime(
-            self._get_cache_item(
-                key=self._make_segment_task_chunk_key(db_segment, chunk_number, quality=quality)
-            )
+    ) -> Optional[DataWithMimeAndChecksum]:
+        return self._get_cache_item(
+            key=self._make_segment_task_chunk_key(db_segment, chunk_number, quality=quality)
         )
 
     def get_or_set_segment_task_chunk(
@@ -213,53 +532,45 @@ class MediaCache:
         *,
         quality: FrameQuality,
         set_callback: Callable[[], DataWithMime],
-    ) -> DataWithMime:
-        return self._to_data_with_mime(
-            self._get_or_set_cache_item(
-                key=self._make_segment_task_chunk_key(db_segment, chunk_number, quality=quality),
-                create_callback=set_callback,
-            )
+    ) -> DataWithMimeAndChecksum:
+        return self._get_or_set_cache_item(
+            key=self._make_segment_task_chunk_key(db_segment, chunk_number, quality=quality),
+            create_callback=set_callback,
         )
 
     def get_or_set_selective_job_chunk(
         self, db_job: models.Job, chunk_number: int, *, quality: FrameQuality
-    ) -> DataWithMime:
-        return self._to_data_with_mime(
-            self._get_or_set_cache_item(
-                key=self._make_chunk_key(db_job, chunk_number, quality=quality),
-                create_callback=lambda: self.prepare_masked_range_segment_chunk(
-                    db_job.segment, chunk_number, quality=quality
-                ),
-            )
+    ) -> DataWithMimeAndChecksum:
+        return self._get_or_set_cache_item(
+            key=self._make_chunk_key(db_job, chunk_number, quality=quality),
+            create_callback=lambda: self.prepare_masked_range_segment_chunk(
+                db_job.segment, chunk_number, quality=quality
+            ),
         )
 
-    def get_or_set_segment_preview(self, db_segment: models.Segment) -> DataWithMime:
-        return self._to_data_with_mime(
-            self._get_or_set_cache_item(
-                self._make_preview_key(db_segment),
-                create_callback=lambda: self._prepare_segment_preview(db_segment),
-            )
+    def get_or_set_segment_preview(self, db_segment: models.Segment) -> DataWithMimeAndChecksum:
+        return self._get_or_set_cache_item(
+            self._make_preview_key(db_segment),
+            create_callback=lambda: self._prepare_segment_preview(db_segment),
         )
 
-    def get_cloud_preview(self, db_storage: models.CloudStorage) -> Optional[DataWithMime]:
-        return self._to_data_with_mime(self._get_cache_item(self._make_preview_key(db_storage)))
+    def get_cloud_preview(
+        self, db_storage: models.CloudStorage
+    ) -> Optional[DataWithMimeAndChecksum]:
+        return self._get_cache_item(self._make_preview_key(db_storage))
 
-    def get_or_set_cloud_preview(self, db_storage: models.CloudStorage) -> DataWithMime:
-        return self._to_data_with_mime(
-            self._get_or_set_cache_item(
-                self._make_preview_key(db_storage),
-                create_callback=lambda: self._prepare_cloud_preview(db_storage),
-            )
+    def get_or_set_cloud_preview(self, db_storage: models.CloudStorage) -> DataWithMimeAndChecksum:
+        return self._get_or_set_cache_item(
+            self._make_preview_key(db_storage),
+            create_callback=lambda: self._prepare_cloud_preview(db_storage),
         )
 
     def get_or_set_frame_context_images_chunk(
         self, db_data: models.Data, frame_number: int
-    ) -> DataWithMime:
-        return self._to_data_with_mime(
-            self._get_or_set_cache_item(
-                key=self._make_context_image_preview_key(db_data, frame_number),
-                create_callback=lambda: self.prepare_context_images_chunk(db_data, frame_number),
-            )
+    ) -> DataWithMimeAndChecksum:
+        return self._get_or_set_cache_item(
+            key=self._make_context_image_preview_key(db_data, frame_number),
+            create_callback=lambda: self.prepare_context_images_chunk(db_data, frame_number),
         )
 
     def _read_raw_images(
@@ -276,46 +587,55 @@ class MediaCache:
             with ExitStack() as es:
                 db_cloud_storage = db_data.cloud_storage
                 assert db_cloud_storage, "Cloud storage instance was deleted"
-                credentials = Credentials()
-                credentials.convert_from_db(
-                    {
-                        "type": db_cloud_storage.credentials_type,
-                        "value": db_cloud_storage.credentials,
-                    }
-                )
-                details = {
-                    "resource": db_cloud_storage.resource,
-                    "credentials": credentials,
-                    "specific_attributes": db_cloud_storage.get_specific_attributes(),
-                }
-                cloud_storage_instance = get_cloud_storage_instance(
-                    cloud_provider=db_cloud_storage.provider_type, **details
-                )
+                cloud_storage_instance = db_storage_to_storage_instance(db_cloud_storage)
 
                 tmp_dir = es.enter_context(tempfile.TemporaryDirectory(prefix="cvat"))
-                files_to_download = []
-                checksums = []
-                media = []
-                for item in reader.iterate_frames(frame_ids):
-                    file_name = f"{item['name']}{item['extension']}"
+                manifest_items = list(reader.iterate_frames(frame_ids))
+                files_to_download = [
+                    f"{item['name']}{item['extension']}" for item in manifest_items
+                ]
+
+                # The files are returned in order as soon as they are downloaded,
+                # the next files are downloaded in the background meanwhile
+                downloaded_files = es.enter_context(
+                    closing(
+                        cloud_storage_instance.bulk_download_to_memory(
+                            files_to_download, _use_optimal_downloading=False
+                        )
+                    )
+                )
+
+                for item, file_name, file_data in zip(
+                    manifest_items, files_to_download, downloaded_files
+                ):
+                    # The original chunk writer can use the image files as is
                     fs_filename = os.path.join(tmp_dir, file_name)
+                    os.makedirs(os.path.dirname(fs_filename), exist_ok=True)
+                    with open(fs_filename, "wb") as f:
+                        f.write(file_data.getbuffer())
+
+                    file_checksum = item.get("file_checksum")
+                    if file_checksum and (
+                        hashlib.md5(file_data.getbuffer()).hexdigest() != file_checksum  # nosec
+                    ):
+                        slogger.cloud_storage[db_cloud_storage.id].warning(
+                            "Hash sums of files {} do not match".format(file_name)
+                        )
 
-                    files_to_download.append(file_name)
-                    checksums.append(item.get("checksum", None))
-                    media.append((fs_filename, fs_filename, None))
+                    if db_task.dimension != models.DimensionType.DIM_2D:
+                        yield (fs_filename, fs_filename, None)
+                        continue
 
-                cloud_storage_instance.bulk_download_to_dir(
-                    files=files_to_download, upload_dir=tmp_dir
-                )
-                media = preload_images(media)
+                    image = PIL.Image.open(file_data)
+                    image.load()
 
-                for checksum, (_, fs_filename, _) in zip(checksums, media):
-                    if checksum and not md5_hash(fs_filename) == checksum:
+                    checksum = item.get("checksum")
+                    if not file_checksum and checksum and md5_hash(image) != checksum:
                         slogger.cloud_storage[db_cloud_storage.id].warning(
                             "Hash sums of files {} do not match".format(file_name)
                         )
 
-                yield from media
+                    yield (image, fs_filename, None)
         else:
             requested_frame_iter = iter(frame_ids)
             next_requested_frame_id = next(requested_frame_iter, None)
@@ -409,7 +729,7 @@ class MediaCache:
         db_data = db_task.data
 
         chunk_size = db_data.chunk_size
-        chunk_frame_ids = list(db_segment.frame_set)[
+        chunk_frame_ids = db_segment.frame_set[
             chunk_size * chunk_number : chunk_size * (chunk_number + 1)
         ]
 
@@ -589,7 +909,7 @@ class MediaCache:
                 db_storage.get_storage_dirname(),
             )
             # need to update index
-            manifest.set_index()
+            manifest.update_index()
             if not len(manifest):
                 continue
 
@@ -4,34 +4,46 @@
 # SPDX-License-Identifier: MIT
 
 import functools
+import hashlib
 import json
 import os
 import math
+import shutil
+import threading
+import time
 from abc import ABC, abstractmethod, abstractproperty
+from collections import OrderedDict, deque
+from contextlib import suppress
 from enum import Enum
 from io import BytesIO
-from typing import Dict, List, Optional, Any, Callable, TypeVar, Iterator
-from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Deque, Dict, List, Optional, Any, Callable, Tuple, TypeVar, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_EXCEPTION
 
 import boto3
+import django_rq
+import requests
 from azure.core.exceptions import HttpResponseError, ResourceExistsError
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import BlobServiceClient, ContainerClient, PublicAccess
 from azure.storage.blob._list_blobs_helper import BlobPrefix
 from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from botocore.handlers import disable_signing
-from datumaro.util import take_by # can be changed to itertools.batched after migration to python3.12
 from django.conf import settings
+from django.core.cache import caches
 from google.cloud import storage
 from google.cloud.exceptions import Forbidden as GoogleCloudForbidden
 from google.cloud.exceptions import NotFound as GoogleCloudNotFound
 from PIL import Image, ImageFile
+from requests.adapters import HTTPAdapter
+from rq.job import JobStatus as RQJobStatus
 from rest_framework.exceptions import (NotFound, PermissionDenied,
                                        ValidationError)
 
 from cvat.apps.engine.log import ServerLogManager
-from cvat.apps.engine.models import CloudProviderChoice, CredentialsTypeChoice
+from cvat.apps.engine.models import CloudProviderChoice, CloudStorage, CredentialsTypeChoice
+from cvat.apps.engine.disk_store import DiskFileStore
 from cvat.apps.engine.utils import get_cpu_number
 from cvat.utils.http import PROXIES_FOR_UNTRUSTED_URLS
 
@@ -72,6 +84,16 @@ def normalize_threads_number(
 
     return threads_number
 
+def _mount_http_adapter(session: requests.Session, max_connections: int) -> None:
+    adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+def _make_http_session(max_connections: int) -> requests.Session:
+    session = requests.Session()
+    _mount_http_adapter(session, max_connections)
+    return session
+
 class Status(str, Enum):
     AVAILABLE = 'AVAILABLE'
     NOT_FOUND = 'NOT_FOUND'
@@ -131,11 +153,110 @@ def validate_file_status(func):
         return res
     return wrapper
 
+class _ObjectDiskCache:
+    """
+    Keeps the downloaded cloud storage objects and their first bytes in local files.
+
+    The entries are identified by the object ETag, so the updated objects
+    are downloaded again. The total size of the files is limited,
+    the least recently used files are removed in a background thread.
+    """
+
+    _OBJECT_FILE_SUFFIX = ".full"
+    _PREFIX_FILE_SUFFIX = ".part"
+
+    def __init__(self, root_dir: str, *, max_size: int, sweep_interval: int) -> None:
+        self._files = DiskFileStore(
+            "cloud_storage_cache", root_dir, max_size=max_size, sweep_interval=sweep_interval
+        )
+
+    def _get_file_path(self, namespace: str, entry_key: List[str], suffix: str) -> str:
+        digest = hashlib.sha256(json.dumps(entry_key).encode()).hexdigest()
+        return self._files.get_path(namespace, digest[:2], digest + suffix)
+
+    def get_object(self, namespace: str, entry_key: List[str]) -> Optional[bytes]:
+        return self._files.read_file(
+            self._get_file_path(namespace, entry_key, self._OBJECT_FILE_SUFFIX)
+        )
+
+    def set_object(self, namespace: str, entry_key: List[str], data: bytes) -> None:
+        self._files.write_file(
+            self._get_file_path(namespace, entry_key, self._OBJECT_FILE_SUFFIX), data
+        )
+
+        # the first bytes are available in the object file now
+        with suppress(FileNotFoundError):
+            os.remove(self._get_file_path(namespace, entry_key, self._PREFIX_FILE_SUFFIX))
+
+    def get_range(
+        self, namespace: str, entry_key: List[str], stop_byte: int, start_byte: int = 0
+    ) -> Optional[bytes]:
+        data = self._files.read_file(
+            self._get_file_path(namespace, entry_key, self._OBJECT_FILE_SUFFIX),
+            start_byte, stop_byte
+        )
+        if data is not None:
+            return data
+
+        prefix_path = self._get_file_path(namespace, entry_key, self._PREFIX_FILE_SUFFIX)
+        try:
+            if os.path.getsize(prefix_path) <= stop_byte:
+                return None
+        except FileNotFoundError:
+            return None
+
+        return self._files.read_file(prefix_path, start_byte, stop_byte)
+
+    def set_range(
+        self, namespace: str, entry_key: List[str], data: bytes, stop_byte: int, start_byte: int = 0
+    ) -> None:
+        if start_byte != 0:
+            # only the first bytes of the objects are kept
+            return
+
+        if len(data) <= stop_byte:
+            # the range includes the whole object
+            self.set_object(namespace, entry_key, data)
+            return
+
+        prefix_path = self._get_file_path(namespace, entry_key, self._PREFIX_FILE_SUFFIX)
+        with suppress(FileNotFoundError):
+            if len(data) <= os.path.getsize(prefix_path):
+                return
+
+        self._files.write_file(prefix_path, data)
+
+    def remove_namespace(self, namespace: str) -> None:
+        shutil.rmtree(self._files.get_path(namespace), ignore_errors=True)
+
+_object_disk_cache: Optional[_ObjectDiskCache] = None
+
+def _get_object_disk_cache() -> Optional[_ObjectDiskCache]:
+    global _object_disk_cache
+
+    if not settings.CLOUD_STORAGE_CACHE_MAX_SIZE:
+        return None
+
+    if _object_disk_cache is None:
+        _object_disk_cache = _ObjectDiskCache(
+            settings.CLOUD_STORAGE_CACHE_ROOT or os.path.join(settings.CACHE_ROOT, "cloud_storage"),
+            max_size=settings.CLOUD_STORAGE_CACHE_MAX_SIZE,
+            sweep_interval=settings.CLOUD_STORAGE_CACHE_SWEEP_INTERVAL,
+        )
+
+    return _object_disk_cache
+
 class _CloudStorage(ABC):
 
     def __init__(self, prefix: Optional[str] = None):
         self.prefix = prefix
 
+        # The local object cache is only used for the storages
+        # created by db_storage_to_storage_instance()
+        self.cache_namespace: Optional[str] = None
+        self._object_etags: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._object_etags_lock = threading.Lock()
+
     @abstractproperty
     def name(self):
         pass
@@ -165,9 +286,73 @@ class _CloudStorage(ABC):
         pass
 
     @abstractmethod
-    def download_fileobj(self, key: str) -> NamedBytesIO:
+    def _get_file_etag(self, key: str) -> str:
         pass
 
+    _MAX_CACHED_ETAGS = 100000
+
+    def _is_object_cache_enabled(self) -> bool:
+        return bool(self.cache_namespace) and _get_object_disk_cache() is not None
+
+    def _get_known_etag(self, key: str) -> Optional[str]:
+        """
+        Returns the ETag of an object downloaded before, None if there is no such object.
+        The ETags are checked with a HEAD request once in CLOUD_STORAGE_CACHE_VALIDATION_TTL
+        seconds. The new objects are downloaded without checks, their ETags are taken
+        from the download responses.
+        """
+
+        now = time.monotonic()
+        with self._object_etags_lock:
+            etag, expiration_time = self._object_etags.get(key, (None, 0))
+            if etag is None:
+                return None
+
+            if now < expiration_time:
+                self._object_etags.move_to_end(key)
+                return etag
+
+        try:
+            etag = self._get_file_etag(key)
+        except Exception:
+            # the errors are reported by the downloading functions
+            return None
+
+        self._set_known_etag(key, etag)
+        return etag
+
+    def _set_known_etag(self, key: str, etag: str) -> None:
+        with self._object_etags_lock:
+            self._object_etags[key] = (
+                etag, time.monotonic() + settings.CLOUD_STORAGE_CACHE_VALIDATION_TTL
+            )
+            self._object_etags.move_to_end(key)
+            while len(self._object_etags) > self._MAX_CACHED_ETAGS:
+                self._object_etags.popitem(last=False)
+
+    def download_fileobj(self, key: str) -> NamedBytesIO:
+        if not self._is_object_cache_enabled():
+            return self._download_fileobj(key)[0]
+
+        object_cache = _get_object_disk_cache()
+        if etag := self._get_known_etag(key):
+            data = object_cache.get_object(self.cache_namespace, [self.name, key, etag])
+            if data is not None:
+                buf = NamedBytesIO(data)
+                buf.filename = key
+                return buf
+
+        buf, etag = self._download_fileobj(key)
+        self._set_known_etag(key, etag)
+        object_cache.set_object(self.cache_namespace, [self.name, key, etag], buf.getvalue())
+        return buf
+
+    @abstractmethod
+    def _download_fileobj(self, key: str) -> Tuple[NamedBytesIO, str]:
+        """
+        Downloads the object. Returns the object data and the object ETag from the response.
+        """
+
     def download_file(self, key, path):
         file_obj = self.download_fileobj(key)
         if isinstance(file_obj, BytesIO):
@@ -194,11 +379,34 @@ class _CloudStorage(ABC):
 
         if start_byte > stop_byte:
             raise ValidationError(f'Incorrect bytes range was received: {start_byte}-{stop_byte}')
-        return self._download_range_of_bytes(key, stop_byte, start_byte)
+
+        if not self._is_object_cache_enabled():
+            return self._download_range_of_bytes(key, stop_byte, start_byte)[0]
+
+        object_cache = _get_object_disk_cache()
+        if etag := self._get_known_etag(key):
+            data = object_cache.get_range(
+                self.cache_namespace, [self.name, key, etag], stop_byte, start_byte
+            )
+            if data is not None:
+                return data
+
+        data, etag = self._download_range_of_bytes(key, stop_byte, start_byte)
+        self._set_known_etag(key, etag)
+        object_cache.set_range(
+            self.cache_namespace, [self.name, key, etag], data, stop_byte, start_byte
+        )
+
+        return data
 
     @abstractmethod
-    def _download_range_of_bytes(self, key: str, stop_byte: int, start_byte: int):
-        pass
+    def _download_range_of_bytes(
+        self, key: str, stop_byte: int, start_byte: int
+    ) -> Tuple[bytes, str]:
+        """
+        Downloads the object bytes range.
+        Returns the bytes and the object ETag from the response.
+        """
 
     def optimally_image_download(self, key: str, chunk_size: int = 65536) -> NamedBytesIO:
         """
@@ -241,9 +449,22 @@ class _CloudStorage(ABC):
         func = self.optimally_image_download if _use_optimal_downloading else self.download_fileobj
         threads_number = normalize_threads_number(threads_number, len(files))
 
+        # Keep the downloading threads busy while the downloaded files are consumed,
+        # the files are returned in the input order
         with ThreadPoolExecutor(max_workers=threads_number) as executor:
-            for batch_links in take_by(files, count=threads_number):
-                yield from executor.map(func, batch_links)
+            futures: Deque[Future] = deque()
+            try:
+                for file in files:
+                    if 2 * threads_number <= len(futures):
+                        yield futures.popleft().result()
+
+                    futures.append(executor.submit(func, file))
+
+                while futures:
+                    yield futures.popleft().result()
+            finally:
+                for future in futures:
+                    future.cancel()
 
     def bulk_download_to_dir(
         self,
@@ -367,6 +588,7 @@ def get_cloud_storage_instance(
     resource: str,
     credentials: str,
     specific_attributes: Optional[Dict[str, Any]] = None,
+    max_connections: Optional[int] = None,
 ):
     instance = None
     if cloud_provider == CloudProviderChoice.AWS_S3:
@@ -378,6 +600,7 @@ def get_cloud_storage_instance(
             region=specific_attributes.get('region'),
             endpoint_url=specific_attributes.get('endpoint_url'),
             prefix=specific_attributes.get('prefix'),
+            max_connections=max_connections,
         )
     elif cloud_provider == CloudProviderChoice.AZURE_CONTAINER:
         instance = AzureBlobContainer(
@@ -386,6 +609,7 @@ def get_cloud_storage_instance(
             sas_token=credentials.session_token,
             connection_string=credentials.connection_string,
             prefix=specific_attributes.get('prefix'),
+            max_connections=max_connections,
         )
     elif cloud_provider == CloudProviderChoice.GOOGLE_CLOUD_STORAGE:
         instance = GoogleCloudStorage(
@@ -394,7 +618,8 @@ def get_cloud_storage_instance(
             anonymous_access = credentials.credentials_type == CredentialsTypeChoice.ANONYMOUS_ACCESS,
             prefix=specific_attributes.get('prefix'),
             location=specific_attributes.get('location'),
-            project=specific_attributes.get('project')
+            project=specific_attributes.get('project'),
+            max_connections=max_connections,
         )
     else:
         raise NotImplementedError(f"The {cloud_provider} provider is not supported")
@@ -418,6 +643,7 @@ class AWS_S3(_CloudStorage):
                 session_token: Optional[str] = None,
                 endpoint_url: Optional[str] = None,
                 prefix: Optional[str] = None,
+                max_connections: Optional[int] = None,
     ):
         super().__init__(prefix=prefix)
         if (
@@ -443,9 +669,19 @@ class AWS_S3(_CloudStorage):
             if arg_v:
                 kwargs[key] = arg_v
 
+        config_kwargs = {
+            # the failed requests, including the parts of the multipart uploads, are repeated
+            'retries': {
+                'total_max_attempts': settings.CLOUD_STORAGE_REQUEST_MAX_RETRIES + 1,
+                'mode': 'standard',
+            },
+        }
+        if max_connections:
+            config_kwargs['max_pool_connections'] = max_connections
+
         session = boto3.Session(**kwargs)
         self._s3 = session.resource("s3", endpoint_url=endpoint_url,
-            config=Config(proxies=PROXIES_FOR_UNTRUSTED_URLS or {}),
+            config=Config(proxies=PROXIES_FOR_UNTRUSTED_URLS or {}, **config_kwargs),
         )
 
         # anonymous access
@@ -472,6 +708,9 @@ class AWS_S3(_CloudStorage):
     def _head_file(self, key):
         return self._client.head_object(Bucket=self.name, Key=key)
 
+    def _get_file_etag(self, key: str) -> str:
+        return self._head_file(key)['ETag']
+
     def get_status(self):
         # https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3.html#S3.Client.head_object
         # return only 3 codes: 200, 403, 404
@@ -501,12 +740,22 @@ class AWS_S3(_CloudStorage):
     def get_file_last_modified(self, key):
         return self._head_file(key).get('LastModified')
 
+    def _make_upload_transfer_config(self) -> TransferConfig:
+        # The big files are uploaded in parts in parallel,
+        # only the failed parts are uploaded again
+        return TransferConfig(
+            multipart_threshold=settings.CLOUD_STORAGE_UPLOAD_PART_SIZE,
+            multipart_chunksize=settings.CLOUD_STORAGE_UPLOAD_PART_SIZE,
+            max_concurrency=settings.CLOUD_STORAGE_UPLOAD_MAX_CONCURRENCY,
+            max_io_queue=self.transfer_config['max_io_queue'],
+        )
+
     @validate_bucket_status
     def upload_fileobj(self, file_obj, file_name):
         self._bucket.upload_fileobj(
             Fileobj=file_obj,
             Key=file_name,
-            Config=TransferConfig(max_io_queue=self.transfer_config['max_io_queue'])
+            Config=self._make_upload_transfer_config(),
         )
 
     @validate_bucket_status
@@ -517,7 +766,7 @@ class AWS_S3(_CloudStorage):
             self._bucket.upload_file(
                 file_path,
                 file_name,
-                Config=TransferConfig(max_io_queue=self.transfer_config['max_io_queue'])
+                Config=self._make_upload_transfer_config(),
             )
         except ClientError as ex:
             msg = str(ex)
@@ -554,22 +803,40 @@ class AWS_S3(_CloudStorage):
 
     @validate_file_status
     @validate_bucket_status
-    def download_fileobj(self, key: str) -> NamedBytesIO:
-        buf = NamedBytesIO()
-        self.bucket.download_fileobj(
-            Key=key,
-            Fileobj=buf,
-            Config=TransferConfig(max_io_queue=self.transfer_config['max_io_queue'])
-        )
-        buf.seek(0)
+    def _download_fileobj(self, key: str) -> Tuple[NamedBytesIO, str]:
+        transfer_config = TransferConfig(max_io_queue=self.transfer_config['max_io_queue'])
+
+        head = self._head_file(key)
+        etag = head['ETag']
+
+        # IfMatch guarantees that the downloaded data matches the ETag
+        if head['ContentLength'] <= transfer_config.multipart_threshold:
+            response = self._client.get_object(Bucket=self.bucket.name, Key=key, IfMatch=etag)
+            buf = NamedBytesIO(response['Body'].read())
+        else:
+            # The big objects are downloaded in parallel parts
+            buf = NamedBytesIO()
+            self.bucket.download_fileobj(
+                Key=key,
+                Fileobj=buf,
+                Config=transfer_config,
+                ExtraArgs={'IfMatch': etag},
+            )
+            buf.seek(0)
+
         buf.filename = key
-        return buf
+        return buf, etag
 
     @validate_file_status
     @validate_bucket_status
-    def _download_range_of_bytes(self, key: str, stop_byte: int, start_byte: int) -> bytes:
+    def _download_range_of_bytes(
+        self, key: str, stop_byte: int, start_byte: int
+    ) -> Tuple[bytes, str]:
         try:
-            return self._client.get_object(Bucket=self.bucket.name, Key=key, Range=f'bytes={start_byte}-{stop_byte}')['Body'].read()
+            response = self._client.get_object(
+                Bucket=self.bucket.name, Key=key, Range=f'bytes={start_byte}-{stop_byte}'
+            )
+            return response['Body'].read(), response['ETag']
         except ClientError as ex:
             if 'InvalidRange' in str(ex):
                 if self._head_file(key).get('ContentLength') == 0:
@@ -644,18 +911,32 @@ class AzureBlobContainer(_CloudStorage):
         sas_token: Optional[str] = None,
         connection_string: Optional[str] = None,
         prefix: Optional[str] = None,
+        max_connections: Optional[int] = None,
     ):
         super().__init__(prefix=prefix)
         self._account_name = account_name
+
+        client_kwargs = {
+            # the big files are uploaded in blocks, the failed requests are repeated
+            'max_block_size': settings.CLOUD_STORAGE_UPLOAD_PART_SIZE,
+            'max_single_put_size': settings.CLOUD_STORAGE_UPLOAD_PART_SIZE,
+            'retry_total': settings.CLOUD_STORAGE_REQUEST_MAX_RETRIES,
+        }
+        if max_connections:
+            client_kwargs['transport'] = RequestsTransport(
+                session=_make_http_session(max_connections)
+            )
+
         if connection_string:
             self._blob_service_client = BlobServiceClient.from_connection_string(
-                connection_string, proxies=PROXIES_FOR_UNTRUSTED_URLS)
+                connection_string, proxies=PROXIES_FOR_UNTRUSTED_URLS, **client_kwargs)
         elif sas_token:
             self._blob_service_client = BlobServiceClient(
-                account_url=self.account_url, credential=sas_token, proxies=PROXIES_FOR_UNTRUSTED_URLS)
+                account_url=self.account_url, credential=sas_token, proxies=PROXIES_FOR_UNTRUSTED_URLS,
+                **client_kwargs)
         else:
             self._blob_service_client = BlobServiceClient(
-                account_url=self.account_url, proxies=PROXIES_FOR_UNTRUSTED_URLS)
+                account_url=self.account_url, proxies=PROXIES_FOR_UNTRUSTED_URLS, **client_kwargs)
         self._client = self._blob_service_client.get_container_client(container)
 
     @property
@@ -692,6 +973,9 @@ class AzureBlobContainer(_CloudStorage):
         blob_client = self.container.get_blob_client(key)
         return blob_client.get_blob_properties()
 
+    def _get_file_etag(self, key: str) -> str:
+        return self._head_file(key).etag
+
     @validate_file_status
     @validate_bucket_status
     def get_file_last_modified(self, key):
@@ -719,17 +1003,19 @@ class AzureBlobContainer(_CloudStorage):
 
     @validate_bucket_status
     def upload_fileobj(self, file_obj, file_name):
-        self._client.upload_blob(name=file_name, data=file_obj, overwrite=True)
+        self._client.upload_blob(
+            name=file_name, data=file_obj, overwrite=True,
+            max_concurrency=settings.CLOUD_STORAGE_UPLOAD_MAX_CONCURRENCY,
+        )
 
     def upload_file(self, file_path, file_name=None):
         if not file_name:
             file_name = os.path.basename(file_path)
         with open(file_path, 'rb') as f:
-            self.upload_fileobj(f, file_name)
-
-    # TODO:
-    # def multipart_upload(self, file_obj):
-    #     pass
+            self._client.upload_blob(
+                name=file_name, data=f, length=os.fstat(f.fileno()).st_size, overwrite=True,
+                max_concurrency=settings.CLOUD_STORAGE_UPLOAD_MAX_CONCURRENCY,
+            )
 
 
     def _list_raw_content_on_one_page(
@@ -759,7 +1045,7 @@ class AzureBlobContainer(_CloudStorage):
 
     @validate_file_status
     @validate_bucket_status
-    def download_fileobj(self, key: str) -> NamedBytesIO:
+    def _download_fileobj(self, key: str) -> Tuple[NamedBytesIO, str]:
         buf = NamedBytesIO()
         storage_stream_downloader = self._client.download_blob(
             blob=key,
@@ -769,12 +1055,17 @@ class AzureBlobContainer(_CloudStorage):
         storage_stream_downloader.download_to_stream(buf, max_concurrency=self.MAX_CONCURRENCY)
         buf.seek(0)
         buf.filename = key
-        return buf
+        return buf, storage_stream_downloader.properties.etag
 
     @validate_file_status
     @validate_bucket_status
-    def _download_range_of_bytes(self, key: str, stop_byte: int, start_byte: int) -> bytes:
-        return self._client.download_blob(blob=key, offset=start_byte, length=stop_byte).readall()
+    def _download_range_of_bytes(
+        self, key: str, stop_byte: int, start_byte: int
+    ) -> Tuple[bytes, str]:
+        storage_stream_downloader = self._client.download_blob(
+            blob=key, offset=start_byte, length=stop_byte - start_byte + 1
+        )
+        return storage_stream_downloader.readall(), storage_stream_downloader.properties.etag
 
     @property
     def supported_actions(self):
@@ -810,6 +1101,7 @@ class GoogleCloudStorage(_CloudStorage):
         anonymous_access: bool = False,
         project: Optional[str] = None,
         location: Optional[str] = None,
+        max_connections: Optional[int] = None,
     ):
         super().__init__(prefix=prefix)
         if service_account_json:
@@ -821,6 +1113,10 @@ class GoogleCloudStorage(_CloudStorage):
             # client library will look for credentials in the environment.
             self._client = storage.Client()
 
+        if max_connections:
+            # the client uses a requests session, which keeps up to 10 connections by default
+            _mount_http_adapter(self._client._http, max_connections)
+
         self._bucket = self._client.bucket(bucket_name, user_project=project)
         self._bucket_location = location
 
@@ -839,6 +1135,11 @@ class GoogleCloudStorage(_CloudStorage):
         blob = self.bucket.blob(key)
         return self._client._get_resource(blob.path)
 
+    def _get_file_etag(self, key: str) -> str:
+        # The object generation is used instead of the ETag.
+        # Unlike the ETag, it's the same in the metadata and in the download responses
+        return str(self._head_file(key)['generation'])
+
     @_define_gcs_status
     def get_status(self):
         self._head()
@@ -873,32 +1174,52 @@ class GoogleCloudStorage(_CloudStorage):
 
     @validate_file_status
     @validate_bucket_status
-    def download_fileobj(self, key: str) -> NamedBytesIO:
+    def _download_fileobj(self, key: str) -> Tuple[NamedBytesIO, str]:
         buf = NamedBytesIO()
         blob = self.bucket.blob(key)
         self._client.download_blob_to_file(blob, buf)
         buf.seek(0)
         buf.filename = key
-        return buf
+
+        # the blob properties are updated from the response headers
+        return buf, str(blob.generation)
 
     @validate_file_status
     @validate_bucket_status
-    def _download_range_of_bytes(self, key: str, stop_byte: int, start_byte: int) -> bytes:
+    def _download_range_of_bytes(
+        self, key: str, stop_byte: int, start_byte: int
+    ) -> Tuple[bytes, str]:
         with BytesIO() as buff:
             blob = self.bucket.blob(key)
             self._client.download_blob_to_file(blob, buff, start_byte, stop_byte)
             buff.seek(0)
-            return buff.getvalue()
+
+            # the blob properties are updated from the response headers
+            return buff.getvalue(), str(blob.generation)
+
+    # The chunks of the resumable uploads must be a multiple of 256 KB
+    _UPLOAD_CHUNK_SIZE_UNIT = 256 * 1024
+
+    def _make_upload_blob(self, file_name: str) -> storage.Blob:
+        # The big files are uploaded in chunks in a resumable upload session,
+        # so only the failed chunks are uploaded again.
+        # The client version used doesn't support parallel uploads.
+        chunk_size = max(
+            settings.CLOUD_STORAGE_UPLOAD_PART_SIZE
+            // self._UPLOAD_CHUNK_SIZE_UNIT * self._UPLOAD_CHUNK_SIZE_UNIT,
+            self._UPLOAD_CHUNK_SIZE_UNIT
+        )
+        return self.bucket.blob(file_name, chunk_size=chunk_size)
 
     @validate_bucket_status
     def upload_fileobj(self, file_obj, file_name):
-        self.bucket.blob(file_name).upload_from_file(file_obj)
+        self._make_upload_blob(file_name).upload_from_file(file_obj)
 
     @validate_bucket_status
     def upload_file(self, file_path, file_name=None):
         if not file_name:
             file_name = os.path.basename(file_path)
-        self.bucket.blob(file_name).upload_from_filename(file_path)
+        self._make_upload_blob(file_name).upload_from_filename(file_path)
 
     def create(self):
         try:
@@ -997,7 +1318,38 @@ class Credentials:
     def values(self):
         return [self.key, self.secret_key, self.session_token, self.account_name, self.key_file_path]
 
-def db_storage_to_storage_instance(db_storage):
+# The clients are reused between requests to avoid repeating credential resolution
+# and connection establishment. The entries are identified by the storage id
+# and the storage parameters, so the outdated clients are not used in other processes.
+_storage_instances: Dict[int, Tuple[str, float, _CloudStorage]] = {}
+_storage_instances_lock = threading.Lock()
+
+def _reset_storage_instances_after_fork():
+    # The clients and their connections must not be shared with the forked processes
+    global _storage_instances_lock
+    _storage_instances.clear()
+    _storage_instances_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_storage_instances_after_fork)
+
+def _make_storage_instance_key(db_storage) -> str:
+    return hashlib.sha256(json.dumps([
+        db_storage.provider_type,
+        db_storage.resource,
+        db_storage.credentials_type,
+        db_storage.credentials,
+        db_storage.specific_attributes,
+    ]).encode()).hexdigest()
+
+def remove_cached_storage_instance(storage_id: int) -> None:
+    with _storage_instances_lock:
+        _storage_instances.pop(storage_id, None)
+
+def remove_cached_storage_objects(storage_id: int) -> None:
+    if object_cache := _get_object_disk_cache():
+        object_cache.remove_namespace(str(storage_id))
+
+def _create_storage_instance(db_storage) -> _CloudStorage:
     credentials = Credentials()
     credentials.convert_from_db({
         'type': db_storage.credentials_type,
@@ -1006,9 +1358,180 @@ def db_storage_to_storage_instance(db_storage):
     details = {
         'resource': db_storage.resource,
         'credentials': credentials,
-        'specific_attributes': db_storage.get_specific_attributes()
+        'specific_attributes': db_storage.get_specific_attributes(),
+        'max_connections': settings.CLOUD_STORAGE_CLIENT_MAX_CONNECTIONS,
     }
-    return get_cloud_storage_instance(cloud_provider=db_storage.provider_type, **details)
+    instance = get_cloud_storage_instance(cloud_provider=db_storage.provider_type, **details)
+    if db_storage.id:
+        instance.cache_namespace = str(db_storage.id)
+    return instance
+
+def db_storage_to_storage_instance(db_storage, *, reuse: bool = True) -> _CloudStorage:
+    """
+    Returns a client for the cloud storage. By default, the clients are shared
+    in the process for CLOUD_STORAGE_CLIENT_TTL seconds.
+    """
+
+    if not reuse or not db_storage.id or not settings.CLOUD_STORAGE_CLIENT_TTL:
+        return _create_storage_instance(db_storage)
+
+    instance_key = _make_storage_instance_key(db_storage)
+    now = time.monotonic()
+
+    with _storage_instances_lock:
+        cached_item = _storage_instances.get(db_storage.id)
+        if cached_item and cached_item[0] == instance_key and now < cached_item[1]:
+            return cached_item[2]
+
+    instance = _create_storage_instance(db_storage)
+
+    with _storage_instances_lock:
+        _storage_instances[db_storage.id] = (
+            instance_key, now + settings.CLOUD_STORAGE_CLIENT_TTL, instance
+        )
+
+    return instance
+
+def _make_storage_listing_version_key(storage_id: int) -> str:
+    return f"cloud_storage_{storage_id}_listing_version"
+
+def _get_storage_listing_version(storage_id: int) -> int:
+    cache = caches["media"]
+    version_key = _make_storage_listing_version_key(storage_id)
+
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, time.time_ns(), timeout=None)
+        version = cache.get(version_key)
+
+    return version
+
+def invalidate_storage_content_cache(storage_id: int) -> None:
+    # The old pages are not removed, they just can't be reached anymore and expire
+    caches["media"].set(_make_storage_listing_version_key(storage_id), time.time_ns(), timeout=None)
+
+def _make_storage_content_page_key(
+    storage_id: int, version: int, prefix: str, next_token: Optional[str], page_size: int
+) -> str:
+    digest = hashlib.sha256(json.dumps([prefix, next_token, page_size]).encode()).hexdigest()
+    return f"cloud_storage_{storage_id}_listing_{version}_{digest}"
+
+def _get_storage_content_page(
+    db_storage: Any,
+    version: int,
+    prefix: str,
+    next_token: Optional[str],
+    page_size: int,
+    page_number: int,
+    *,
+    ttl: int,
+) -> Tuple[int, Dict]:
+    cache = caches["media"]
+    page_key = _make_storage_content_page_key(db_storage.id, version, prefix, next_token, page_size)
+
+    cached_page = cache.get(page_key)
+    if cached_page is not None:
+        return cached_page
+
+    storage = db_storage_to_storage_instance(db_storage)
+    content = storage.list_files_on_one_page(prefix, next_token, page_size, _use_sort=True)
+    cache.set(page_key, (page_number, content), timeout=ttl)
+    return page_number, content
+
+def _prefetch_storage_content_page(
+    storage_id: int, version: int, prefix: str, next_token: str, page_size: int, page_number: int
+) -> None:
+    db_storage = CloudStorage.objects.filter(id=storage_id).first()
+    if not db_storage:
+        return
+
+    _get_storage_content_page(
+        db_storage, version, prefix, next_token, page_size, page_number,
+        ttl=settings.CLOUD_STORAGE_LISTING_CACHE_TTL,
+    )
+
+def _build_storage_content_snapshot(
+    storage_id: int, version: int, prefix: str, next_token: str, page_size: int, page_number: int
+) -> None:
+    db_storage = CloudStorage.objects.filter(id=storage_id).first()
+    if not db_storage:
+        return
+
+    for page_number in range(page_number, settings.CLOUD_STORAGE_LISTING_SNAPSHOT_MAX_PAGES):
+        if version != _get_storage_listing_version(storage_id):
+            return # the storage content was changed
+
+        _, content = _get_storage_content_page(
+            db_storage, version, prefix, next_token, page_size, page_number,
+            ttl=settings.CLOUD_STORAGE_LISTING_SNAPSHOT_TTL,
+        )
+
+        next_token = content['next']
+        if not next_token:
+            break
+
+def _get_storage_listing_queue():
+    return django_rq.get_queue(settings.CVAT_QUEUES.CLOUD_STORAGE_LISTINGS.value)
+
+def _enqueue_storage_listing_job(rq_id: str, func: Callable, args: tuple) -> None:
+    queue = _get_storage_listing_queue()
+
+    rq_job = queue.fetch_job(rq_id)
+    if rq_job:
+        if rq_job.get_status(refresh=False) in (RQJobStatus.QUEUED, RQJobStatus.STARTED):
+            return
+
+        rq_job.delete()
+
+    queue.enqueue_call(func=func, args=args, job_id=rq_id, result_ttl=0, failure_ttl=0)
+
+def list_storage_content_on_one_page(
+    db_storage: Any,
+    prefix: str = "",
+    next_token: Optional[str] = None,
+    page_size: int = settings.BUCKET_CONTENT_MAX_PAGE_SIZE,
+) -> Dict:
+    """
+    Returns a page of the cloud storage content listing.
+    The pages are cached for CLOUD_STORAGE_LISTING_CACHE_TTL seconds,
+    the next page is requested in a background job. When a listing is long,
+    the rest of its pages are requested in a background job.
+    """
+
+    if not settings.CLOUD_STORAGE_LISTING_CACHE_TTL:
+        storage = db_storage_to_storage_instance(db_storage)
+        return storage.list_files_on_one_page(prefix, next_token, page_size, _use_sort=True)
+
+    version = _get_storage_listing_version(db_storage.id)
+    page_number, content = _get_storage_content_page(
+        db_storage, version, prefix, next_token, page_size,
+        # the number of a page requested by a token is unknown if it's not cached
+        page_number=int(next_token is not None),
+        ttl=settings.CLOUD_STORAGE_LISTING_CACHE_TTL,
+    )
+
+    if content['next']:
+        job_args = (db_storage.id, version, prefix, content['next'], page_size, page_number + 1)
+        next_page_key = _make_storage_content_page_key(
+            db_storage.id, version, prefix, content['next'], page_size
+        )
+
+        if (
+            settings.CLOUD_STORAGE_LISTING_SNAPSHOT_MIN_PAGES and
+            settings.CLOUD_STORAGE_LISTING_SNAPSHOT_MIN_PAGES <= page_number + 1
+        ):
+            digest = hashlib.sha256(json.dumps([prefix, page_size]).encode()).hexdigest()
+            _enqueue_storage_listing_job(
+                f"cloud-storage-listing-snapshot-{db_storage.id}-{digest}",
+                _build_storage_content_snapshot, job_args,
+            )
+        elif not caches["media"].has_key(next_page_key):
+            _enqueue_storage_listing_job(
+                f"cloud-storage-listing-page-{next_page_key}",
+                _prefetch_storage_content_page, job_args,
+            )
+
+    return content
 
 T = TypeVar('T', Callable[[str, int, int], int], Callable[[str, int, str, bool], None])
 
@@ -1039,5 +1562,6 @@ def export_resource_to_cloud_storage(
     file_path = func(*args, **kwargs)
     storage = db_storage_to_storage_instance(db_storage)
     storage.upload_file(file_path, key if key else key_pattern.format(os.path.splitext(file_path)[1].lower()))
+    invalidate_storage_content_cache(db_storage.id)
 
     return file_path
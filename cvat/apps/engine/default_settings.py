@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 import os
+from datetime import timedelta
 
 from attrs.converters import to_bool
 
@@ -14,3 +15,105 @@ will be automatically switched to the dynamic cache.
 When enabled, this option can increase data access speed and reduce server load,
 but significantly increase disk space occupied by tasks.
 """
+
+MEDIA_CACHE_BUILD_LOCK_TIMEOUT = int(os.getenv("CVAT_MEDIA_CACHE_BUILD_LOCK_TIMEOUT", 120))
+"""
+Maximum time (in seconds) a media cache item build lock can be held.
+While a worker builds a chunk or a preview, other workers requesting the same item
+wait for the result instead of building it again. If the builder doesn't finish
+in this time (e.g. it was killed), the lock expires and another worker can take it.
+"""
+
+MEDIA_CACHE_BUILD_WAIT_POLL_INTERVAL = float(
+    os.getenv("CVAT_MEDIA_CACHE_BUILD_WAIT_POLL_INTERVAL", 0.1)
+)
+"""
+Interval (in seconds) between media cache checks while waiting for another worker
+to build the requested item.
+"""
+
+MEDIA_CACHE_LOCAL_MAX_SIZE = int(os.getenv("CVAT_MEDIA_CACHE_LOCAL_MAX_SIZE", 128 * 1024 * 1024))
+"""
+Maximum total size (in bytes) of media cache items kept in the memory of each server process.
+Repeated requests for the same chunks in one process are served from this in-process cache
+without accessing the shared media cache. Set to 0 to disable.
+"""
+
+MEDIA_CACHE_LOCAL_TTL = int(os.getenv("CVAT_MEDIA_CACHE_LOCAL_TTL", 60))
+"""
+Time (in seconds) for which an item is kept in the in-process media cache.
+Limits the time changes made in other processes can remain unnoticed.
+The items are not removed on task data updates, these changes also become visible
+after this time.
+"""
+
+MEDIA_CACHE_STORAGE = os.getenv("CVAT_MEDIA_CACHE_STORAGE", "redis")
+"""
+The storage for media cache item data. Supported values:
+- "redis" - the data is stored in the "media" cache
+- "disk" - the data is stored in files in the MEDIA_CACHE_DISK_ROOT directory,
+  only the item metadata is stored in the "media" cache.
+  This allows to keep much more prepared chunks using a local disk instead of memory.
+"""
+
+MEDIA_CACHE_DISK_ROOT = os.getenv("CVAT_MEDIA_CACHE_DISK_ROOT")
+"""
+The directory for the "disk" media cache storage. By default, a subdirectory of CACHE_ROOT.
+"""
+
+MEDIA_CACHE_DISK_MAX_SIZE = int(os.getenv("CVAT_MEDIA_CACHE_DISK_MAX_SIZE", 100 * 1024**3))
+"""
+Maximum total size (in bytes) of the "disk" media cache storage.
+When the limit is exceeded, the least recently used items are removed.
+"""
+
+MEDIA_CACHE_DISK_SWEEP_INTERVAL = int(os.getenv("CVAT_MEDIA_CACHE_DISK_SWEEP_INTERVAL", 300))
+"""
+Minimal interval (in seconds) between checks of the "disk" media cache storage size.
+"""
+
+MEDIA_CACHE_PREWARMING_ENABLED = to_bool(os.getenv("CVAT_MEDIA_CACHE_PREWARMING_ENABLED", True))
+"""
+Enables background preparation of media cache chunks after task creation,
+on job assignment and ahead of the chunks requested by annotators.
+The chunks are prepared by the "chunks" queue workers.
+"""
+
+MEDIA_CACHE_PREWARMING_FIRST_CHUNKS = int(os.getenv("CVAT_MEDIA_CACHE_PREWARMING_FIRST_CHUNKS", 1))
+"""
+The number of the first job chunks prepared after task creation and on job assignment
+"""
+
+MEDIA_CACHE_PREWARMING_CHUNKS_AHEAD = int(os.getenv("CVAT_MEDIA_CACHE_PREWARMING_CHUNKS_AHEAD", 2))
+"""
+The number of job chunks prepared ahead of the chunk requested by an annotator
+"""
+
+MEDIA_CACHE_PREWARMING_REQUEST_INTERVAL = int(
+    os.getenv("CVAT_MEDIA_CACHE_PREWARMING_REQUEST_INTERVAL", 60)
+)
+"""
+The minimum interval, in seconds, between the preparations of the chunks ahead
+of the same requested job chunk
+"""
+
+MEDIA_CACHE_PREWARMING_MAX_QUEUED_JOBS = int(
+    os.getenv("CVAT_MEDIA_CACHE_PREWARMING_MAX_QUEUED_JOBS", 1000)
+)
+"""
+Maximum number of queued chunk preparation jobs. New jobs are not added when the limit is reached.
+The number of concurrently prepared chunks is defined by the number of the "chunks" queue workers.
+"""
+
+MEDIA_CACHE_PREWARMING_FAILED_TTL = timedelta(hours=1)
+"""
+Time to keep failed chunk preparation jobs
+"""
+
+MEDIA_CHUNK_ENCODING_THREADS = int(os.getenv("CVAT_MEDIA_CHUNK_ENCODING_THREADS", 4))
+"""
+The number of threads used to compress frames of image chunks in each server process.
+Image encoding doesn't hold the GIL, so the frames of a chunk are compressed in parallel.
+Set to 1 to compress frames sequentially. The threads are not used during task creation
+if several chunks are prepared in parallel (CVAT_CONCURRENT_CHUNK_PROCESSING > 1).
+"""
@@ -0,0 +1,164 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from django.core.cache import caches
+
+from cvat.apps.engine.log import ServerLogManager
+
+slogger = ServerLogManager(__name__)
+
+
+def remove_least_recently_used_files(
+    root_dir: str,
+    *,
+    max_size: int,
+    target_size: int,
+    tmp_file_prefix: str,
+    tmp_file_max_age: int,
+) -> int:
+    """
+    Removes the least recently modified files from the directory tree,
+    if the total size of the files exceeds max_size, until it is target_size or less.
+    Also removes the temporary files older than tmp_file_max_age seconds.
+
+    Returns the total size of the remaining files.
+    """
+
+    files = []
+    total_size = 0
+    for dirpath, _, filenames in os.walk(root_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                file_stat = os.stat(path)
+
+                if filename.startswith(tmp_file_prefix):
+                    # leftovers of interrupted writes
+                    if file_stat.st_mtime + tmp_file_max_age < time.time():
+                        os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+
+            files.append((file_stat.st_mtime, file_stat.st_size, path))
+            total_size += file_stat.st_size
+
+    if total_size <= max_size:
+        return total_size
+
+    files.sort()
+    for _, file_size, path in files:
+        if total_size <= target_size:
+            break
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        total_size -= file_size
+
+    return total_size
+
+
+class DiskFileStore:
+    """
+    A directory with files of limited total size.
+
+    The files are written atomically, so readers never see partially written data.
+    The least recently used files are removed in a background thread,
+    when the total size of the files exceeds the limit.
+    """
+
+    _TMP_FILE_PREFIX = ".tmp"
+    _TMP_FILE_MAX_AGE = 3600
+    _SWEEP_TARGET_SIZE_RATIO = 0.9
+
+    def __init__(self, name: str, root_dir: str, *, max_size: int, sweep_interval: int) -> None:
+        self._name = name
+        self._root_dir = root_dir
+        self._max_size = max_size
+        self._sweep_interval = sweep_interval
+        self._next_sweep_time = 0
+
+    def get_path(self, *parts: str) -> str:
+        return os.path.join(self._root_dir, *parts)
+
+    def read_file(
+        self, path: str, start_byte: int = 0, stop_byte: Optional[int] = None
+    ) -> Optional[bytes]:
+        """
+        Returns the file contents or the [start_byte; stop_byte] range of them.
+        Returns None if there is no such file.
+        """
+
+        try:
+            with open(path, "rb") as f:
+                f.seek(start_byte)
+                data = f.read(-1 if stop_byte is None else stop_byte - start_byte + 1)
+
+            # mark the file as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            # the file was removed because of the size limit
+            return None
+
+        return data
+
+    def touch_file(self, path: str) -> bool:
+        """
+        Marks the file as recently used. Returns False if there is no such file.
+        """
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def write_file(self, path: str, data: bytes) -> None:
+        data_dir = os.path.dirname(path)
+        os.makedirs(data_dir, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            dir=data_dir, prefix=self._TMP_FILE_PREFIX, delete=False
+        ) as f:
+            f.write(data)
+
+        os.replace(f.name, path)
+
+        self._schedule_sweep()
+
+    def _schedule_sweep(self) -> None:
+        now = time.monotonic()
+        if now < self._next_sweep_time:
+            return
+
+        self._next_sweep_time = now + self._sweep_interval
+
+        # Only one server process checks the storage in each interval
+        if not caches["media"].add(f"{self._name}_sweep", True, timeout=self._sweep_interval):
+            return
+
+        threading.Thread(target=self._sweep, name=f"{self._name}_sweeper", daemon=True).start()
+
+    def _sweep(self) -> None:
+        try:
+            # remove a bit more to avoid sweeping on each write
+            remove_least_recently_used_files(
+                self._root_dir,
+                max_size=self._max_size,
+                target_size=self._max_size * self._SWEEP_TARGET_SIZE_RATIO,
+                tmp_file_prefix=self._TMP_FILE_PREFIX,
+                tmp_file_max_age=self._TMP_FILE_MAX_AGE,
+            )
+        except Exception:
+            slogger.glob.error(f"Failed to clean the {self._name} files", exc_info=True)
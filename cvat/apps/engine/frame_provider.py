@@ -8,7 +8,12 @@ from __future__ import annotations
 import io
 import itertools
 import math
+import os
+import threading
 from abc import ABCMeta, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum, auto
 from io import BytesIO
@@ -16,6 +21,7 @@ from typing import (
     Any,
     Callable,
     Generic,
+    Iterable,
     Iterator,
     Optional,
     Sequence,
@@ -29,13 +35,17 @@ from typing import (
 import av
 import cv2
 import numpy as np
-from datumaro.util import take_by
 from django.conf import settings
 from PIL import Image
 from rest_framework.exceptions import ValidationError
 
 from cvat.apps.engine import models
-from cvat.apps.engine.cache import DataWithMime, MediaCache, prepare_chunk
+from cvat.apps.engine.cache import (
+    DataWithMime,
+    DataWithMimeAndChecksum,
+    MediaCache,
+    prepare_chunk,
+)
 from cvat.apps.engine.media_extractors import (
     FrameQuality,
     IMediaReader,
@@ -67,7 +77,7 @@ class _ChunkLoader(metaclass=ABCMeta):
             self.chunk_id = chunk_id
             self.chunk_reader = RandomAccessIterator(
                 self.reader_class(
-                    [self.read_chunk(chunk_id)[0]],
+                    [self.read_chunk(chunk_id).data],
                     **(self.reader_params or {}),
                 )
             )
@@ -80,7 +90,7 @@ class _ChunkLoader(metaclass=ABCMeta):
             self.chunk_reader = None
 
     @abstractmethod
-    def read_chunk(self, chunk_id: int) -> DataWithMime: ...
+    def read_chunk(self, chunk_id: int) -> DataWithMeta[BytesIO]: ...
 
 
 class _FileChunkLoader(_ChunkLoader):
@@ -94,12 +104,12 @@ class _FileChunkLoader(_ChunkLoader):
         super().__init__(reader_class, reader_params=reader_params)
         self.get_chunk_path = get_chunk_path_callback
 
-    def read_chunk(self, chunk_id: int) -> DataWithMime:
+    def read_chunk(self, chunk_id: int) -> DataWithMeta[BytesIO]:
         chunk_path = self.get_chunk_path(chunk_id)
         with open(chunk_path, "rb") as f:
-            return (
+            return DataWithMeta[BytesIO](
                 io.BytesIO(f.read()),
-                mimetypes.guess_type(chunk_path)[0],
+                mime=mimetypes.guess_type(chunk_path)[0],
             )
 
 
@@ -107,15 +117,16 @@ class _BufferChunkLoader(_ChunkLoader):
     def __init__(
         self,
         reader_class: Type[IMediaReader],
-        get_chunk_callback: Callable[[int], DataWithMime],
+        get_chunk_callback: Callable[[int], DataWithMimeAndChecksum],
         *,
         reader_params: Optional[dict] = None,
     ) -> None:
         super().__init__(reader_class, reader_params=reader_params)
         self.get_chunk = get_chunk_callback
 
-    def read_chunk(self, chunk_id: int) -> DataWithMime:
-        return self.get_chunk(chunk_id)
+    def read_chunk(self, chunk_id: int) -> DataWithMeta[BytesIO]:
+        data, mime, checksum = self.get_chunk(chunk_id)
+        return DataWithMeta[BytesIO](data, mime=mime, checksum=checksum)
 
 
 class FrameOutputType(Enum):
@@ -134,6 +145,9 @@ class DataWithMeta(Generic[_T]):
     data: _T
     mime: str
 
+    # The media cache checksum of the data, if the data is taken from the cache
+    checksum: Optional[int] = None
+
 
 class IFrameProvider(metaclass=ABCMeta):
     VIDEO_FRAME_EXT = ".PNG"
@@ -190,6 +204,15 @@ class IFrameProvider(metaclass=ABCMeta):
         self, chunk_number: int, *, quality: FrameQuality = FrameQuality.ORIGINAL
     ) -> DataWithMeta[BytesIO]: ...
 
+    @abstractmethod
+    def get_chunk_file_path(
+        self, chunk_number: int, *, quality: FrameQuality = FrameQuality.ORIGINAL
+    ) -> Optional[str]:
+        """
+        Returns the chunk file path, if the chunk is stored in a file.
+        Allows to send the file directly, without reading it.
+        """
+
     @abstractmethod
     def get_frame(
         self,
@@ -222,9 +245,100 @@ class IFrameProvider(metaclass=ABCMeta):
         return (abs_frame_number - db_data.start_frame) // db_data.get_frame_step()
 
 
+class _TaskSegmentIndex:
+    """
+    Maps absolute frame numbers of a task to the task RANGE segments
+    """
+
+    def __init__(self, segments: Iterable[Tuple[int, range]]) -> None:
+        "segments - (segment id, absolute segment frame range) pairs"
+
+        self._segments = sorted(segments, key=lambda s: (s[1].start, s[0]))
+
+        # The segments can overlap. Keep the max stop frame of the previous segments
+        # to find the first segment that can include the frame with binary search.
+        self._max_stops = []
+        max_stop = None
+        for _, frame_range in self._segments:
+            if frame_range and (max_stop is None or max_stop < frame_range[-1]):
+                max_stop = frame_range[-1]
+            self._max_stops.append(max_stop if max_stop is not None else -1)
+
+    def find(self, abs_frame_number: int) -> Optional[int]:
+        "Returns the id of the first segment including the frame"
+        return next(self.find_all(abs_frame_number, abs_frame_number), None)
+
+    def find_all(self, abs_start_frame: int, abs_stop_frame: int) -> Iterator[int]:
+        "Yields ids of the segments including frames in the [start, stop] range"
+        for segment_id, frame_range in itertools.islice(
+            self._segments, bisect_left(self._max_stops, abs_start_frame), None
+        ):
+            if abs_stop_frame < frame_range.start:
+                break
+
+            if frame_range and not (
+                frame_range[-1] < abs_start_frame or abs_stop_frame < frame_range.start
+            ):
+                if abs_start_frame == abs_stop_frame and abs_start_frame not in frame_range:
+                    continue
+
+                yield segment_id
+
+
+_task_segment_indices: OrderedDict[int, Tuple[tuple, _TaskSegmentIndex]] = OrderedDict()
+_task_segment_indices_lock = threading.Lock()
+_TASK_SEGMENT_INDICES_MAX_COUNT = 256
+
+
+def _get_task_segment_index(db_task: models.Task) -> _TaskSegmentIndex:
+    db_data = db_task.data
+    index_version = (
+        db_data.id,
+        db_data.size,
+        db_data.start_frame,
+        db_data.stop_frame,
+        db_data.get_frame_step(),
+    )
+
+    with _task_segment_indices_lock:
+        cached_index = _task_segment_indices.get(db_task.id)
+        if cached_index and cached_index[0] == index_version:
+            _task_segment_indices.move_to_end(db_task.id)
+            return cached_index[1]
+
+    step = db_data.get_frame_step()
+    segment_index = _TaskSegmentIndex(
+        (
+            segment_id,
+            range(
+                db_data.start_frame + start_frame * step,
+                min(db_data.start_frame + stop_frame * step, db_data.stop_frame) + step,
+                step,
+            ),
+        )
+        for segment_id, start_frame, stop_frame in db_task.segment_set.filter(
+            type=models.SegmentType.RANGE
+        ).values_list("id", "start_frame", "stop_frame")
+    )
+
+    with _task_segment_indices_lock:
+        _task_segment_indices[db_task.id] = (index_version, segment_index)
+        while _TASK_SEGMENT_INDICES_MAX_COUNT < len(_task_segment_indices):
+            _task_segment_indices.popitem(last=False)
+
+    return segment_index
+
+
+def remove_cached_task_segment_index(task_id: int) -> None:
+    with _task_segment_indices_lock:
+        _task_segment_indices.pop(task_id, None)
+
+
 class TaskFrameProvider(IFrameProvider):
     def __init__(self, db_task: models.Task) -> None:
         self._db_task = db_task
+        self._segment_index: Optional[_TaskSegmentIndex] = None
+        self._segments: dict[int, models.Segment] = {}
 
     def validate_frame_number(self, frame_number: int) -> int:
         if frame_number not in range(0, self._db_task.data.size):
@@ -271,41 +385,17 @@ class TaskFrameProvider(IFrameProvider):
         cache = MediaCache()
         cached_chunk = cache.get_task_chunk(self._db_task, chunk_number, quality=quality)
         if cached_chunk:
-            return return_type(cached_chunk[0], cached_chunk[1])
+            return return_type(*cached_chunk)
 
-        db_data = self._db_task.data
-        step = db_data.get_frame_step()
-        task_chunk_start_frame = chunk_number * db_data.chunk_size
-        task_chunk_stop_frame = (chunk_number + 1) * db_data.chunk_size - 1
-        task_chunk_frame_set = set(
-            range(
-                db_data.start_frame + task_chunk_start_frame * step,
-                min(db_data.start_frame + task_chunk_stop_frame * step, db_data.stop_frame) + step,
-                step,
-            )
-        )
-
-        matching_segments: list[models.Segment] = sorted(
-            [
-                s
-                for s in self._db_task.segment_set.all()
-                if s.type == models.SegmentType.RANGE
-                if not task_chunk_frame_set.isdisjoint(s.frame_set)
-            ],
-            key=lambda s: s.start_frame,
-        )
-        assert matching_segments
+        task_chunk_frame_set = self._get_task_chunk_frame_set(chunk_number)
+        matching_segments = self._get_task_chunk_segments(task_chunk_frame_set)
 
         # Don't put this into set_callback to avoid data duplication in the cache
-
-        if len(matching_segments) == 1:
-            segment_frame_provider = SegmentFrameProvider(matching_segments[0])
-            matching_chunk_index = segment_frame_provider.find_matching_chunk(
-                sorted(task_chunk_frame_set)
-            )
-            if matching_chunk_index is not None:
-                # The requested frames match one of the job chunks, we can use it directly
-                return segment_frame_provider.get_chunk(matching_chunk_index, quality=quality)
+        matching_chunk = self._find_matching_segment_chunk(task_chunk_frame_set, matching_segments)
+        if matching_chunk is not None:
+            # The requested frames match one of the job chunks, we can use it directly
+            segment_frame_provider, matching_chunk_index = matching_chunk
+            return segment_frame_provider.get_chunk(matching_chunk_index, quality=quality)
 
         def _set_callback() -> DataWithMime:
             # Create and return a joined / cleaned chunk
@@ -333,11 +423,75 @@ class TaskFrameProvider(IFrameProvider):
                 dump_unchanged=True,
             )
 
-        buffer, mime_type = cache.get_or_set_task_chunk(
+        buffer, mime_type, checksum = cache.get_or_set_task_chunk(
             self._db_task, chunk_number, quality=quality, set_callback=_set_callback
         )
 
-        return return_type(data=buffer, mime=mime_type)
+        return return_type(data=buffer, mime=mime_type, checksum=checksum)
+
+    def get_chunk_file_path(
+        self, chunk_number: int, *, quality: FrameQuality = FrameQuality.ORIGINAL
+    ) -> Optional[str]:
+        chunk_number = self.validate_chunk_number(chunk_number)
+
+        if self._db_task.data.storage_method == models.StorageMethodChoice.CACHE:
+            return None
+
+        task_chunk_frame_set = self._get_task_chunk_frame_set(chunk_number)
+        matching_chunk = self._find_matching_segment_chunk(
+            task_chunk_frame_set, self._get_task_chunk_segments(task_chunk_frame_set)
+        )
+        if matching_chunk is None:
+            return None
+
+        segment_frame_provider, matching_chunk_index = matching_chunk
+        return segment_frame_provider.get_chunk_file_path(matching_chunk_index, quality=quality)
+
+    def _get_task_chunk_frame_set(self, chunk_number: int) -> set[int]:
+        db_data = self._db_task.data
+        step = db_data.get_frame_step()
+        task_chunk_start_frame = chunk_number * db_data.chunk_size
+        task_chunk_stop_frame = (chunk_number + 1) * db_data.chunk_size - 1
+        return set(
+            range(
+                db_data.start_frame + task_chunk_start_frame * step,
+                min(db_data.start_frame + task_chunk_stop_frame * step, db_data.stop_frame) + step,
+                step,
+            )
+        )
+
+    def _get_task_chunk_segments(self, task_chunk_frame_set: set[int]) -> list[models.Segment]:
+        matching_segments: list[models.Segment] = sorted(
+            [
+                s
+                for s in map(
+                    self._get_segment_by_id,
+                    self._get_segment_index().find_all(
+                        min(task_chunk_frame_set), max(task_chunk_frame_set)
+                    ),
+                )
+                if not task_chunk_frame_set.isdisjoint(s.frame_set)
+            ],
+            key=lambda s: s.start_frame,
+        )
+        assert matching_segments
+        return matching_segments
+
+    def _find_matching_segment_chunk(
+        self, task_chunk_frame_set: set[int], matching_segments: list[models.Segment]
+    ) -> Optional[tuple[SegmentFrameProvider, int]]:
+        "Returns the job chunk consisting of the task chunk frames, if there is one"
+        if len(matching_segments) != 1:
+            return None
+
+        segment_frame_provider = SegmentFrameProvider(matching_segments[0])
+        matching_chunk_index = segment_frame_provider.find_matching_chunk(
+            sorted(task_chunk_frame_set)
+        )
+        if matching_chunk_index is None:
+            return None
+
+        return segment_frame_provider, matching_chunk_index
 
     def get_frame(
         self,
@@ -381,7 +535,7 @@ class TaskFrameProvider(IFrameProvider):
 
             if not db_segment:
                 db_segment = self._get_segment(idx)
-                db_segment_frame_set = set(db_segment.frame_set)
+                db_segment_frame_set = db_segment.frame_set
                 db_segment_frame_provider = SegmentFrameProvider(db_segment)
 
             yield db_segment_frame_provider.get_frame(idx, quality=quality, out_type=out_type)
@@ -392,21 +546,127 @@ class TaskFrameProvider(IFrameProvider):
 
         abs_frame_number = self.get_abs_frame_number(validated_frame_number)
 
-        return next(
-            s
-            for s in self._db_task.segment_set.all()
-            if s.type == models.SegmentType.RANGE
-            if abs_frame_number in s.frame_set
-        )
+        segment_id = self._get_segment_index().find(abs_frame_number)
+        assert segment_id is not None, f"Can't find a segment for the frame {abs_frame_number}"
+        return self._get_segment_by_id(segment_id)
+
+    def _get_segment_index(self) -> _TaskSegmentIndex:
+        if not self._segment_index:
+            self._segment_index = _get_task_segment_index(self._db_task)
+
+        return self._segment_index
+
+    def _get_segment_by_id(self, segment_id: int) -> models.Segment:
+        db_segment = self._segments.get(segment_id)
+        if not db_segment:
+            if prefetched_segments := getattr(self._db_task, "_prefetched_objects_cache", {}).get(
+                "segment_set"
+            ):
+                db_segment = next(s for s in prefetched_segments if s.id == segment_id)
+            else:
+                db_segment = self._db_task.segment_set.get(id=segment_id)
+                db_segment.task = self._db_task  # avoid extra requests
+
+            self._segments[segment_id] = db_segment
+
+        return db_segment
 
     def _get_segment_frame_provider(self, frame_number: int) -> SegmentFrameProvider:
         return SegmentFrameProvider(self._get_segment(self.validate_frame_number(frame_number)))
 
 
+class _SegmentFrameIndex:
+    """
+    Maps absolute frame numbers of a segment to the frame positions and chunks
+    """
+
+    def __init__(self, frames: Sequence[int], *, chunk_size: int) -> None:
+        self.chunk_size = chunk_size
+
+        self._positions: Optional[dict[int, int]]
+        if isinstance(frames, range):
+            # range provides constant time lookups without extra memory
+            self._frames = frames
+            self._positions = None
+        else:
+            self._frames = array("q", sorted(frames))
+            self._positions = {frame: position for position, frame in enumerate(self._frames)}
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, abs_frame_number: int) -> bool:
+        return self.get_position(abs_frame_number) is not None
+
+    def get_position(self, abs_frame_number: int) -> Optional[int]:
+        if self._positions is None:
+            if abs_frame_number not in self._frames:
+                return None
+
+            return self._frames.index(abs_frame_number)
+
+        return self._positions.get(abs_frame_number)
+
+    def get_chunk_frames(self, chunk_number: int) -> Sequence[int]:
+        return self._frames[self.chunk_size * chunk_number : self.chunk_size * (chunk_number + 1)]
+
+    def find_chunk(self, frames: Sequence[int]) -> Optional[int]:
+        if not frames:
+            return None
+
+        first_frame_position = self.get_position(frames[0])
+        if first_frame_position is None:
+            return None
+
+        chunk_number, first_frame_offset = divmod(first_frame_position, self.chunk_size)
+        if first_frame_offset or list(self.get_chunk_frames(chunk_number)) != list(frames):
+            return None
+
+        return chunk_number
+
+
+_segment_frame_indices: OrderedDict[tuple, _SegmentFrameIndex] = OrderedDict()
+_segment_frame_indices_lock = threading.Lock()
+_SEGMENT_FRAME_INDICES_MAX_COUNT = 256
+
+
+def _get_segment_frame_index(db_segment: models.Segment) -> _SegmentFrameIndex:
+    db_task = db_segment.task
+    db_data = db_task.data
+
+    # The index is shared by the providers of the same segment in this process.
+    # The segment frames are not changed after creation, the task update date
+    # is added to the key to rebuild the index in case of other changes.
+    # The frame set is only computed if the index has to be built.
+    index_key = (
+        db_segment.id,
+        db_data.chunk_size,
+        db_segment.start_frame,
+        db_segment.stop_frame,
+        db_task.updated_date,
+    )
+
+    with _segment_frame_indices_lock:
+        frame_index = _segment_frame_indices.get(index_key)
+        if frame_index:
+            _segment_frame_indices.move_to_end(index_key)
+            return frame_index
+
+    frame_index = _SegmentFrameIndex(db_segment.frame_set, chunk_size=db_data.chunk_size)
+
+    with _segment_frame_indices_lock:
+        _segment_frame_indices[index_key] = frame_index
+        while _SEGMENT_FRAME_INDICES_MAX_COUNT < len(_segment_frame_indices):
+            _segment_frame_indices.popitem(last=False)
+
+    return frame_index
+
+
 class SegmentFrameProvider(IFrameProvider):
     def __init__(self, db_segment: models.Segment) -> None:
         super().__init__()
         self._db_segment = db_segment
+        self._frame_index = _get_segment_frame_index(db_segment)
 
         db_data = db_segment.task.data
 
@@ -468,39 +728,30 @@ class SegmentFrameProvider(IFrameProvider):
             loader.unload()
 
     def __len__(self):
-        return self._db_segment.frame_count
+        return len(self._frame_index)
 
     def validate_frame_number(self, frame_number: int) -> Tuple[int, int, int]:
-        frame_sequence = list(self._db_segment.frame_set)
         abs_frame_number = self._get_abs_frame_number(self._db_segment.task.data, frame_number)
-        if abs_frame_number not in frame_sequence:
+        frame_position = self._frame_index.get_position(abs_frame_number)
+        if frame_position is None:
             raise ValidationError(f"Incorrect requested frame number: {frame_number}")
 
-        # TODO: maybe optimize search
-        chunk_number, frame_position = divmod(
-            frame_sequence.index(abs_frame_number), self._db_segment.task.data.chunk_size
-        )
+        chunk_number, frame_position = divmod(frame_position, self._frame_index.chunk_size)
         return frame_number, chunk_number, frame_position
 
     def get_chunk_number(self, frame_number: int) -> int:
         return int(frame_number) // self._db_segment.task.data.chunk_size
 
+    def get_chunk_frames(self, chunk_number: int) -> Sequence[int]:
+        "Returns absolute frame numbers of the chunk frames"
+        return self._frame_index.get_chunk_frames(chunk_number)
+
     def find_matching_chunk(self, frames: Sequence[int]) -> Optional[int]:
-        return next(
-            (
-                i
-                for i, chunk_frames in enumerate(
-                    take_by(
-                        sorted(self._db_segment.frame_set), self._db_segment.task.data.chunk_size
-                    )
-                )
-                if frames == set(chunk_frames)
-            ),
-            None,
-        )
+        "Returns the number of the chunk consisting of the sorted frames, if there is one"
+        return self._frame_index.find_chunk(frames)
 
     def validate_chunk_number(self, chunk_number: int) -> int:
-        segment_size = self._db_segment.frame_count
+        segment_size = len(self._frame_index)
         last_chunk = math.ceil(segment_size / self._db_segment.task.data.chunk_size) - 1
         if not 0 <= chunk_number <= last_chunk:
             raise ValidationError(
@@ -512,15 +763,29 @@ class SegmentFrameProvider(IFrameProvider):
 
     def get_preview(self) -> DataWithMeta[BytesIO]:
         cache = MediaCache()
-        preview, mime = cache.get_or_set_segment_preview(self._db_segment)
-        return DataWithMeta[BytesIO](preview, mime=mime)
+        preview, mime, checksum = cache.get_or_set_segment_preview(self._db_segment)
+        return DataWithMeta[BytesIO](preview, mime=mime, checksum=checksum)
 
     def get_chunk(
         self, chunk_number: int, *, quality: FrameQuality = FrameQuality.ORIGINAL
     ) -> DataWithMeta[BytesIO]:
         chunk_number = self.validate_chunk_number(chunk_number)
-        chunk_data, mime = self._loaders[quality].read_chunk(chunk_number)
-        return DataWithMeta[BytesIO](chunk_data, mime=mime)
+        return self._loaders[quality].read_chunk(chunk_number)
+
+    def get_chunk_file_path(
+        self, chunk_number: int, *, quality: FrameQuality = FrameQuality.ORIGINAL
+    ) -> Optional[str]:
+        chunk_number = self.validate_chunk_number(chunk_number)
+
+        loader = self._loaders[quality]
+        if not isinstance(loader, _FileChunkLoader):
+            return None
+
+        chunk_path = loader.get_chunk_path(chunk_number)
+        if not os.path.isfile(chunk_path):
+            return None
+
+        return chunk_path
 
     def _get_raw_frame(
         self,
@@ -560,15 +825,18 @@ class SegmentFrameProvider(IFrameProvider):
         db_data = self._db_segment.task.data
 
         cache = MediaCache()
+        checksum = None
         if db_data.storage_method == models.StorageMethodChoice.CACHE:
-            data, mime = cache.get_or_set_frame_context_images_chunk(db_data, frame_number)
+            data, mime, checksum = cache.get_or_set_frame_context_images_chunk(
+                db_data, frame_number
+            )
         else:
             data, mime = cache.prepare_context_images_chunk(db_data, frame_number)
 
         if not data.getvalue():
             return None
 
-        return DataWithMeta[BytesIO](data, mime=mime)
+        return DataWithMeta[BytesIO](data, mime=mime, checksum=checksum)
 
     def iterate_frames(
         self,
@@ -582,9 +850,8 @@ class SegmentFrameProvider(IFrameProvider):
         if stop_frame:
             frame_range = itertools.takewhile(lambda x: x <= stop_frame, frame_range)
 
-        segment_frame_set = set(self._db_segment.frame_set)
         for idx in frame_range:
-            if self._get_abs_frame_number(self._db_segment.task.data, idx) in segment_frame_set:
+            if self._get_abs_frame_number(self._db_segment.task.data, idx) in self._frame_index:
                 yield self.get_frame(idx, quality=quality, out_type=out_type)
 
 
@@ -619,7 +886,7 @@ class JobFrameProvider(SegmentFrameProvider):
         cache = MediaCache()
         cached_chunk = cache.get_segment_task_chunk(self._db_segment, chunk_number, quality=quality)
         if cached_chunk:
-            return return_type(cached_chunk[0], cached_chunk[1])
+            return return_type(*cached_chunk)
 
         db_data = self._db_segment.task.data
         step = db_data.get_frame_step()
@@ -661,11 +928,11 @@ class JobFrameProvider(SegmentFrameProvider):
             else:
                 assert False
 
-        buffer, mime_type = cache.get_or_set_segment_task_chunk(
+        buffer, mime_type, checksum = cache.get_or_set_segment_task_chunk(
             self._db_segment, chunk_number, quality=quality, set_callback=_set_callback
         )
 
-        return return_type(data=buffer, mime=mime_type)
+        return return_type(data=buffer, mime=mime_type, checksum=checksum)
 
 
 @overload
@@ -4,9 +4,10 @@
 
 from functools import wraps
 from itertools import islice
-from typing import Any, Callable, Iterator, TypeVar, overload
+from typing import Any, Callable, Iterator, Sequence, TypeVar, overload
 
 import attrs
+import numpy as np
 from attr import field
 
 T = TypeVar("T", bound=int | float | str)
@@ -76,6 +77,7 @@ class LazyListMeta(type):
             "__add__",
             "__iadd__",
             "__eq__",
+            "__ne__",
             "__gt__",
             "__ge__",
             "__lt__",
@@ -267,3 +269,144 @@ class LazyList(list[T], metaclass=LazyListMeta):
         self._parsed = state["parsed"]
         if self._parsed:
             self.extend(state["parsed_elements"])
+
+
+_PACKED_HEADER = b"\x00"
+_PACKED_DTYPES = {
+    b"H": np.dtype("<u2"),
+    b"I": np.dtype("<u4"),
+    b"f": np.dtype("<f4"),
+    b"d": np.dtype("<f8"),
+}
+_PACKED_PREFIX_SIZE = len(_PACKED_HEADER) + 1
+
+
+def is_packed_float_list(data: bytes) -> bool:
+    return data[: len(_PACKED_HEADER)] == _PACKED_HEADER
+
+
+def pack_float_list(values: Sequence[float]) -> bytes:
+    """
+    Packs a list of numbers into a compact binary representation.
+    The smallest type that keeps all the values exactly is selected:
+    non-negative integers (e.g. RLE masks) are stored as 16 or 32-bit unsigned integers,
+    other values as 32 or 64-bit floats.
+    """
+
+    if isinstance(values, PackedFloatList) and not values._parsed:
+        return values._data
+
+    array = np.asarray(values, dtype=np.float64)
+    if not array.size:
+        return b""
+
+    if (
+        np.isfinite(array).all()
+        and not np.signbit(array).any()
+        and (array == np.trunc(array)).all()
+    ):
+        max_value = array.max()
+        if max_value <= np.iinfo(np.uint16).max:
+            type_code = b"H"
+        elif max_value <= np.iinfo(np.uint32).max:
+            type_code = b"I"
+        else:
+            type_code = b"d"
+    elif np.array_equal(array.astype(np.float32), array, equal_nan=True):
+        type_code = b"f"
+    else:
+        type_code = b"d"
+
+    return _PACKED_HEADER + type_code + array.astype(_PACKED_DTYPES[type_code]).tobytes()
+
+
+def _restore_packed_float_list(data: bytes) -> "PackedFloatList":
+    return PackedFloatList(data=data)
+
+
+@attrs.define(slots=True, repr=False)
+class PackedFloatList(LazyList[float]):
+    """
+    A list of floats, backed by the binary representation produced by pack_float_list().
+    The values can be accessed as a NumPy array without unpacking, using as_array().
+    Using any list method will result in unpacking of all the elements,
+    after that the instance will behave just as a regular python list.
+    """
+
+    _data: bytes = b""
+
+    def __repr__(self) -> str:
+        if self._parsed:
+            return f"PackedFloatList({list.__repr__(self)})"
+        return f"PackedFloatList(<{self._compute_max_length()} packed values>)"
+
+    def __str__(self) -> str:
+        return self._separator.join(map(str, self))
+
+    def __deepcopy__(self, memodict: Any = None) -> list[float]:
+        if not self._parsed:
+            # the packed data is immutable, so it can be shared
+            return PackedFloatList(data=self._data)
+        return list(self)
+
+    def as_array(self) -> np.ndarray:
+        """
+        Returns the values as a NumPy array.
+        If the list has not been unpacked, this is a read-only view of the packed data
+        in the stored type.
+        """
+
+        if self._parsed:
+            return np.fromiter(list.__iter__(self), dtype=np.float64, count=list.__len__(self))
+
+        if not self._data:
+            return np.empty(0, dtype=np.float64)
+
+        dtype = _PACKED_DTYPES[self._data[len(_PACKED_HEADER) : _PACKED_PREFIX_SIZE]]
+        return np.frombuffer(self._data, dtype=dtype, offset=_PACKED_PREFIX_SIZE)
+
+    def _parse_up_to(self, index: int) -> None:
+        if self._parsed:
+            return
+
+        # unpacking is done for the whole list at once, it's cheap
+        list.extend(self, self.as_array().astype(np.float64).tolist())
+        self._mark_parsed()
+
+    def _mark_parsed(self):
+        super()._mark_parsed()
+        self._data = b""
+
+    def _iter_unparsed(self):
+        if self._parsed:
+            return
+
+        self._parse_up_to(-1)
+        yield from list.__iter__(self)
+
+    def _compute_max_length(self, string=None) -> int:
+        if self._parsed:
+            return list.__len__(self)
+
+        if not self._data:
+            return 0
+
+        dtype = _PACKED_DTYPES[self._data[len(_PACKED_HEADER) : _PACKED_PREFIX_SIZE]]
+        return (len(self._data) - _PACKED_PREFIX_SIZE) // dtype.itemsize
+
+    # support pickling
+
+    def __reduce__(self):
+        return _restore_packed_float_list, (pack_float_list(self),)
+
+
+def as_float_array(values: Sequence[float]) -> np.ndarray:
+    """
+    Returns the values as a float NumPy array.
+    Unlike np.asarray(), doesn't unpack the values of a PackedFloatList.
+    """
+
+    if isinstance(values, PackedFloatList):
+        return values.as_array().astype(np.float64, copy=False)
+
+    return np.asarray(values, dtype=np.float64)
@@ -0,0 +1,45 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from django.core.management.base import BaseCommand
+
+from cvat.apps.engine.lazy_list import LazyList
+from cvat.apps.engine.models import LabeledShape, TrackedShape
+
+
+class Command(BaseCommand):
+    help = (
+        "Converts the shape points saved in the old text format to the packed format. "
+        "The old values remain readable and are converted when the shapes are saved, "
+        "so running this command is optional. Each batch is committed separately, "
+        "the command can be interrupted and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="The number of shapes read at once"
+        )
+
+    def handle(self, *args, batch_size: int, **options):
+        for model in [LabeledShape, TrackedShape]:
+            repacked_count = 0
+            last_id = 0
+            while True:
+                shapes = list(
+                    model.objects.filter(id__gt=last_id)
+                    .order_by("id")
+                    .only("id", "points")[:batch_size]
+                )
+                if not shapes:
+                    break
+
+                last_id = shapes[-1].id
+
+                # the text values are read as LazyList, the packed ones - as PackedFloatList.
+                # The values are packed when saved
+                text_shapes = [shape for shape in shapes if type(shape.points) is LazyList]
+                model.objects.bulk_update(text_shapes, ["points"])
+                repacked_count += len(text_shapes)
+
+            self.stdout.write(f"{model.__name__}: repacked points of {repacked_count} shapes")
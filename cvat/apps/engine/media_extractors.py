@@ -5,16 +5,19 @@
 
 from __future__ import annotations
 
+import collections
+import concurrent.futures
 import os
 import sysconfig
+import threading
 import tempfile
 import shutil
 import zipfile
 import io
 import itertools
+import json
 import struct
 from abc import ABC, abstractmethod
-from bisect import bisect
 from contextlib import ExitStack, closing, contextmanager
 from dataclasses import dataclass
 from enum import IntEnum
@@ -29,6 +32,7 @@ import av.container
 import av.video.stream
 import numpy as np
 from natsort import os_sorted
+from django.conf import settings
 from pyunpack import Archive
 from PIL import Image, ImageFile, ImageOps
 from random import shuffle
@@ -735,14 +739,84 @@ class ImageReaderWithManifest:
         for idx in frame_ids:
             yield self._manifest[idx]
 
+class _VideoKeyFrameIndex:
+    "The key frames of a video manifest, sorted by the frame number"
+
+    def __init__(self, frame_numbers: np.ndarray, timestamps: np.ndarray):
+        self._frame_numbers = frame_numbers
+        self._timestamps = timestamps
+
+    @classmethod
+    def from_manifest(cls, manifest: VideoManifestManager) -> _VideoKeyFrameIndex:
+        frame_numbers = []
+        timestamps = []
+
+        with open(manifest.manifest.path, 'r') as manifest_file:
+            for _ in range(manifest.manifest.get_header_lines_count()):
+                manifest_file.readline()
+
+            for line in manifest_file:
+                if not line.strip():
+                    continue
+
+                key_frame = json.loads(line)
+                frame_numbers.append(key_frame['number'])
+                timestamps.append(key_frame['pts'])
+
+        frame_numbers = np.array(frame_numbers, dtype=np.int64)
+        timestamps = np.array(timestamps, dtype=np.int64)
+        if np.any(frame_numbers[1:] <= frame_numbers[:-1]):
+            raise ValueError('Invalid saved key frames sequence in manifest file')
+
+        return cls(frame_numbers, timestamps)
+
+    def get_nearest_left_key_frame(self, frame_id: int) -> tuple[int, int]:
+        pos = int(np.searchsorted(self._frame_numbers, frame_id, side='right'))
+        if not pos:
+            return 0, 0
+
+        return int(self._frame_numbers[pos - 1]), int(self._timestamps[pos - 1])
+
+    def __len__(self):
+        return len(self._frame_numbers)
+
+_video_key_frame_indices: collections.OrderedDict[
+    str, tuple[tuple[int, int], _VideoKeyFrameIndex]
+] = collections.OrderedDict()
+_video_key_frame_indices_lock = threading.Lock()
+_VIDEO_KEY_FRAME_INDICES_MAX_COUNT = 64
+
+def _get_video_key_frame_index(manifest: VideoManifestManager) -> _VideoKeyFrameIndex:
+    manifest_path = manifest.manifest.path
+    manifest_stat = os.stat(manifest_path)
+
+    # The manifest can be recreated in place, e.g. if it was missing
+    version = (manifest_stat.st_mtime_ns, manifest_stat.st_size)
+
+    with _video_key_frame_indices_lock:
+        cached_item = _video_key_frame_indices.get(manifest_path)
+        if cached_item and cached_item[0] == version:
+            _video_key_frame_indices.move_to_end(manifest_path)
+            return cached_item[1]
+
+    key_frame_index = _VideoKeyFrameIndex.from_manifest(manifest)
+
+    with _video_key_frame_indices_lock:
+        _video_key_frame_indices[manifest_path] = (version, key_frame_index)
+        _video_key_frame_indices.move_to_end(manifest_path)
+        while _VIDEO_KEY_FRAME_INDICES_MAX_COUNT < len(_video_key_frame_indices):
+            _video_key_frame_indices.popitem(last=False)
+
+    return key_frame_index
+
 class VideoReaderWithManifest:
     # TODO: merge this class with VideoReader
 
     def __init__(self, manifest_path: str, source_path: str, *, allow_threading: bool = False):
         self.source_path = source_path
+
+        # The manifest index is not required for seeking, the key frames are read separately
         self.manifest = VideoManifestManager(manifest_path)
-        if self.manifest.exists:
-            self.manifest.init_index()
 
         self.allow_threading = allow_threading
 
@@ -755,16 +829,7 @@ class VideoReaderWithManifest:
         return _AvVideoReading().decode_stream(container, video_stream)
 
     def _get_nearest_left_key_frame(self, frame_id: int) -> tuple[int, int]:
-        nearest_left_keyframe_pos = bisect(
-            self.manifest, frame_id, key=lambda entry: entry.get('number')
-        )
-        if nearest_left_keyframe_pos:
-            frame_number = self.manifest[nearest_left_keyframe_pos - 1].get('number')
-            timestamp = self.manifest[nearest_left_keyframe_pos - 1].get('pts')
-        else:
-            frame_number = 0
-            timestamp = 0
-        return frame_number, timestamp
+        return _get_video_key_frame_index(self.manifest).get_nearest_left_key_frame(frame_id)
 
     def iterate_frames(self, *, frame_filter: Iterable[int]) -> Iterable[av.VideoFrame]:
         "frame_ids must be an ordered sequence in the ascending order"
@@ -805,6 +870,66 @@ class VideoReaderWithManifest:
                     if next_frame_filter_frame is None:
                         return
 
+class _FrameEncodingExecutor:
+    """
+    A process-wide thread pool for chunk frame encoding.
+    Pillow and libav release the GIL while encoding, so threads can use several CPU cores.
+    """
+
+    _executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> Optional[concurrent.futures.ThreadPoolExecutor]:
+        max_workers = settings.MEDIA_CHUNK_ENCODING_THREADS
+        if max_workers <= 1:
+            return None
+
+        with cls._lock:
+            if not cls._executor:
+                cls._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="chunk-encoding"
+                )
+
+            return cls._executor
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # The executor threads don't exist in the forked process
+        cls._executor = None
+        cls._lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_FrameEncodingExecutor._reset_after_fork)
+
+_R = TypeVar("_R")
+
+def _map_ordered(func: Callable[[_T], _R], items: Iterable[_T]) -> Iterator[_R]:
+    """
+    Applies the function to the items in the frame encoding threads.
+    The results are returned in the input order. Only a limited number of items
+    is processed at once, so the input can be a lazy iterator.
+    """
+
+    executor = _FrameEncodingExecutor.get()
+    if not executor:
+        yield from map(func, items)
+        return
+
+    max_items_in_progress = 2 * settings.MEDIA_CHUNK_ENCODING_THREADS
+    futures: collections.deque[concurrent.futures.Future] = collections.deque()
+    try:
+        for item in items:
+            if max_items_in_progress <= len(futures):
+                yield futures.popleft().result()
+
+            futures.append(executor.submit(func, item))
+
+        while futures:
+            yield futures.popleft().result()
+    finally:
+        for future in futures:
+            future.cancel()
+
 class IChunkWriter(ABC):
     def __init__(self, quality, dimension=DimensionType.DIM_2D):
         self._image_quality = quality
@@ -930,29 +1055,48 @@ class ZipChunkWriter(IChunkWriter):
         return []
 
 class ZipCompressedChunkWriter(ZipChunkWriter):
+    def __init__(
+        self, quality, dimension=DimensionType.DIM_2D, *, parallel_frame_encoding: bool = True
+    ):
+        """
+        Args:
+            parallel_frame_encoding: compress the frames of a chunk in the frame encoding threads.
+                Can be disabled if the chunks are already encoded in parallel.
+        """
+
+        super().__init__(quality, dimension=dimension)
+        self._parallel_frame_encoding = parallel_frame_encoding
+
     def save_as_chunk(
         self,
         images: Iterator[tuple[Image.Image|io.IOBase|str, str, str]],
         chunk_path: str, *, compress_frames: bool = True, zip_compress_level: int = 0
     ):
-        image_sizes = []
-        with zipfile.ZipFile(chunk_path, 'x', compresslevel=zip_compress_level) as zip_chunk:
-            for idx, (image, path, _) in enumerate(images):
-                if self._dimension == DimensionType.DIM_2D:
-                    if compress_frames:
-                        w, h, image_buf = self._compress_image(image, self._image_quality)
-                    else:
-                        assert isinstance(image, io.IOBase)
-                        image_buf = io.BytesIO(image.read())
-                        with Image.open(image_buf) as img:
-                            w, h = img.size
-                    extension = self.IMAGE_EXT
+        def _prepare_frame(frame: tuple[Image.Image|io.IOBase|str, str, str]):
+            image, path, _ = frame
+            if self._dimension == DimensionType.DIM_2D:
+                if compress_frames:
+                    w, h, image_buf = self._compress_image(image, self._image_quality)
                 else:
-                    if isinstance(image, io.BytesIO):
-                        image_buf, extension, w, h = self._write_pcd_file(image)
-                    else:
-                        image_buf, extension, w, h = self._write_pcd_file(path)
+                    assert isinstance(image, io.IOBase)
+                    image_buf = io.BytesIO(image.read())
+                    with Image.open(image_buf) as img:
+                        w, h = img.size
+                extension = self.IMAGE_EXT
+            else:
+                if isinstance(image, io.BytesIO):
+                    image_buf, extension, w, h = self._write_pcd_file(image)
+                else:
+                    image_buf, extension, w, h = self._write_pcd_file(path)
 
+            return image_buf, extension, w, h
+
+        image_sizes = []
+        with zipfile.ZipFile(chunk_path, 'x', compresslevel=zip_compress_level) as zip_chunk:
+            # The frames are independent, they can be prepared in parallel
+            for idx, (image_buf, extension, w, h) in enumerate(
+                (_map_ordered if self._parallel_frame_encoding else map)(_prepare_frame, images)
+            ):
                 image_sizes.append((w, h))
                 arcname = '{:06d}.{}'.format(idx, extension)
                 zip_chunk.writestr(arcname, image_buf.getvalue())
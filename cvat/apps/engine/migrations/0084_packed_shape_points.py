@@ -0,0 +1,27 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:00
+
+import cvat.apps.engine.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("engine", "0083_move_to_segment_chunks"),
+    ]
+
+    # The existing text values are kept as is and remain readable.
+    # They are converted to the packed format when the shapes are saved,
+    # or with the "repackshapepoints" management command.
+    operations = [
+        migrations.AlterField(
+            model_name="labeledshape",
+            name="points",
+            field=cvat.apps.engine.models.PackedFloatArrayField(default=[]),
+        ),
+        migrations.AlterField(
+            model_name="trackedshape",
+            name="points",
+            field=cvat.apps.engine.models.PackedFloatArrayField(default=[]),
+        ),
+    ]
@@ -22,7 +22,9 @@ from django.db.models.fields import FloatField
 from django.db.models import Q, TextChoices
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
-from cvat.apps.engine.lazy_list import LazyList
+from cvat.apps.engine.lazy_list import (
+    LazyList, PackedFloatList, is_packed_float_list, pack_float_list
+)
 
 from cvat.apps.engine.utils import parse_specific_attributes, chunked_list
 from cvat.apps.events.utils import cache_deleted
@@ -219,6 +221,38 @@ class FloatArrayField(AbstractArrayField):
 class IntArrayField(AbstractArrayField):
     converter = int
 
+class PackedFloatArrayField(models.BinaryField):
+    """
+    Stores a list of floats in a compact binary format. The values are returned as
+    a PackedFloatList, which can be used as a NumPy array without parsing.
+    The text format of FloatArrayField is also accepted, for the values saved before.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        if not value:
+            return []
+
+        if not isinstance(value, str):
+            value = bytes(value)
+            if is_packed_float_list(value):
+                return PackedFloatList(data=value)
+
+            value = value.decode()
+
+        return LazyList(string=value, separator=FloatArrayField.separator, converter=float)
+
+    def to_python(self, value):
+        if isinstance(value, list):
+            return value
+
+        return self.from_db_value(value, None, None)
+
+    def get_prep_value(self, value):
+        return pack_float_list(value)
+
+    def value_to_string(self, obj):
+        return FloatArrayField.separator.join(map(str, self.value_from_object(obj)))
+
 class Data(models.Model):
     chunk_size = models.PositiveIntegerField(null=True)
     size = models.PositiveIntegerField(default=0)
@@ -294,7 +328,7 @@ class Data(models.Model):
         return os.path.join(self.get_upload_dirname(), 'manifest.jsonl')
 
     def get_index_path(self):
-        return os.path.join(self.get_upload_dirname(), 'index.json')
+        return os.path.join(self.get_upload_dirname(), 'index.bin')
 
     def make_dirs(self):
         data_path = self.get_data_dirname()
@@ -638,7 +672,16 @@ class Segment(models.Model):
         if self.type == SegmentType.RANGE:
             return frame_range
         elif self.type == SegmentType.SPECIFIC_FRAMES:
-            return set(frame_range).intersection(self.frames or [])
+            # The property can be used many times in a row, avoid recomputing the set.
+            # The frames can be changed in place, so a copy is compared
+            frames = tuple(self.frames or [])
+            cached = getattr(self, '_cached_frame_set', None)
+            if cached and cached[0] == frame_range and cached[1] == frames:
+                return cached[2]
+
+            frame_set = frozenset(frame for frame in frames if frame in frame_range)
+            self._cached_frame_set = (frame_range, frames, frame_set)
+            return frame_set
         else:
             assert False
 
@@ -972,7 +1015,7 @@ class Shape(models.Model):
     occluded = models.BooleanField(default=False)
     outside = models.BooleanField(default=False)
     z_order = models.IntegerField(default=0)
-    points = FloatArrayField(default=[])
+    points = PackedFloatArrayField(default=[])
     rotation = FloatField(default=0)
 
     class Meta:
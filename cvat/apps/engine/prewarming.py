@@ -0,0 +1,189 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Background preparation of media cache chunks, so that the chunks are ready
+by the time annotators request them
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+import django_rq
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rq.exceptions import InvalidJobOperation
+from rq.job import Job as RQJob
+from rq.job import JobStatus as RQJobStatus
+
+from cvat.apps.engine import models
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.log import ServerLogManager
+from cvat.apps.engine.media_extractors import FrameQuality
+
+slogger = ServerLogManager(__name__)
+
+
+def _get_queue():
+    return django_rq.get_queue(settings.CVAT_QUEUES.CHUNKS.value)
+
+
+def _is_enabled(db_task: models.Task) -> bool:
+    db_data = db_task.data
+    return bool(db_data) and (
+        db_data.storage_method == models.StorageMethodChoice.CACHE
+        or not settings.MEDIA_CACHE_ALLOW_STATIC_CACHE
+    )
+
+
+def _make_rq_id(segment_id: int, chunk_number: int, quality: FrameQuality) -> str:
+    return f"prewarm-segment-{segment_id}-chunk-{chunk_number}-{quality}"
+
+
+def _get_segment_chunk_count(db_segment: models.Segment) -> int:
+    return math.ceil(db_segment.frame_count / db_segment.task.data.chunk_size)
+
+
+def _prepare_segment_chunk(segment_id: int, chunk_number: int, quality: FrameQuality) -> None:
+    db_segment = models.Segment.objects.select_related("task__data").filter(id=segment_id).first()
+    if not db_segment:
+        return  # the segment was removed while the job was in the queue
+
+    media_cache = MediaCache()
+    if media_cache.has_segment_chunk(db_segment, chunk_number, quality=quality):
+        return
+
+    media_cache.get_or_set_segment_chunk(db_segment, chunk_number, quality=quality)
+
+
+def enqueue_segment_chunks(
+    db_segment: models.Segment,
+    chunk_numbers: Iterable[int],
+    *,
+    quality: FrameQuality = FrameQuality.COMPRESSED,
+) -> None:
+    """
+    Schedules background preparation of the segment chunks in the media cache.
+    The chunks that are already scheduled or invalid are skipped.
+    """
+
+    if not settings.MEDIA_CACHE_PREWARMING_ENABLED or not _is_enabled(db_segment.task):
+        return
+
+    chunk_count = _get_segment_chunk_count(db_segment)
+    chunk_numbers = [
+        chunk_number for chunk_number in chunk_numbers if 0 <= chunk_number < chunk_count
+    ]
+    if not chunk_numbers:
+        return
+
+    queue = _get_queue()
+
+    # The chunks can also be prepared on request,
+    # don't let the queue grow if the workers don't keep up
+    free_queue_slots = settings.MEDIA_CACHE_PREWARMING_MAX_QUEUED_JOBS - queue.count
+
+    rq_ids = [_make_rq_id(db_segment.id, chunk_number, quality) for chunk_number in chunk_numbers]
+    rq_jobs = RQJob.fetch_many(rq_ids, connection=queue.connection)
+
+    for chunk_number, rq_id, rq_job in zip(chunk_numbers, rq_ids, rq_jobs):
+        if rq_job:
+            if rq_job.get_status(refresh=False) in (RQJobStatus.QUEUED, RQJobStatus.STARTED):
+                continue
+
+            rq_job.delete()
+
+        if free_queue_slots <= 0:
+            slogger.glob.info("Skipping media cache prewarming: the queue is full")
+            return
+
+        free_queue_slots -= 1
+        queue.enqueue_call(
+            func=_prepare_segment_chunk,
+            args=(db_segment.id, chunk_number, quality),
+            job_id=rq_id,
+            result_ttl=0,
+            failure_ttl=settings.MEDIA_CACHE_PREWARMING_FAILED_TTL.total_seconds(),
+        )
+
+
+def enqueue_task_chunks(db_task: models.Task) -> None:
+    "Schedules preparation of the first chunks of each task job"
+
+    def _enqueue():
+        chunk_numbers = range(settings.MEDIA_CACHE_PREWARMING_FIRST_CHUNKS)
+        for db_segment in db_task.segment_set.filter(type=models.SegmentType.RANGE).all():
+            db_segment.task = db_task  # avoid extra DB requests
+            enqueue_segment_chunks(db_segment, chunk_numbers)
+
+    transaction.on_commit(_enqueue)
+
+
+def enqueue_job_chunks(db_job: models.Job) -> None:
+    "Schedules preparation of the first chunks of the job"
+
+    if db_job.type != models.JobType.ANNOTATION:
+        return
+
+    db_segment = db_job.segment
+    transaction.on_commit(
+        lambda: enqueue_segment_chunks(
+            db_segment, range(settings.MEDIA_CACHE_PREWARMING_FIRST_CHUNKS)
+        )
+    )
+
+
+def enqueue_next_job_chunks(db_job: models.Job, chunk_number: int) -> None:
+    """
+    Schedules preparation of the chunks following the requested one.
+    It's called on each chunk request, so the repeated calls for the same chunk are skipped.
+    """
+
+    if not settings.MEDIA_CACHE_PREWARMING_ENABLED or db_job.type != models.JobType.ANNOTATION:
+        return
+
+    if not caches["media"].add(
+        f"prewarm-job-{db_job.id}-after-chunk-{chunk_number}",
+        True,
+        timeout=settings.MEDIA_CACHE_PREWARMING_REQUEST_INTERVAL,
+    ):
+        return
+
+    enqueue_segment_chunks(
+        db_job.segment,
+        range(chunk_number + 1, chunk_number + 1 + settings.MEDIA_CACHE_PREWARMING_CHUNKS_AHEAD),
+    )
+
+
+def cancel_segment_chunks(segment_id: int, chunk_count: int) -> None:
+    "Cancels the scheduled preparation of the segment chunks, which haven't started yet"
+
+    queue = _get_queue()
+    rq_ids = [
+        _make_rq_id(segment_id, chunk_number, quality)
+        for chunk_number in range(chunk_count)
+        for quality in FrameQuality
+    ]
+
+    for rq_job in RQJob.fetch_many(rq_ids, connection=queue.connection):
+        if not rq_job or rq_job.get_status(refresh=False) != RQJobStatus.QUEUED:
+            continue
+
+        try:
+            rq_job.cancel()
+            rq_job.delete()
+        except InvalidJobOperation:
+            pass  # the job has just started
+
+
+def cancel_job_chunks_on_commit(db_job: models.Job) -> None:
+    if not settings.MEDIA_CACHE_PREWARMING_ENABLED or not _is_enabled(db_job.segment.task):
+        return
+
+    segment_id = db_job.segment_id
+    chunk_count = _get_segment_chunk_count(db_job.segment)
+    transaction.on_commit(lambda: cancel_segment_chunks(segment_id, chunk_count))
@@ -27,8 +27,9 @@ from django.utils import timezone
 
 from cvat.apps.dataset_manager.formats.utils import get_label_color
 from cvat.apps.engine.utils import parse_exception_message
-from cvat.apps.engine import models
+from cvat.apps.engine import models, prewarming
 from cvat.apps.engine.cloud_provider import get_cloud_storage_instance, Credentials, Status
+from cvat.apps.engine.lazy_list import PackedFloatList
 from cvat.apps.engine.log import ServerLogManager
 from cvat.apps.engine.permissions import TaskPermission
 from cvat.apps.engine.utils import parse_specific_attributes, build_field_filter_params, get_list_view_name, reverse
@@ -784,6 +785,13 @@ class JobWriteSerializer(WriteOnceMixin, serializers.ModelSerializer):
             validated_data["assignee_id"] = assignee_id
             validated_data["assignee_updated_date"] = timezone.now()
 
+            if assignee_id is not None:
+                # the assignee is likely to open the job soon
+                prewarming.enqueue_job_chunks(instance)
+
+        if state != instance.state and state == models.StateChoice.COMPLETED:
+            prewarming.cancel_job_chunks_on_commit(instance)
+
         instance = super().update(instance, validated_data)
         return instance
 
@@ -1546,6 +1554,10 @@ class OptimizedFloatListField(serializers.ListField):
         return data
 
     def run_child_validation(self, data):
+        if isinstance(data, PackedFloatList):
+            # the values are read from the DB, they can only be numbers
+            return data
+
         errors = OrderedDict()
         for idx, item in enumerate(data):
             if type(item) not in [int, float]:
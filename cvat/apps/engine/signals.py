@@ -10,7 +10,14 @@ from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import CloudStorage, Data, Job, Profile, Project, StatusChoice, Task, Asset
+from .cache import MediaCache
+from .cloud_provider import (
+    invalidate_storage_content_cache, remove_cached_storage_instance, remove_cached_storage_objects
+)
+from .frame_provider import remove_cached_task_segment_index
+from .models import (
+    CloudStorage, Data, Job, Profile, Project, Segment, StatusChoice, Task, Asset
+)
 
 
 # TODO: need to log any problems reported by shutil.rmtree when the new
@@ -61,6 +68,7 @@ def __delete_asset_handler(instance, **kwargs):
 def __delete_task_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_dirname(), ignore_errors=True))
+    transaction.on_commit(functools.partial(MediaCache().remove_local_items, instance))
 
     if instance.data and not instance.data.tasks.exists():
         instance.data.delete()
@@ -76,15 +84,42 @@ def __delete_task_handler(instance, **kwargs):
 def __delete_job_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_dirname(), ignore_errors=True))
+    transaction.on_commit(functools.partial(MediaCache().remove_local_items, instance))
+
+@receiver(post_delete, sender=Segment,
+    dispatch_uid=__name__ + ".delete_segment_handler")
+def __delete_segment_handler(instance, **kwargs):
+    transaction.on_commit(functools.partial(MediaCache().remove_local_items, instance))
+    transaction.on_commit(functools.partial(remove_cached_task_segment_index, instance.task_id))
+
+@receiver(post_save, sender=Segment,
+    dispatch_uid=__name__ + ".save_segment_handler")
+def __save_segment_handler(instance, **kwargs):
+    transaction.on_commit(functools.partial(remove_cached_task_segment_index, instance.task_id))
 
 @receiver(post_delete, sender=Data,
     dispatch_uid=__name__ + ".delete_data_handler")
 def __delete_data_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_data_dirname(), ignore_errors=True))
+    transaction.on_commit(functools.partial(MediaCache().remove_local_items, instance))
 
 @receiver(post_delete, sender=CloudStorage,
     dispatch_uid=__name__ + ".delete_cloudstorage_handler")
 def __delete_cloudstorage_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_storage_dirname(), ignore_errors=True))
+    transaction.on_commit(functools.partial(MediaCache().remove_local_items, instance))
+    transaction.on_commit(functools.partial(remove_cached_storage_instance, instance.id))
+    transaction.on_commit(functools.partial(invalidate_storage_content_cache, instance.id))
+    transaction.on_commit(functools.partial(remove_cached_storage_objects, instance.id))
+
+@receiver(post_save, sender=CloudStorage,
+    dispatch_uid=__name__ + ".save_cloudstorage_handler")
+def __save_cloudstorage_handler(instance, created, **kwargs):
+    if created:
+        return
+
+    transaction.on_commit(functools.partial(MediaCache().remove_local_items, instance))
+    transaction.on_commit(functools.partial(remove_cached_storage_instance, instance.id))
+    transaction.on_commit(functools.partial(invalidate_storage_content_cache, instance.id))
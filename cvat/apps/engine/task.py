@@ -10,10 +10,11 @@ import os
 import re
 import rq
 import shutil
+from collections import deque
 from contextlib import closing
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
 from urllib import parse as urlparse
 from urllib import request as urlrequest
 
@@ -25,7 +26,7 @@ from django.db import transaction
 from django.http import HttpRequest
 from rest_framework.serializers import ValidationError
 
-from cvat.apps.engine import models
+from cvat.apps.engine import models, prewarming
 from cvat.apps.engine.log import ServerLogManager
 from cvat.apps.engine.media_extractors import (
     MEDIA_TYPES, CachingMediaIterator, IMediaReader, ImageListReader,
@@ -572,7 +573,7 @@ def _create_thread(
                 os.path.join(db_data.cloud_storage.get_storage_dirname(), manifest_file),
                 db_data.cloud_storage.get_storage_dirname()
             )
-            cloud_storage_manifest.set_index()
+            cloud_storage_manifest.update_index()
             cloud_storage_manifest_prefix = os.path.dirname(manifest_file)
 
         if manifest_file and not data['server_files'] and not data['filename_pattern']: # only manifest file was specified in server files by the user
@@ -1117,6 +1118,8 @@ def _create_thread(
         db_data.storage_method == models.StorageMethodChoice.FILE_SYSTEM
     ):
         _create_static_chunks(db_task, media_extractor=extractor)
+    else:
+        prewarming.enqueue_task_chunks(db_task)
 
 def _create_static_chunks(db_task: models.Task, *, media_extractor: IMediaReader):
     @attrs.define
@@ -1139,42 +1142,52 @@ def _create_static_chunks(db_task: models.Task, *, media_extractor: IMediaReader
 
             self._call_counter = (self._call_counter + 1) % len(progress_animation)
 
+    is_preloading_required = (
+        db_task.dimension == models.DimensionType.DIM_2D and
+        isinstance(media_extractor, (
+            MEDIA_TYPES['image']['extractor'],
+            MEDIA_TYPES['zip']['extractor'],
+            MEDIA_TYPES['pdf']['extractor'],
+            MEDIA_TYPES['archive']['extractor'],
+        ))
+    )
+
     def save_chunks(
-        executor: concurrent.futures.ThreadPoolExecutor,
+        decoding_executor: concurrent.futures.ThreadPoolExecutor,
+        encoding_executor: concurrent.futures.ThreadPoolExecutor,
         db_segment: models.Segment,
         chunk_idx: int,
         chunk_frame_ids: Sequence[int]
-    ):
+    ) -> Sequence[concurrent.futures.Future]:
+        # Frames are read sequentially by the caller, then the chunk is decoded
+        # and encoded in the executors, in parallel with the other chunks.
+        # The executors don't wait for each other, so there are no deadlocks.
         chunk_data = [media_iterator[frame_idx] for frame_idx in chunk_frame_ids]
 
-        if (
-            db_task.dimension == models.DimensionType.DIM_2D and
-            isinstance(media_extractor, (
-                MEDIA_TYPES['image']['extractor'],
-                MEDIA_TYPES['zip']['extractor'],
-                MEDIA_TYPES['pdf']['extractor'],
-                MEDIA_TYPES['archive']['extractor'],
-            ))
-        ):
-            chunk_data = preload_images(chunk_data)
-
-        # TODO: extract into a class
-
-        fs_original = executor.submit(
-            original_chunk_writer.save_as_chunk,
-            images=chunk_data,
-            chunk_path=db_data.get_original_segment_chunk_path(
-                chunk_idx, segment_id=db_segment.id
-            ),
+        if is_preloading_required:
+            fs_chunk_data = decoding_executor.submit(preload_images, chunk_data)
+        else:
+            fs_chunk_data = concurrent.futures.Future()
+            fs_chunk_data.set_result(chunk_data)
+
+        fs_original = encoding_executor.submit(
+            lambda: original_chunk_writer.save_as_chunk(
+                images=fs_chunk_data.result(),
+                chunk_path=db_data.get_original_segment_chunk_path(
+                    chunk_idx, segment_id=db_segment.id
+                ),
+            )
         )
-        compressed_chunk_writer.save_as_chunk(
-            images=chunk_data,
-            chunk_path=db_data.get_compressed_segment_chunk_path(
-                chunk_idx, segment_id=db_segment.id
-            ),
+        fs_compressed = encoding_executor.submit(
+            lambda: compressed_chunk_writer.save_as_chunk(
+                images=fs_chunk_data.result(),
+                chunk_path=db_data.get_compressed_segment_chunk_path(
+                    chunk_idx, segment_id=db_segment.id
+                ),
+            )
         )
 
-        fs_original.result()
+        return (fs_original, fs_compressed)
 
     db_data = db_task.data
 
@@ -1197,8 +1210,18 @@ def _create_static_chunks(db_task: models.Task, *, media_extractor: IMediaReader
     chunk_writer_kwargs = {}
     if db_task.dimension == models.DimensionType.DIM_3D:
         chunk_writer_kwargs["dimension"] = db_task.dimension
+
+    # The number of chunks encoded in parallel
+    max_concurrency = max(1, settings.CVAT_CONCURRENT_CHUNK_PROCESSING)
+
+    compressed_chunk_writer_kwargs = dict(chunk_writer_kwargs)
+    if compressed_chunk_writer_class is ZipCompressedChunkWriter and 1 < max_concurrency:
+        # Don't multiply the encoding threads of the parallel chunks
+        # by the frame encoding threads of each chunk
+        compressed_chunk_writer_kwargs["parallel_frame_encoding"] = False
+
     compressed_chunk_writer = compressed_chunk_writer_class(
-        db_data.image_quality, **chunk_writer_kwargs
+        db_data.image_quality, **compressed_chunk_writer_kwargs
     )
     original_chunk_writer = original_chunk_writer_class(original_quality, **chunk_writer_kwargs)
 
@@ -1226,13 +1249,22 @@ def _create_static_chunks(db_task: models.Task, *, media_extractor: IMediaReader
     with closing(media_iterator):
         progress_updater = _ChunkProgressUpdater()
 
-        # TODO: remove 2 * or the configuration option
-        # TODO: maybe make real multithreading support, currently the code is limited by 1
-        # video segment chunk, even if more threads are available
-        max_concurrency = 2 * settings.CVAT_CONCURRENT_CHUNK_PROCESSING if not isinstance(
-            media_extractor, MEDIA_TYPES['video']['extractor']
-        ) else 2
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        # Chunks are processed in a pipeline: the frames are read sequentially,
+        # while the previously read chunks are decoded and encoded in parallel.
+        # The number of chunks in processing is limited to limit memory use.
+        max_chunks_in_progress = max_concurrency + 1
+        chunks_in_progress: Deque[Sequence[concurrent.futures.Future]] = deque()
+
+        def wait_chunks(max_count: int):
+            while max_count < len(chunks_in_progress):
+                for future in chunks_in_progress.popleft():
+                    future.result()
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency
+        ) as decoding_executor, concurrent.futures.ThreadPoolExecutor(
+            max_workers=2 * max_concurrency # original and compressed chunks
+        ) as encoding_executor:
             frame_step = db_data.get_frame_step()
             for segment_idx, db_segment in enumerate(db_segments):
                 frame_counter = itertools.count()
@@ -1248,6 +1280,12 @@ def _create_static_chunks(db_task: models.Task, *, media_extractor: IMediaReader
                         lambda _: next(frame_counter) // db_data.chunk_size
                     )
                 ):
-                    save_chunks(executor, db_segment, chunk_idx, chunk_frame_ids)
+                    wait_chunks(max_chunks_in_progress - 1)
+                    chunks_in_progress.append(save_chunks(
+                        decoding_executor, encoding_executor,
+                        db_segment, chunk_idx, chunk_frame_ids
+                    ))
 
                 progress_updater.update_progress(segment_idx / len(db_segments))
+
+            wait_chunks(0)
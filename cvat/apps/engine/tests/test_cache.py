@@ -0,0 +1,183 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import tempfile
+import zlib
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.engine import cache
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.media_extractors import FrameQuality
+from cvat.apps.engine.models import Segment
+
+_TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "media": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "media-cache-tests",
+    },
+}
+
+
+@override_settings(CACHES=_TEST_CACHES, MEDIA_CACHE_LOCAL_MAX_SIZE=0)
+class MediaCacheStorageTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # the storage objects are created once per process, recreate them for each test
+        for name in ("_item_storage", "_local_cache"):
+            patcher = mock.patch.object(cache, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self._disk_storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._disk_storage_dir.cleanup)
+
+        # the local memory cache data is shared by the tests
+        caches["media"].clear()
+
+    def _check_has_segment_chunk(self):
+        media_cache = MediaCache()
+        db_segment = Segment(id=1)
+
+        self.assertFalse(
+            media_cache.has_segment_chunk(db_segment, 0, quality=FrameQuality.COMPRESSED)
+        )
+
+        with mock.patch.object(
+            MediaCache,
+            "prepare_segment_chunk",
+            return_value=(io.BytesIO(b"chunk data"), "application/zip"),
+        ):
+            media_cache.get_or_set_segment_chunk(db_segment, 0, quality=FrameQuality.COMPRESSED)
+
+        self.assertTrue(
+            media_cache.has_segment_chunk(db_segment, 0, quality=FrameQuality.COMPRESSED)
+        )
+        self.assertFalse(
+            media_cache.has_segment_chunk(db_segment, 1, quality=FrameQuality.COMPRESSED)
+        )
+
+    def test_can_check_segment_chunk_in_default_storage(self):
+        with override_settings(MEDIA_CACHE_STORAGE="redis"):
+            self._check_has_segment_chunk()
+
+    def test_can_check_segment_chunk_in_disk_storage(self):
+        with override_settings(
+            MEDIA_CACHE_STORAGE="disk", MEDIA_CACHE_DISK_ROOT=self._disk_storage_dir.name
+        ):
+            self._check_has_segment_chunk()
+
+    def test_can_get_segment_chunk_checksum(self):
+        media_cache = MediaCache()
+        db_segment = Segment(id=1)
+
+        with mock.patch.object(
+            MediaCache,
+            "prepare_segment_chunk",
+            return_value=(io.BytesIO(b"chunk data"), "application/zip"),
+        ) as prepare_segment_chunk:
+            for _ in range(2):
+                _, _, checksum = media_cache.get_or_set_segment_chunk(
+                    db_segment, 0, quality=FrameQuality.COMPRESSED
+                )
+                self.assertEqual(checksum, zlib.crc32(b"chunk data"))
+
+        prepare_segment_chunk.assert_called_once()
+
+
+@override_settings(
+    CACHES=_TEST_CACHES,
+    MEDIA_CACHE_STORAGE="redis",
+    MEDIA_CACHE_LOCAL_MAX_SIZE=0,
+    MEDIA_CACHE_BUILD_LOCK_TIMEOUT=120,
+)
+class MediaCacheBuildLockTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        for name in ("_item_storage", "_local_cache"):
+            patcher = mock.patch.object(cache, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        caches["media"].clear()
+
+        self.media_cache = MediaCache()
+        self.db_segment = Segment(id=1)
+        self.chunk_key = self.media_cache._make_chunk_key(
+            self.db_segment, 0, quality=FrameQuality.COMPRESSED
+        )
+
+        # another worker is building the chunk
+        caches["media"].add(self.media_cache._make_build_lock_key(self.chunk_key), "other-worker")
+
+        patcher = mock.patch.object(
+            MediaCache,
+            "prepare_segment_chunk",
+            return_value=(io.BytesIO(b"chunk data"), "application/zip"),
+        )
+        self.prepare_segment_chunk = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(cache, "time")
+        self.time = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.time.monotonic.return_value = 0
+
+    def _get_chunk(self):
+        return self.media_cache.get_or_set_segment_chunk(
+            self.db_segment, 0, quality=FrameQuality.COMPRESSED
+        )
+
+    def test_can_wait_for_item_built_by_another_worker(self):
+        def build_in_other_worker(_):
+            data = b"other worker chunk data"
+            self.media_cache._storage.set(
+                self.chunk_key, (io.BytesIO(data), "application/zip", zlib.crc32(data))
+            )
+
+        self.time.sleep.side_effect = build_in_other_worker
+
+        chunk, _, _ = self._get_chunk()
+
+        self.assertEqual(chunk.getvalue(), b"other worker chunk data")
+        self.prepare_segment_chunk.assert_not_called()
+        self.assertEqual(
+            self.media_cache.get_metrics(),
+            {"builds": 0, "lock_waits": 1, "lock_wait_hits": 1, "lock_wait_timeouts": 0},
+        )
+
+    def test_can_build_item_after_wait_timeout(self):
+        self.time.monotonic.side_effect = [0, 60, 121]
+
+        with mock.patch.object(cache, "slogger") as slogger:
+            chunk, _, _ = self._get_chunk()
+
+        self.assertEqual(chunk.getvalue(), b"chunk data")
+        self.assertEqual(self.time.sleep.call_count, 2)
+        self.prepare_segment_chunk.assert_called_once()
+        self.assertEqual(
+            self.media_cache.get_metrics(),
+            {"builds": 1, "lock_waits": 1, "lock_wait_hits": 0, "lock_wait_timeouts": 1},
+        )
+        self.assertIn("'lock_wait_timeouts': 1", slogger.glob.warning.call_args.args[0])
+
+    def test_can_build_item_without_waiting_if_not_locked(self):
+        caches["media"].clear()
+
+        chunk, _, _ = self._get_chunk()
+
+        self.assertEqual(chunk.getvalue(), b"chunk data")
+        self.time.sleep.assert_not_called()
+        self.assertEqual(
+            self.media_cache.get_metrics(),
+            {"builds": 1, "lock_waits": 0, "lock_wait_hits": 0, "lock_wait_timeouts": 0},
+        )
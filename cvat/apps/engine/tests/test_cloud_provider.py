@@ -0,0 +1,367 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.engine import cloud_provider
+from cvat.apps.engine.cloud_provider import AWS_S3, NamedBytesIO, _CloudStorage
+
+_TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "media": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "cloud-storage-cache-tests",
+    },
+}
+
+
+class _DummyStorage(_CloudStorage):
+    def __init__(self, objects: dict[str, tuple[bytes, str]]):
+        super().__init__()
+        self.objects = objects
+        self.requests = []
+
+    @property
+    def name(self):
+        return "bucket"
+
+    def create(self):
+        pass
+
+    def _head_file(self, key):
+        pass
+
+    def _head(self):
+        pass
+
+    def get_status(self):
+        pass
+
+    def get_file_status(self, key):
+        pass
+
+    def get_file_last_modified(self, key):
+        pass
+
+    def _get_file_etag(self, key):
+        self.requests.append(("HEAD", key))
+        return self.objects[key][1]
+
+    def _download_fileobj(self, key):
+        self.requests.append(("GET", key))
+        data, etag = self.objects[key]
+        buf = NamedBytesIO(data)
+        buf.filename = key
+        return buf, etag
+
+    def _download_range_of_bytes(self, key, stop_byte, start_byte):
+        self.requests.append(("GET", key))
+        data, etag = self.objects[key]
+        return data[start_byte : stop_byte + 1], etag
+
+    def upload_fileobj(self, file_obj, file_name):
+        pass
+
+    def upload_file(self, file_path, file_name=None):
+        pass
+
+    def _list_raw_content_on_one_page(self, prefix="", next_token=None, page_size=None):
+        pass
+
+    @property
+    def supported_actions(self):
+        pass
+
+
+@override_settings(
+    CACHES=_TEST_CACHES,
+    CLOUD_STORAGE_CACHE_MAX_SIZE=2**20,
+    CLOUD_STORAGE_CACHE_VALIDATION_TTL=60,
+)
+class ObjectDiskCacheTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+
+        settings_override = override_settings(CLOUD_STORAGE_CACHE_ROOT=cache_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # the cache object is created once per process, recreate it for each test
+        patcher = mock.patch.object(cloud_provider, "_object_disk_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.storage = _DummyStorage({"image.jpg": (b"0123456789", '"v1"')})
+        self.storage.cache_namespace = "1"
+
+    def test_new_objects_are_downloaded_without_head_requests(self):
+        self.assertEqual(self.storage.download_fileobj("image.jpg").getvalue(), b"0123456789")
+        self.assertEqual(self.storage.download_range_of_bytes("image.jpg", 3), b"0123")
+        self.assertEqual(self.storage.requests, [("GET", "image.jpg")])
+
+    def test_can_download_updated_object(self):
+        self.storage.download_fileobj("image.jpg")
+
+        self.storage.objects["image.jpg"] = (b"abc", '"v2"')
+        with mock.patch("time.monotonic", return_value=10**9):
+            self.assertEqual(self.storage.download_fileobj("image.jpg").getvalue(), b"abc")
+
+        self.assertEqual(
+            self.storage.requests,
+            [("GET", "image.jpg"), ("HEAD", "image.jpg"), ("GET", "image.jpg")],
+        )
+
+
+class AwsS3DownloadTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.storage = AWS_S3("bucket")
+
+        for name in ("_client", "_bucket"):
+            patcher = mock.patch.object(self.storage, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_can_download_small_object_in_one_request(self):
+        self.storage._client.head_object.return_value = {"ETag": '"v1"', "ContentLength": 3}
+        self.storage._client.get_object.return_value = {"Body": mock.Mock(read=lambda: b"abc")}
+
+        buf, etag = self.storage._download_fileobj("image.jpg")
+
+        self.assertEqual((buf.getvalue(), buf.filename, etag), (b"abc", "image.jpg", '"v1"'))
+        self.storage._client.get_object.assert_called_once_with(
+            Bucket=self.storage.bucket.name, Key="image.jpg", IfMatch='"v1"'
+        )
+        self.storage.bucket.download_fileobj.assert_not_called()
+
+    def test_can_download_big_object_in_parts(self):
+        self.storage._client.head_object.return_value = {"ETag": '"v1"', "ContentLength": 2**30}
+        self.storage.bucket.download_fileobj.side_effect = (
+            lambda Key, Fileobj, Config, ExtraArgs: Fileobj.write(b"abc")
+        )
+
+        buf, etag = self.storage._download_fileobj("video.mp4")
+
+        self.assertEqual((buf.getvalue(), etag), (b"abc", '"v1"'))
+        self.assertEqual(
+            self.storage.bucket.download_fileobj.call_args.kwargs["ExtraArgs"], {"IfMatch": '"v1"'}
+        )
+        self.storage._client.get_object.assert_not_called()
+
+
+@override_settings(
+    CLOUD_STORAGE_UPLOAD_PART_SIZE=8 * 1024**2,
+    CLOUD_STORAGE_UPLOAD_MAX_CONCURRENCY=3,
+    CLOUD_STORAGE_REQUEST_MAX_RETRIES=2,
+)
+class AwsS3UploadTest(SimpleTestCase):
+    def test_can_upload_big_files_in_parts(self):
+        storage = AWS_S3("bucket")
+        file_obj = NamedBytesIO(b"abc")
+
+        with (
+            mock.patch.object(storage, "_client"),
+            mock.patch.object(storage, "_bucket") as bucket,
+        ):
+            storage.upload_fileobj(file_obj, "archive.zip")
+
+        upload_config = bucket.upload_fileobj.call_args.kwargs["Config"]
+        self.assertEqual(upload_config.multipart_threshold, 8 * 1024**2)
+        self.assertEqual(upload_config.multipart_chunksize, 8 * 1024**2)
+        self.assertEqual(upload_config.max_request_concurrency, 3)
+        self.assertEqual(bucket.upload_fileobj.call_args.kwargs["Key"], "archive.zip")
+
+    def test_can_retry_failed_requests(self):
+        storage = AWS_S3("bucket")
+
+        self.assertEqual(storage._client.meta.config.retries["total_max_attempts"], 3)
+
+
+@override_settings(CLOUD_STORAGE_CLIENT_TTL=60)
+class StorageClientPoolTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = mock.patch.dict(cloud_provider._storage_instances, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(
+            cloud_provider, "_create_storage_instance", side_effect=lambda _: mock.Mock()
+        )
+        self.create_storage_instance = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_db_storage(self, **kwargs):
+        return mock.Mock(
+            **{
+                "id": 1,
+                "provider_type": "AWS_S3_BUCKET",
+                "resource": "bucket",
+                "credentials_type": "KEY_SECRET_KEY_PAIR",
+                "credentials": "key secret",
+                "specific_attributes": "",
+                **kwargs,
+            }
+        )
+
+    def test_can_reuse_client(self):
+        db_storage = self._make_db_storage()
+
+        client = cloud_provider.db_storage_to_storage_instance(db_storage)
+
+        self.assertIs(cloud_provider.db_storage_to_storage_instance(db_storage), client)
+        self.create_storage_instance.assert_called_once()
+
+    def test_can_create_dedicated_client(self):
+        db_storage = self._make_db_storage()
+
+        client = cloud_provider.db_storage_to_storage_instance(db_storage)
+
+        self.assertIsNot(
+            cloud_provider.db_storage_to_storage_instance(db_storage, reuse=False), client
+        )
+
+    def test_client_is_recreated_after_storage_update(self):
+        client = cloud_provider.db_storage_to_storage_instance(self._make_db_storage())
+
+        updated_client = cloud_provider.db_storage_to_storage_instance(
+            self._make_db_storage(credentials="key new_secret")
+        )
+
+        self.assertIsNot(updated_client, client)
+        self.assertIs(
+            cloud_provider.db_storage_to_storage_instance(
+                self._make_db_storage(credentials="key new_secret")
+            ),
+            updated_client,
+        )
+
+    def test_client_expires_after_ttl(self):
+        db_storage = self._make_db_storage()
+
+        with mock.patch.object(cloud_provider.time, "monotonic", return_value=100):
+            client = cloud_provider.db_storage_to_storage_instance(db_storage)
+
+        with mock.patch.object(cloud_provider.time, "monotonic", return_value=159):
+            self.assertIs(cloud_provider.db_storage_to_storage_instance(db_storage), client)
+
+        with mock.patch.object(cloud_provider.time, "monotonic", return_value=161):
+            self.assertIsNot(cloud_provider.db_storage_to_storage_instance(db_storage), client)
+
+    def test_can_remove_client(self):
+        db_storage = self._make_db_storage()
+
+        client = cloud_provider.db_storage_to_storage_instance(db_storage)
+        cloud_provider.remove_cached_storage_instance(db_storage.id)
+
+        self.assertIsNot(cloud_provider.db_storage_to_storage_instance(db_storage), client)
+
+
+class _DummyListingStorage:
+    def __init__(self, pages: list[list[str]]):
+        self.pages = pages
+        self.requests = []
+
+    def list_files_on_one_page(self, prefix, next_token, page_size, _use_sort):
+        self.requests.append(next_token)
+        page_number = int(next_token or 0)
+        return {
+            "content": [{"name": name, "type": "REG"} for name in self.pages[page_number]],
+            "next": str(page_number + 1) if page_number + 1 < len(self.pages) else None,
+        }
+
+
+@override_settings(
+    CACHES=_TEST_CACHES,
+    CLOUD_STORAGE_LISTING_CACHE_TTL=60,
+    CLOUD_STORAGE_LISTING_SNAPSHOT_MIN_PAGES=0,
+)
+class StorageListingCacheTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # the local memory cache data is shared by the tests
+        caches["media"].clear()
+
+        self.db_storage = mock.Mock(id=1)
+        self.storage = _DummyListingStorage([["a", "b"], ["c", "d"], ["e"]])
+        self.queue = mock.Mock()
+        self.queue.fetch_job.return_value = None
+
+        db_storage_class = mock.Mock()
+        db_storage_class.objects.filter.return_value.first.return_value = self.db_storage
+
+        for patcher in (
+            mock.patch.object(
+                cloud_provider, "db_storage_to_storage_instance", return_value=self.storage
+            ),
+            mock.patch.object(
+                cloud_provider, "_get_storage_listing_queue", return_value=self.queue
+            ),
+            mock.patch.object(cloud_provider, "CloudStorage", db_storage_class),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _list_page(self, next_token=None):
+        content = cloud_provider.list_storage_content_on_one_page(
+            self.db_storage, next_token=next_token, page_size=2
+        )
+        return [item["name"] for item in content["content"]], content["next"]
+
+    def _run_enqueued_jobs(self):
+        for call in self.queue.enqueue_call.call_args_list:
+            call.kwargs["func"](*call.kwargs["args"])
+
+        self.queue.enqueue_call.reset_mock()
+
+    def test_can_get_cached_pages(self):
+        self.assertEqual(self._list_page(), (["a", "b"], "1"))
+        self.assertEqual(self._list_page(), (["a", "b"], "1"))
+
+        self.assertEqual(self.storage.requests, [None])
+
+    def test_next_page_is_prefetched_in_background_job(self):
+        self._list_page()
+        self._run_enqueued_jobs()
+
+        self.assertEqual(self._list_page("1"), (["c", "d"], "2"))
+        self.assertEqual(self.storage.requests, [None, "1"])
+
+    @override_settings(CLOUD_STORAGE_LISTING_CACHE_TTL=0)
+    def test_pages_are_not_cached_by_default(self):
+        self._list_page()
+        self._list_page()
+
+        self.assertEqual(self.storage.requests, [None, None])
+        self.queue.enqueue_call.assert_not_called()
+
+    def test_can_invalidate_cached_pages(self):
+        self._list_page()
+
+        self.storage.pages[0].append("f")
+        cloud_provider.invalidate_storage_content_cache(self.db_storage.id)
+
+        self.assertEqual(self._list_page(), (["a", "b", "f"], "1"))
+        self.assertEqual(self.storage.requests, [None, None])
+
+    @override_settings(CLOUD_STORAGE_LISTING_SNAPSHOT_MIN_PAGES=1)
+    def test_can_request_all_pages_in_background_job(self):
+        self._list_page()
+        self._run_enqueued_jobs()
+
+        self.assertEqual(self._list_page("1"), (["c", "d"], "2"))
+        self.assertEqual(self._list_page("2"), (["e"], None))
+        self.assertEqual(self.storage.requests, [None, "1", "2"])
@@ -0,0 +1,213 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import stat
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from utils.dataset_manifest import ImageManifestManager, VideoManifestManager
+from utils.dataset_manifest import core as manifest_core
+from utils.dataset_manifest.core import _Index
+
+from cvat.apps.engine.tests.utils import generate_video_file
+
+
+def _make_images(names):
+    return [
+        {"name": name, "extension": ".jpg", "width": 10, "height": 20, "meta": {}}
+        for name in names
+    ]
+
+
+class TestManifestIndex(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        manifest_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(manifest_dir.cleanup)
+        self.manifest_dir = manifest_dir.name
+        self.manifest_path = os.path.join(self.manifest_dir, "manifest.jsonl")
+
+    def _create_manifest(self, names):
+        manifest = ImageManifestManager(self.manifest_path)
+        manifest.create(_make_images(names))
+        manifest.close()
+        return manifest
+
+    def _load_manifest(self):
+        manifest = ImageManifestManager(self.manifest_path)
+        self.addCleanup(manifest.close)
+        manifest.init_index()
+        return manifest
+
+    def _get_names(self, manifest):
+        return [item["name"] for item in manifest[:]]
+
+    def _make_legacy_index(self):
+        offsets = []
+        with open(self.manifest_path, "rb") as manifest_file:
+            position = 0
+            for i, line in enumerate(manifest_file):
+                if 2 <= i and line.strip():
+                    offsets.append(position)
+                position += len(line)
+
+        with open(os.path.join(self.manifest_dir, "index.json"), "w") as index_file:
+            json.dump(dict(enumerate(offsets)), index_file)
+
+        os.remove(os.path.join(self.manifest_dir, "index.bin"))
+
+    def _make_read_only(self, path):
+        mode = os.stat(path).st_mode
+        os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+        self.addCleanup(os.chmod, path, mode)
+
+    def test_can_read_legacy_index_from_read_only_dir(self):
+        self._create_manifest(["a", "b", "c"])
+        self._make_legacy_index()
+        self._make_read_only(self.manifest_dir)
+
+        manifest = ImageManifestManager(self.manifest_path, create_index=False)
+        manifest.init_index()
+
+        self.assertEqual(self._get_names(manifest), ["a", "b", "c"])
+        self.assertEqual(sorted(os.listdir(self.manifest_dir)), ["index.json", "manifest.jsonl"])
+
+    def test_can_convert_legacy_index(self):
+        self._create_manifest(["a", "b", "c"])
+        self._make_legacy_index()
+
+        manifest = ImageManifestManager(self.manifest_path)
+        manifest.init_index()
+
+        self.assertEqual(self._get_names(manifest), ["a", "b", "c"])
+        self.assertEqual(sorted(os.listdir(self.manifest_dir)), ["index.bin", "manifest.jsonl"])
+
+    def test_can_append_items(self):
+        manifest = self._create_manifest(["a", "b"])
+        manifest.append(_make_images(["c", "d"]))
+
+        self.assertEqual(self._get_names(manifest), ["a", "b", "c", "d"])
+        self.assertEqual(manifest.generation, 1)
+        self.assertEqual(self._get_names(self._load_manifest()), ["a", "b", "c", "d"])
+
+    def test_can_replace_item(self):
+        manifest = self._create_manifest(["a", "b", "c"])
+        manifest.partial_update(1, _make_images(["long_name"])[0])
+
+        self.assertEqual(self._get_names(manifest), ["a", "long_name", "c"])
+        self.assertEqual(self._get_names(self._load_manifest()), ["a", "long_name", "c"])
+
+    def test_can_index_only_appended_items(self):
+        self._create_manifest(["a", "b"])
+
+        with open(self.manifest_path, "a") as manifest_file:
+            manifest_file.write(json.dumps(_make_images(["c"])[0]) + "\n")
+
+        manifest = self._load_manifest()
+        with mock.patch.object(_Index, "create", wraps=manifest.index.create) as create_index:
+            manifest.update_index()
+
+        create_index.assert_not_called()
+        self.assertEqual(manifest.generation, 1)
+        self.assertEqual(self._get_names(manifest), ["a", "b", "c"])
+
+    def test_index_is_recreated_if_indexed_items_are_changed(self):
+        self._create_manifest(["a", "b"])
+
+        with open(self.manifest_path, "r+") as manifest_file:
+            content = manifest_file.read().replace('"a"', '"aa"')
+            manifest_file.seek(0)
+            manifest_file.write(content)
+
+        manifest = self._load_manifest()
+        manifest.update_index()
+
+        self.assertEqual(manifest.generation, 0)
+        self.assertEqual(self._get_names(manifest), ["aa", "b"])
+
+
+class TestVideoManifestFastMode(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        manifest_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(manifest_dir.cleanup)
+        self.manifest_dir = manifest_dir.name
+
+        self.video_path = os.path.join(self.manifest_dir, "video.avi")
+        _, video_file = generate_video_file(self.video_path, width=64, height=48, duration=4)
+        with open(self.video_path, "wb") as f:
+            f.write(video_file.getvalue())
+
+    def _create_manifest(self, name, **kwargs):
+        manifest = VideoManifestManager(os.path.join(self.manifest_dir, name))
+        manifest.link(media_file=self.video_path, **kwargs)
+        manifest.create()
+        self.addCleanup(manifest.close)
+        return manifest
+
+    def _get_key_frames(self, manifest):
+        return [(item["number"], item["pts"]) for item in manifest[:]]
+
+    def _get_all_key_frame_timestamps(self):
+        manifest = self._create_manifest("all_key_frames.jsonl", fast=True)
+        return [pts for _, pts in self._get_key_frames(manifest)]
+
+    def test_fast_mode_produces_same_key_frames(self):
+        manifest = self._create_manifest("manifest.jsonl")
+        fast_manifest = self._create_manifest("fast_manifest.jsonl", fast=True)
+
+        self.assertEqual(fast_manifest.video_length, manifest.video_length)
+        self.assertEqual(fast_manifest.video_resolution, manifest.video_resolution)
+        self.assertLess(1, len(manifest))
+        self.assertEqual(self._get_key_frames(fast_manifest), self._get_key_frames(manifest))
+
+    def test_can_validate_each_nth_key_frame(self):
+        timestamps = self._get_all_key_frame_timestamps()
+
+        with mock.patch.object(
+            manifest_core,
+            "_find_invalid_key_frame_seeks",
+            wraps=manifest_core._find_invalid_key_frame_seeks,
+        ) as find_invalid_key_frames:
+            self._create_manifest("manifest.jsonl", fast=True, seek_validation_step=2)
+
+        find_invalid_key_frames.assert_called_once_with(self.video_path, timestamps[::2])
+
+    def test_can_validate_key_frames_in_batches(self):
+        timestamps = self._get_all_key_frame_timestamps()
+        self.assertLessEqual(4, len(timestamps))
+
+        with (
+            mock.patch.object(manifest_core, "ProcessPoolExecutor", ThreadPoolExecutor),
+            mock.patch.object(
+                manifest_core,
+                "_find_invalid_key_frame_seeks",
+                wraps=manifest_core._find_invalid_key_frame_seeks,
+            ) as find_invalid_key_frames,
+        ):
+            manifest = self._create_manifest("manifest.jsonl", fast=True, workers=2)
+
+        batches = [call.args[1] for call in find_invalid_key_frames.call_args_list]
+        self.assertLess(1, len(batches))
+        self.assertEqual(sorted(pts for batch in batches for pts in batch), timestamps)
+        self.assertEqual([pts for _, pts in self._get_key_frames(manifest)], timestamps)
+
+    def test_invalid_key_frames_are_excluded(self):
+        timestamps = self._get_all_key_frame_timestamps()
+
+        with mock.patch.object(
+            manifest_core, "_find_invalid_key_frame_seeks", return_value=[timestamps[1]]
+        ):
+            manifest = self._create_manifest("manifest.jsonl", fast=True)
+
+        self.assertEqual(
+            [pts for _, pts in self._get_key_frames(manifest)],
+            [pts for pts in timestamps if pts != timestamps[1]],
+        )
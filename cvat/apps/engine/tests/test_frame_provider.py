@@ -0,0 +1,122 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+from collections import OrderedDict
+from datetime import datetime, timezone
+from unittest import mock
+
+from cvat.apps.engine import frame_provider
+from cvat.apps.engine.frame_provider import _SegmentFrameIndex, _TaskSegmentIndex
+
+
+class TestSegmentFrameIndex(unittest.TestCase):
+    def test_can_find_frame_positions_in_range(self):
+        frame_index = _SegmentFrameIndex(range(10, 30, 2), chunk_size=4)
+
+        self.assertEqual(len(frame_index), 10)
+        self.assertEqual(frame_index.get_position(10), 0)
+        self.assertEqual(frame_index.get_position(28), 9)
+        self.assertIsNone(frame_index.get_position(11))
+        self.assertIsNone(frame_index.get_position(30))
+        self.assertIn(14, frame_index)
+        self.assertNotIn(15, frame_index)
+
+    def test_can_find_frame_positions_in_specific_frames(self):
+        frame_index = _SegmentFrameIndex({7, 1, 4, 20}, chunk_size=2)
+
+        self.assertEqual(len(frame_index), 4)
+        self.assertEqual(
+            [frame_index.get_position(frame) for frame in [1, 4, 7, 20]], [0, 1, 2, 3]
+        )
+        self.assertIsNone(frame_index.get_position(2))
+
+    def test_can_get_chunk_frames(self):
+        frame_index = _SegmentFrameIndex({7, 1, 4, 20, 25}, chunk_size=2)
+
+        self.assertEqual(list(frame_index.get_chunk_frames(0)), [1, 4])
+        self.assertEqual(list(frame_index.get_chunk_frames(2)), [25])
+        self.assertEqual(list(frame_index.get_chunk_frames(3)), [])
+
+    def test_can_find_matching_chunk(self):
+        frame_index = _SegmentFrameIndex(range(0, 10), chunk_size=4)
+
+        self.assertEqual(frame_index.find_chunk([4, 5, 6, 7]), 1)
+        self.assertEqual(frame_index.find_chunk([8, 9]), 2)
+        self.assertIsNone(frame_index.find_chunk([4, 5, 6]))
+        self.assertIsNone(frame_index.find_chunk([5, 6, 7, 8]))
+        self.assertIsNone(frame_index.find_chunk([]))
+
+
+class TestSegmentFrameIndexCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(frame_provider, "_segment_frame_indices", OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _make_segment(updated_date: datetime) -> tuple[mock.Mock, mock.PropertyMock]:
+        db_segment = mock.Mock(id=1, start_frame=0, stop_frame=9)
+        db_segment.task.data.chunk_size = 4
+        db_segment.task.updated_date = updated_date
+
+        # the property is defined on the mock type, which is unique for each mock
+        frame_set = mock.PropertyMock(return_value=range(10))
+        type(db_segment).frame_set = frame_set
+        return db_segment, frame_set
+
+    def test_frame_set_is_only_computed_on_miss(self):
+        updated_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        db_segment, frame_set = self._make_segment(updated_date)
+        other_db_segment, other_frame_set = self._make_segment(updated_date)
+
+        frame_index = frame_provider._get_segment_frame_index(db_segment)
+        self.assertIs(frame_provider._get_segment_frame_index(db_segment), frame_index)
+        self.assertIs(frame_provider._get_segment_frame_index(other_db_segment), frame_index)
+        frame_set.assert_called_once()
+        other_frame_set.assert_not_called()
+
+    def test_index_is_rebuilt_after_task_update(self):
+        db_segment, _ = self._make_segment(datetime(2024, 1, 1, tzinfo=timezone.utc))
+        updated_db_segment, _ = self._make_segment(datetime(2024, 1, 2, tzinfo=timezone.utc))
+
+        frame_index = frame_provider._get_segment_frame_index(db_segment)
+
+        self.assertIsNot(frame_provider._get_segment_frame_index(updated_db_segment), frame_index)
+
+
+class TestTaskSegmentIndex(unittest.TestCase):
+    def test_can_find_segment(self):
+        segment_index = _TaskSegmentIndex(
+            [(2, range(10, 20)), (1, range(0, 10)), (3, range(20, 25))]
+        )
+
+        self.assertEqual(segment_index.find(0), 1)
+        self.assertEqual(segment_index.find(10), 2)
+        self.assertEqual(segment_index.find(24), 3)
+        self.assertIsNone(segment_index.find(25))
+
+    def test_can_find_first_overlapping_segment(self):
+        segment_index = _TaskSegmentIndex(
+            [(1, range(0, 10)), (2, range(8, 18)), (3, range(16, 26))]
+        )
+
+        self.assertEqual(segment_index.find(8), 1)
+        self.assertEqual(segment_index.find(10), 2)
+        self.assertEqual(segment_index.find(17), 2)
+
+    def test_can_skip_frames_outside_of_segment_step(self):
+        segment_index = _TaskSegmentIndex([(1, range(0, 10, 3)), (2, range(12, 20, 3))])
+
+        self.assertEqual(segment_index.find(3), 1)
+        self.assertIsNone(segment_index.find(4))
+
+    def test_can_find_segments_in_frame_range(self):
+        segment_index = _TaskSegmentIndex(
+            [(1, range(0, 10)), (2, range(10, 20)), (3, range(20, 30))]
+        )
+
+        self.assertEqual(list(segment_index.find_all(5, 15)), [1, 2])
+        self.assertEqual(list(segment_index.find_all(20, 40)), [3])
+        self.assertEqual(list(segment_index.find_all(30, 40)), [])
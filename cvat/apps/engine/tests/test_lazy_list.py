@@ -2,7 +2,7 @@ import unittest
 import copy
 import pickle
 from typing import TypeVar
-from cvat.apps.engine.lazy_list import LazyList
+from cvat.apps.engine.lazy_list import LazyList, PackedFloatList, as_float_array, pack_float_list
 
 
 T = TypeVar('T')
@@ -203,5 +203,64 @@ class TestLazyList(unittest.TestCase):
                 self.assertEqual(self.empty_lazy_list[slice_], [])
 
 
+class TestPackedFloatList(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [1.5, 2.25, 3.0, 4.125]
+        self.packed_list = PackedFloatList(data=pack_float_list(self.values))
+
+    def test_unpacking(self):
+        self.assertEqual(len(self.packed_list), 4)
+        self.assertEqual(self.packed_list, self.values)
+        self.assertEqual(self.packed_list[1], 2.25)
+        self.assertEqual(self.packed_list[-2:], [3.0, 4.125])
+
+    def test_values_are_kept_exactly(self):
+        for values in (
+            [],
+            [0, 1, 2, 65535],
+            [0, 70000],
+            [2 ** 40, 1],
+            [-1.0, 0.5],
+            [0.1, 1 / 3, 1e-300],
+        ):
+            with self.subTest(values=values):
+                self.assertEqual(PackedFloatList(data=pack_float_list(values)), values)
+
+    def test_as_array(self):
+        array = self.packed_list.as_array()
+        self.assertEqual(array.tolist(), self.values)
+        self.assertFalse(array.flags.writeable)
+        self.assertEqual(repr(self.packed_list), "PackedFloatList(<4 packed values>)")
+
+        self.packed_list.append(5.0)
+        self.assertEqual(self.packed_list.as_array().tolist(), self.values + [5.0])
+
+    def test_as_float_array(self):
+        array = as_float_array(self.packed_list)
+        self.assertEqual(array.dtype.name, "float64")
+        self.assertEqual(array.tolist(), self.values)
+        self.assertEqual(repr(self.packed_list), "PackedFloatList(<4 packed values>)")
+
+        self.assertEqual(as_float_array([1, 2]).tolist(), [1.0, 2.0])
+
+    def test_deepcopy(self):
+        copied_list = copy.deepcopy(self.packed_list)
+        self.assertIsInstance(copied_list, PackedFloatList)
+        self.assertEqual(repr(copied_list), "PackedFloatList(<4 packed values>)")
+        self.assertEqual(copied_list, self.values)
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.packed_list)), self.values)
+
+        self.packed_list.append(5.0)
+        self.assertEqual(pickle.loads(pickle.dumps(self.packed_list)), self.values + [5.0])
+
+    def test_repack(self):
+        data = pack_float_list(self.values)
+        self.assertEqual(pack_float_list(self.packed_list), data)
+        self.assertTrue(len(pack_float_list([1, 2, 3])) < len(pack_float_list([1.5, 2, 3])))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,128 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from cvat.apps.engine import media_extractors
+from cvat.apps.engine.media_extractors import (
+    ZipCompressedChunkWriter,
+    _FrameEncodingExecutor,
+    _map_ordered,
+)
+
+
+class MapOrderedTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # The executor is created for the current settings
+        _FrameEncodingExecutor._reset_after_fork()
+        self.addCleanup(_FrameEncodingExecutor._reset_after_fork)
+
+    @override_settings(MEDIA_CHUNK_ENCODING_THREADS=4)
+    def test_can_keep_input_order(self):
+        def func(item: int) -> int:
+            # the first items are processed longer
+            time.sleep(0.001 * (10 - item))
+            return item * 2
+
+        self.assertEqual(list(_map_ordered(func, iter(range(10)))), [i * 2 for i in range(10)])
+
+    @override_settings(MEDIA_CHUNK_ENCODING_THREADS=4)
+    def test_can_use_encoding_threads(self):
+        thread_names = set()
+
+        def func(item: int) -> int:
+            thread_names.add(threading.current_thread().name)
+            return item
+
+        list(_map_ordered(func, range(10)))
+
+        self.assertTrue(thread_names)
+        self.assertTrue(all(name.startswith("chunk-encoding") for name in thread_names))
+
+    @override_settings(MEDIA_CHUNK_ENCODING_THREADS=2)
+    def test_can_limit_items_in_progress(self):
+        consumed_items = []
+
+        def items():
+            for i in range(100):
+                consumed_items.append(i)
+                yield i
+
+        results = _map_ordered(lambda item: item, items())
+        self.assertEqual(next(results), 0)
+
+        # 2 * MEDIA_CHUNK_ENCODING_THREADS items are submitted before waiting for the first one
+        self.assertEqual(len(consumed_items), 5)
+        results.close()
+
+    @override_settings(MEDIA_CHUNK_ENCODING_THREADS=4)
+    def test_can_propagate_errors(self):
+        def func(item: int) -> int:
+            if item == 3:
+                raise ValueError("item 3")
+            return item
+
+        results = _map_ordered(func, range(10))
+
+        self.assertEqual([next(results) for _ in range(3)], [0, 1, 2])
+        with self.assertRaisesMessage(ValueError, "item 3"):
+            next(results)
+
+    @override_settings(MEDIA_CHUNK_ENCODING_THREADS=1)
+    def test_can_process_sequentially_with_one_thread(self):
+        thread_names = set()
+
+        def func(item: int) -> int:
+            thread_names.add(threading.current_thread().name)
+            return item * 2
+
+        with mock.patch.object(
+            media_extractors.concurrent.futures, "ThreadPoolExecutor"
+        ) as executor_class:
+            self.assertEqual(list(_map_ordered(func, range(5))), [0, 2, 4, 6, 8])
+
+        executor_class.assert_not_called()
+        self.assertEqual(thread_names, {threading.current_thread().name})
+
+
+class ZipCompressedChunkWriterTest(SimpleTestCase):
+    def _save_chunk(self, writer: ZipCompressedChunkWriter) -> list[tuple[int, int]]:
+        images = [(Image.new("RGB", (8 + i, 4)), f"{i}.png", None) for i in range(3)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chunk_path = os.path.join(temp_dir, "chunk.zip")
+            image_sizes = writer.save_as_chunk(iter(images), chunk_path)
+
+            with zipfile.ZipFile(chunk_path) as chunk:
+                self.assertEqual(len(chunk.namelist()), len(images))
+
+        return image_sizes
+
+    def test_can_encode_frames_in_parallel(self):
+        writer = ZipCompressedChunkWriter(95)
+
+        with mock.patch.object(media_extractors, "_map_ordered", wraps=_map_ordered) as map_ordered:
+            image_sizes = self._save_chunk(writer)
+
+        map_ordered.assert_called_once()
+        self.assertEqual(image_sizes, [(8, 4), (9, 4), (10, 4)])
+
+    def test_can_disable_parallel_frame_encoding(self):
+        writer = ZipCompressedChunkWriter(95, parallel_frame_encoding=False)
+
+        with mock.patch.object(media_extractors, "_map_ordered") as map_ordered:
+            image_sizes = self._save_chunk(writer)
+
+        map_ordered.assert_not_called()
+        self.assertEqual(image_sizes, [(8, 4), (9, 4), (10, 4)])
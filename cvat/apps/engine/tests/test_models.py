@@ -0,0 +1,44 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from django.test import SimpleTestCase
+
+from cvat.apps.engine.models import Data, Segment, SegmentType, Task
+
+
+class SegmentFrameSetTest(SimpleTestCase):
+    def _make_segment(self, frames: list[int]) -> Segment:
+        db_data = Data(start_frame=0, stop_frame=20, frame_filter="")
+        return Segment(
+            task=Task(data=db_data),
+            start_frame=0,
+            stop_frame=10,
+            type=SegmentType.SPECIFIC_FRAMES,
+            frames=frames,
+        )
+
+    def test_can_reuse_frame_set(self):
+        db_segment = self._make_segment([1, 5, 12])
+
+        frame_set = db_segment.frame_set
+
+        self.assertEqual(frame_set, {1, 5})
+        self.assertIs(db_segment.frame_set, frame_set)
+
+    def test_frame_set_is_updated_after_frames_are_changed_in_place(self):
+        db_segment = self._make_segment([1, 5, 12])
+        self.assertEqual(db_segment.frame_set, {1, 5})
+
+        db_segment.frames[1] = 7
+        self.assertEqual(db_segment.frame_set, {1, 7})
+
+        db_segment.frames.append(9)
+        self.assertEqual(db_segment.frame_set, {1, 7, 9})
+
+    def test_frame_set_is_updated_after_frames_are_replaced(self):
+        db_segment = self._make_segment([1, 5])
+        self.assertEqual(db_segment.frame_set, {1, 5})
+
+        db_segment.frames = [2, 3]
+        self.assertEqual(db_segment.frame_set, {2, 3})
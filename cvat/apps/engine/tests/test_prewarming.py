@@ -0,0 +1,101 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rq.job import JobStatus as RQJobStatus
+
+from cvat.apps.engine import prewarming
+from cvat.apps.engine.media_extractors import FrameQuality
+from cvat.apps.engine.models import Job, JobType, Segment, Task
+
+_TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "media": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "prewarming-tests",
+    },
+}
+
+
+@override_settings(
+    CACHES=_TEST_CACHES,
+    MEDIA_CACHE_PREWARMING_ENABLED=True,
+    MEDIA_CACHE_PREWARMING_CHUNKS_AHEAD=2,
+)
+class EnqueueNextJobChunksTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = mock.patch.object(prewarming, "enqueue_segment_chunks")
+        self.enqueue_segment_chunks = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_job(self, job_id: int, job_type: JobType) -> Job:
+        return Job(id=job_id, type=job_type, segment=Segment(id=job_id))
+
+    def test_repeated_chunk_requests_are_skipped(self):
+        db_job = self._make_job(1, JobType.ANNOTATION)
+
+        prewarming.enqueue_next_job_chunks(db_job, 0)
+        prewarming.enqueue_next_job_chunks(db_job, 0)
+        prewarming.enqueue_next_job_chunks(db_job, 1)
+
+        self.assertEqual(
+            [call.args[1] for call in self.enqueue_segment_chunks.call_args_list],
+            [range(1, 3), range(2, 4)],
+        )
+
+    def test_ground_truth_job_chunks_are_not_prepared(self):
+        prewarming.enqueue_next_job_chunks(self._make_job(2, JobType.GROUND_TRUTH), 0)
+        prewarming.enqueue_job_chunks(self._make_job(3, JobType.GROUND_TRUTH))
+
+        self.enqueue_segment_chunks.assert_not_called()
+
+
+@override_settings(
+    MEDIA_CACHE_PREWARMING_ENABLED=True,
+    MEDIA_CACHE_PREWARMING_MAX_QUEUED_JOBS=5,
+)
+class EnqueueSegmentChunksTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.db_segment = Segment(id=1, task=Task(id=1))
+        self.queue = mock.Mock(count=3)
+        self.rq_jobs = {}
+
+        for patcher in (
+            mock.patch.object(prewarming, "_get_queue", return_value=self.queue),
+            mock.patch.object(prewarming, "_is_enabled", return_value=True),
+            mock.patch.object(prewarming, "_get_segment_chunk_count", return_value=4),
+            mock.patch.object(
+                prewarming.RQJob,
+                "fetch_many",
+                side_effect=lambda rq_ids, connection: [self.rq_jobs.get(i) for i in rq_ids],
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get_enqueued_chunks(self):
+        return [call.kwargs["args"][1] for call in self.queue.enqueue_call.call_args_list]
+
+    def test_can_enqueue_chunks_up_to_queue_limit(self):
+        prewarming.enqueue_segment_chunks(self.db_segment, range(-1, 5))
+
+        self.assertEqual(self._get_enqueued_chunks(), [0, 1])
+        prewarming.RQJob.fetch_many.assert_called_once()
+
+    def test_scheduled_chunks_are_skipped(self):
+        self.rq_jobs[prewarming._make_rq_id(1, 0, FrameQuality.COMPRESSED)] = mock.Mock(
+            get_status=mock.Mock(return_value=RQJobStatus.QUEUED)
+        )
+
+        prewarming.enqueue_segment_chunks(self.db_segment, range(2))
+
+        self.assertEqual(self._get_enqueued_chunks(), [1])
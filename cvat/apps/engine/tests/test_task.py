@@ -0,0 +1,131 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.engine import models, task
+
+
+class _MediaExtractorSpy:
+    def __init__(self, frame_count: int, on_read):
+        self.frame_count = frame_count
+        self.on_read = on_read
+
+    def __iter__(self):
+        for frame in range(self.frame_count):
+            self.on_read(frame)
+            yield (frame, f"{frame}.jpg", None)
+
+
+@override_settings(CVAT_CONCURRENT_CHUNK_PROCESSING=2)
+class CreateStaticChunksTest(SimpleTestCase):
+    CHUNK_SIZE = 2
+
+    def setUp(self):
+        super().setUp()
+
+        self.lock = threading.Lock()
+        self.written_chunks = {}
+        self.active_chunks = set()
+        self.max_active_chunks = 0
+        self.chunks_in_progress_on_read = []
+
+        test = self
+
+        class _ChunkWriterSpy:
+            def __init__(self, quality, **kwargs):
+                self.init_kwargs = kwargs
+
+            def save_as_chunk(self, images, chunk_path):
+                _, segment_id, chunk_idx = chunk_path
+                with test.lock:
+                    test.active_chunks.add((segment_id, chunk_idx))
+                    test.max_active_chunks = max(test.max_active_chunks, len(test.active_chunks))
+
+                time.sleep(0.02)
+
+                with test.lock:
+                    test.written_chunks[chunk_path] = list(images)
+                    test.active_chunks.discard((segment_id, chunk_idx))
+
+        for name in ("ZipChunkWriter", "ZipCompressedChunkWriter"):
+            patcher = mock.patch.object(task, name, _ChunkWriterSpy)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(task.rq, "get_current_job")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_task(self, segment_frames: list[range]) -> models.Task:
+        db_data = mock.Mock(
+            compressed_chunk_type=models.DataChoice.IMAGESET,
+            original_chunk_type=models.DataChoice.IMAGESET,
+            image_quality=70,
+            start_frame=0,
+            chunk_size=self.CHUNK_SIZE,
+            get_frame_step=lambda: 1,
+            get_original_segment_chunk_path=lambda chunk_idx, segment_id: (
+                "original",
+                segment_id,
+                chunk_idx,
+            ),
+            get_compressed_segment_chunk_path=lambda chunk_idx, segment_id: (
+                "compressed",
+                segment_id,
+                chunk_idx,
+            ),
+        )
+        db_segments = [
+            mock.Mock(id=segment_id, frame_set=frames)
+            for segment_id, frames in enumerate(segment_frames)
+        ]
+        db_task = mock.Mock(dimension=models.DimensionType.DIM_2D, data=db_data)
+        db_task.segment_set.all.return_value = db_segments
+        return db_task
+
+    def _on_frame_read(self, frame: int):
+        with self.lock:
+            written_chunk_count = min(
+                sum(1 for path in self.written_chunks if path[0] == chunk_type)
+                for chunk_type in ("original", "compressed")
+            )
+
+        self.chunks_in_progress_on_read.append(frame // self.CHUNK_SIZE - written_chunk_count)
+
+    def test_can_create_chunks_in_bounded_pipeline(self):
+        db_task = self._make_task([range(0, 6), range(6, 10)])
+        media_extractor = _MediaExtractorSpy(10, self._on_frame_read)
+
+        task._create_static_chunks(db_task, media_extractor=media_extractor)
+
+        expected_chunks = {
+            (0, 0): [0, 1],
+            (0, 1): [2, 3],
+            (0, 2): [4, 5],
+            (1, 0): [6, 7],
+            (1, 1): [8, 9],
+        }
+        for chunk_type in ("original", "compressed"):
+            self.assertEqual(
+                {
+                    (segment_id, chunk_idx): [frame for frame, _, _ in frames]
+                    for (written_chunk_type, segment_id, chunk_idx), frames in (
+                        self.written_chunks.items()
+                    )
+                    if written_chunk_type == chunk_type
+                },
+                expected_chunks,
+            )
+
+        # the chunks are prepared in parallel
+        self.assertLess(1, self.max_active_chunks)
+
+        # no more than CVAT_CONCURRENT_CHUNK_PROCESSING chunks are waiting
+        # while the next one is being read
+        self.assertLessEqual(max(self.chunks_in_progress_on_read), 2)
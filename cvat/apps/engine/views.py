@@ -9,6 +9,7 @@ import os.path as osp
 import re
 import shutil
 import functools
+import zlib
 
 from contextlib import suppress
 from PIL import Image
@@ -18,6 +19,7 @@ import traceback
 import textwrap
 from collections import namedtuple
 from copy import copy
+from io import BytesIO
 from datetime import datetime
 from redis.exceptions import ConnectionError as RedisConnectionError
 from tempfile import NamedTemporaryFile
@@ -30,9 +32,13 @@ from django.contrib.auth.models import User
 from django.db import IntegrityError, transaction
 from django.db.models import Count
 from django.db.models.query import Prefetch
-from django.http import HttpResponse, HttpRequest, HttpResponseNotFound, HttpResponseBadRequest
+from django.http import (
+    HttpResponse, HttpRequest, HttpResponseNotFound, HttpResponseBadRequest, StreamingHttpResponse
+)
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.views.decorators.cache import never_cache
 from django_rq.queues import DjangoRQ
 
@@ -55,15 +61,18 @@ from rq.job import Job as RQJob, JobStatus as RQJobStatus
 
 import cvat.apps.dataset_manager as dm
 import cvat.apps.dataset_manager.views  # pylint: disable=unused-import
-from cvat.apps.engine.cloud_provider import db_storage_to_storage_instance, import_resource_from_cloud_storage
+from cvat.apps.engine.cloud_provider import (
+    db_storage_to_storage_instance, import_resource_from_cloud_storage, list_storage_content_on_one_page
+)
 from cvat.apps.events.handlers import handle_dataset_import
 from cvat.apps.dataset_manager.bindings import CvatImportError
 from cvat.apps.dataset_manager.serializers import DatasetFormatsSerializer
 from cvat.apps.engine.frame_provider import (
-    IFrameProvider, TaskFrameProvider, JobFrameProvider, FrameQuality
+    IFrameProvider, TaskFrameProvider, JobFrameProvider, FrameQuality, DataWithMeta
 )
 from cvat.apps.engine.filters import NonModelSimpleFilter, NonModelOrderingFilter, NonModelJsonLogicFilter
 from cvat.apps.engine.media_extractors import get_mime
+from cvat.apps.engine.mime_types import mimetypes
 from cvat.apps.engine.permissions import AnnotationGuidePermission, get_iam_context
 from cvat.apps.engine.models import (
     ClientFile, Job, JobType, Label, Task, Project, Issue, Data,
@@ -101,7 +110,7 @@ from cvat.apps.engine.mixins import (
 )
 from cvat.apps.engine.location import get_location_configuration, StorageType
 
-from . import models, task
+from . import models, prewarming, task
 from .log import ServerLogManager
 from cvat.apps.iam.filters import ORGANIZATION_OPEN_API_PARAMETERS
 from cvat.apps.iam.permissions import PolicyEnforcer, IsAuthenticatedOrReadPublicResource
@@ -644,7 +653,7 @@ class ProjectViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
             data_quality='compressed',
         )
 
-        return data_getter()
+        return data_getter(request)
 
     @staticmethod
     def _get_rq_response(queue, job_id):
@@ -687,27 +696,31 @@ class _DataGetter(metaclass=ABCMeta):
     @abstractmethod
     def _get_frame_provider(self) -> IFrameProvider: ...
 
-    def __call__(self):
+    def __call__(self, request: HttpRequest):
         frame_provider = self._get_frame_provider()
 
         try:
             if self.type == 'chunk':
+                chunk_path = frame_provider.get_chunk_file_path(self.number, quality=self.quality)
+                if chunk_path:
+                    return self._make_file_response(request, chunk_path)
+
                 data = frame_provider.get_chunk(self.number, quality=self.quality)
-                return HttpResponse(data.data.getvalue(), content_type=data.mime)
+                return self._make_data_response(request, data)
             elif self.type == 'frame' or self.type == 'preview':
                 if self.type == 'preview':
                     data = frame_provider.get_preview()
                 else:
                     data = frame_provider.get_frame(self.number, quality=self.quality)
 
-                return HttpResponse(data.data.getvalue(), content_type=data.mime)
+                return self._make_data_response(request, data)
 
             elif self.type == 'context_image':
                 data = frame_provider.get_frame_context_images_chunk(self.number)
                 if not data:
                     return HttpResponseNotFound()
 
-                return HttpResponse(data.data, content_type=data.mime)
+                return self._make_data_response(request, data)
             else:
                 return Response(data='unknown data type {}.'.format(self.type),
                     status=status.HTTP_400_BAD_REQUEST)
@@ -716,6 +729,50 @@ class _DataGetter(metaclass=ABCMeta):
                 '\n'.join([str(d) for d in ex.detail])
             return Response(data=msg, status=ex.status_code)
 
+    @staticmethod
+    def _make_conditional_response(
+        request: HttpRequest, etag: str, make_response: Callable[[], HttpResponse]
+    ) -> HttpResponse:
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = make_response()
+
+        response['ETag'] = etag
+
+        # The data requires authorization, so it can only be stored in private caches.
+        # Clients are expected to revalidate the data using the ETag.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    @classmethod
+    def _make_data_response(
+        cls, request: HttpRequest, data: DataWithMeta[BytesIO]
+    ) -> HttpResponse:
+        # getvalue() doesn't copy the buffer if there are no exported views of it
+        content = data.data.getvalue()
+
+        # Reuse the media cache checksum, the data is only hashed if it's not from the cache.
+        # CRC32 can have collisions, so the ETag is weak.
+        checksum = data.checksum if data.checksum is not None else zlib.crc32(content)
+        etag = 'W/' + quote_etag('{:08x}-{}'.format(checksum, len(content)))
+
+        return cls._make_conditional_response(
+            request, etag, lambda: HttpResponse(content, content_type=data.mime)
+        )
+
+    @classmethod
+    def _make_file_response(cls, request: HttpRequest, path: str) -> HttpResponse:
+        # The file is identified by the modification time and size, like in the web server,
+        # so the file is not read to answer a conditional request
+        file_stat = os.stat(path)
+        etag = 'W/' + quote_etag('{:x}-{:x}'.format(int(file_stat.st_mtime), file_stat.st_size))
+
+        # Let the web server send the file, it also handles range requests for static files
+        return cls._make_conditional_response(
+            request, etag,
+            lambda: sendfile(request, path, mimetype=mimetypes.guess_type(path)[0]),
+        )
+
 class _TaskDataGetter(_DataGetter):
     def __init__(
         self,
@@ -771,12 +828,19 @@ class _JobDataGetter(_DataGetter):
     def _get_frame_provider(self) -> JobFrameProvider:
         return JobFrameProvider(self._db_job)
 
-    def __call__(self):
+    def __call__(self, request: HttpRequest):
         if self.type == 'chunk':
             # Reproduce the task chunk indexing
             frame_provider = self._get_frame_provider()
 
             if self.index is not None:
+                # The next chunks are likely to be requested soon
+                prewarming.enqueue_next_job_chunks(self._db_job, self.index)
+
+                chunk_path = frame_provider.get_chunk_file_path(self.index, quality=self.quality)
+                if chunk_path:
+                    return self._make_file_response(request, chunk_path)
+
                 data = frame_provider.get_chunk(
                     self.index, quality=self.quality, is_task_chunk=False
                 )
@@ -785,9 +849,9 @@ class _JobDataGetter(_DataGetter):
                     self.number, quality=self.quality, is_task_chunk=True
                 )
 
-            return HttpResponse(data.data.getvalue(), content_type=data.mime)
+            return self._make_data_response(request, data)
         else:
-            return super().__call__()
+            return super().__call__(request)
 
 @extend_schema(tags=['tasks'])
 @extend_schema_view(
@@ -1314,7 +1378,7 @@ class TaskViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
             data_getter = _TaskDataGetter(
                 self._object, data_type=data_type, data_num=data_num, data_quality=data_quality
             )
-            return data_getter()
+            return data_getter(request)
 
     @tus_chunk_action(detail=True, suffix_base="data")
     def append_data_chunk(self, request, pk, file_id):
@@ -1660,7 +1724,7 @@ class TaskViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
             data_type='preview',
             data_quality='compressed',
         )
-        return data_getter()
+        return data_getter(request)
 
 
 @extend_schema(tags=['jobs'])
@@ -1910,6 +1974,12 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
     def annotations(self, request, pk):
         self._object = self.get_object() # force call of check_object_permissions()
         if request.method == 'GET':
+            if not request.query_params.get("format") and dm.task.is_job_data_streaming_needed(pk):
+                # The response is written as the annotations are read from the DB
+                return StreamingHttpResponse(
+                    dm.task.stream_job_data(pk), content_type='application/json'
+                )
+
             # FUTURE-TODO: mark as deprecated using this endpoint to export annotations when new API for result file downloading will be implemented
             return self.export_dataset_v1(
                 request=request,
@@ -2054,7 +2124,7 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
             data_type=data_type, data_quality=data_quality,
             data_index=data_index, data_num=data_num
         )
-        return data_getter()
+        return data_getter(request)
 
 
     @extend_schema(methods=['GET'], summary='Get metainformation for media files in a job',
@@ -2152,7 +2222,7 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
             data_type='preview',
             data_quality='compressed',
         )
-        return data_getter()
+        return data_getter(request)
 
 
 @extend_schema(tags=['issues'])
@@ -2675,7 +2745,7 @@ class CloudStorageViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
                     storage.download_file(manifest_path, full_manifest_path)
                 manifest = ImageManifestManager(full_manifest_path, db_storage.get_storage_dirname())
                 # need to update index
-                manifest.set_index()
+                manifest.update_index()
                 try:
                     start_index = int(next_token or '0')
                 except ValueError:
@@ -2683,7 +2753,7 @@ class CloudStorageViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
                 content = manifest.emulate_hierarchical_structure(
                     page_size, manifest_prefix=manifest_prefix, prefix=prefix, default_prefix=storage.prefix, start_index=start_index)
             else:
-                content = storage.list_files_on_one_page(prefix, next_token, page_size, _use_sort=True)
+                content = list_storage_content_on_one_page(db_storage, prefix, next_token, page_size)
             for i in content['content']:
                 mime_type = get_mime(i['name']) if i['type'] != 'DIR' else 'DIR' # identical to share point
                 if mime_type == 'zip':
@@ -2728,7 +2798,7 @@ class CloudStorageViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
                     return HttpResponseNotFound('Cloud storage preview not found')
                 return HttpResponse(result[0].getvalue(), result[1])
 
-            preview, mime = cache.get_or_set_cloud_preview(db_storage)
+            preview, mime, _ = cache.get_or_set_cloud_preview(db_storage)
             return HttpResponse(preview.getvalue(), mime)
         except CloudStorageModel.DoesNotExist:
             message = f"Storage {pk} does not exist"
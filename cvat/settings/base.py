@@ -274,6 +274,8 @@ class CVAT_QUEUES(Enum):
     QUALITY_REPORTS = 'quality_reports'
     ANALYTICS_REPORTS = 'analytics_reports'
     CLEANING = 'cleaning'
+    CHUNKS = 'chunks'
+    CLOUD_STORAGE_LISTINGS = 'cloud_storage_listings'
 
 redis_inmem_host = os.getenv('CVAT_REDIS_INMEM_HOST', 'localhost')
 redis_inmem_port = os.getenv('CVAT_REDIS_INMEM_PORT', 6379)
@@ -319,6 +321,14 @@ RQ_QUEUES = {
         **shared_queue_settings,
         'DEFAULT_TIMEOUT': '1h',
     },
+    CVAT_QUEUES.CHUNKS.value: {
+        **shared_queue_settings,
+        'DEFAULT_TIMEOUT': '1h',
+    },
+    CVAT_QUEUES.CLOUD_STORAGE_LISTINGS.value: {
+        **shared_queue_settings,
+        'DEFAULT_TIMEOUT': '1h',
+    },
 }
 
 NUCLIO = {
@@ -724,3 +734,34 @@ update_started_job_registry_cleanup()
 
 CLOUD_DATA_DOWNLOADING_MAX_THREADS_NUMBER = 4
 CLOUD_DATA_DOWNLOADING_NUMBER_OF_FILES_PER_THREAD = 1000
+
+# How long a cloud storage client can be reused in a server process, in seconds
+CLOUD_STORAGE_CLIENT_TTL = int(os.getenv('CVAT_CLOUD_STORAGE_CLIENT_TTL', 600))
+# The maximum number of HTTP connections kept by a cloud storage client
+CLOUD_STORAGE_CLIENT_MAX_CONNECTIONS = int(os.getenv('CVAT_CLOUD_STORAGE_CLIENT_MAX_CONNECTIONS', 20))
+# How many times the failed cloud storage requests are repeated
+CLOUD_STORAGE_REQUEST_MAX_RETRIES = int(os.getenv('CVAT_CLOUD_STORAGE_REQUEST_MAX_RETRIES', 5))
+# The big files are uploaded to cloud storages in parts of this size, in bytes
+CLOUD_STORAGE_UPLOAD_PART_SIZE = int(os.getenv('CVAT_CLOUD_STORAGE_UPLOAD_PART_SIZE', 32 * 1024 ** 2))
+# The maximum number of parts uploaded in parallel for a file
+CLOUD_STORAGE_UPLOAD_MAX_CONCURRENCY = int(os.getenv('CVAT_CLOUD_STORAGE_UPLOAD_MAX_CONCURRENCY', 4))
+
+# How long the cloud storage content listing pages are cached, in seconds.
+# The files added to a storage outside CVAT are not listed until the cached pages expire.
+# 0 disables the cache. The cache is disabled by default
+CLOUD_STORAGE_LISTING_CACHE_TTL = int(os.getenv('CVAT_CLOUD_STORAGE_LISTING_CACHE_TTL', 0))
+# The listings with at least this number of pages are requested completely
+# in a background job. 0 disables the background listing
+CLOUD_STORAGE_LISTING_SNAPSHOT_MIN_PAGES = int(os.getenv('CVAT_CLOUD_STORAGE_LISTING_SNAPSHOT_MIN_PAGES', 0))
+CLOUD_STORAGE_LISTING_SNAPSHOT_MAX_PAGES = 1000
+# How long the pages requested in the background jobs are cached, in seconds
+CLOUD_STORAGE_LISTING_SNAPSHOT_TTL = int(os.getenv('CVAT_CLOUD_STORAGE_LISTING_SNAPSHOT_TTL', 3600))
+
+# The local disk cache for the cloud storage objects. The size is in bytes,
+# 0 disables the cache. The cache is disabled by default
+CLOUD_STORAGE_CACHE_ROOT = os.getenv('CVAT_CLOUD_STORAGE_CACHE_ROOT', '')
+CLOUD_STORAGE_CACHE_MAX_SIZE = int(os.getenv('CVAT_CLOUD_STORAGE_CACHE_MAX_SIZE', 0))
+# How often the cache size is checked, in seconds
+CLOUD_STORAGE_CACHE_SWEEP_INTERVAL = int(os.getenv('CVAT_CLOUD_STORAGE_CACHE_SWEEP_INTERVAL', 300))
+# How long the cached object versions are considered actual, in seconds
+CLOUD_STORAGE_CACHE_VALIDATION_TTL = int(os.getenv('CVAT_CLOUD_STORAGE_CACHE_VALIDATION_TTL', 60))
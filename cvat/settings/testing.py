@@ -92,3 +92,7 @@ class PatchedDiscoverRunner(DiscoverRunner):
 # No need to profile unit tests
 INSTALLED_APPS.remove('silk')
 MIDDLEWARE.remove('silk.middleware.SilkyMiddleware')
+
+# RQ jobs are executed synchronously in tests,
+# background chunk preparation would only slow down the tests
+MEDIA_CACHE_PREWARMING_ENABLED = False
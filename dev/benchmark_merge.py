@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compares the performance of the batched and the pairwise shape similarity computation
+in the segment overlap merging. The results of both versions are checked to be identical.
+
+Usage (requires the server development environment):
+    dev/benchmark_merge.py [--objects 300] [--frames 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from copy import deepcopy
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _generate_shapes(rng: random.Random, *, frames: int, objects: int):
+    import numpy as np
+
+    shapes = []
+    for frame in range(frames):
+        for _ in range(objects):
+            label_id = rng.randint(1, 3)
+            x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            shape_type = rng.choice(["rectangle", "polygon", "cuboid"])
+
+            if shape_type == "rectangle":
+                points = [x, y, x + rng.uniform(1, 100), y + rng.uniform(1, 100)]
+            elif shape_type == "polygon":
+                points = []
+                vertex_count = rng.randint(3, 10)
+                for i in range(vertex_count):
+                    angle = 2 * np.pi * i / vertex_count
+                    radius = rng.uniform(10, 60)
+                    points += [x + radius * np.cos(angle), y + radius * np.sin(angle)]
+            else:
+                points = [x, y, rng.uniform(0, 10)] + [0.0] * 3 + \
+                    [rng.uniform(1, 100) for _ in range(3)] + [0.0] * 7
+
+            shapes.append({
+                "type": shape_type, "frame": frame, "label_id": label_id, "points": points,
+                "occluded": False, "outside": False, "z_order": 0, "rotation": 0,
+                "group": 0, "source": "manual", "attributes": [],
+            })
+
+    return shapes
+
+
+def _add_noise(rng: random.Random, shapes):
+    shapes = deepcopy(shapes)
+    for shape in shapes:
+        shape["points"] = [v + rng.uniform(-3, 3) for v in shape["points"]]
+    return shapes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=300, help="Objects per frame")
+    parser.add_argument("--frames", type=int, default=5, help="Overlapping frames")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(REPO_ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cvat.settings.development")
+    import django
+    django.setup()
+
+    from cvat.apps.dataset_manager.annotation import ObjectManager, ShapeManager
+
+    class PairwiseShapeManager(ShapeManager):
+        _calc_objects_similarity_matrix = classmethod(
+            ObjectManager._calc_objects_similarity_matrix.__func__)
+
+    rng = random.Random(42)
+    for dimension in ["2d", "3d"]:
+        old_shapes = _generate_shapes(rng, frames=args.frames, objects=args.objects)
+        new_shapes = _add_noise(rng, old_shapes)
+
+        results = {}
+        for name, manager_class in [
+            ("pairwise", PairwiseShapeManager),
+            ("batched", ShapeManager),
+        ]:
+            def _merge():
+                manager = manager_class(deepcopy(old_shapes))
+                manager.merge(deepcopy(new_shapes), 0, args.frames, dimension)
+                return manager.objects
+
+            results[name] = _merge()
+            duration = min(timeit.repeat(_merge, number=1, repeat=args.repeat))
+            print(f"{dimension} {name}: {duration:.3f}s")
+
+        assert results["pairwise"] == results["batched"], "The merge results are different"
+
+
+if __name__ == "__main__":
+    main()
@@ -203,7 +203,8 @@ class TestCLI:
         assert 0 < filename.stat().st_size
 
     @pytest.mark.parametrize("quality", ("compressed", "original"))
-    def test_can_download_task_frames(self, fxt_new_task: Task, quality: str):
+    @pytest.mark.parametrize("use_chunks", (False, True))
+    def test_can_download_task_frames(self, fxt_new_task: Task, quality: str, use_chunks: bool):
         out_dir = str(self.tmp_path / "downloads")
         self.run_cli(
             "frames",
@@ -214,6 +215,7 @@ class TestCLI:
             out_dir,
             "--quality",
             quality,
+            *(["--use-chunks"] if use_chunks else []),
         )
 
         assert set(os.listdir(out_dir)) == {
@@ -1543,6 +1543,23 @@ class TestGetJobPreview:
             (width, height) = Image.open(BytesIO(response.data)).size
             assert width > 0 and height > 0
 
+    def test_can_revalidate_job_preview(self, jobs):
+        job_id = next(job["id"] for job in jobs)
+
+        with make_api_client("admin1") as client:
+            (_, response) = client.jobs_api.retrieve_preview(job_id)
+            assert response.status == HTTPStatus.OK
+
+            etag = response.headers["ETag"]
+            assert etag
+
+            client.set_default_header("If-None-Match", etag)
+            (_, response) = client.jobs_api.retrieve_preview(
+                job_id, _parse_response=False, _check_status=False
+            )
+            assert response.status == HTTPStatus.NOT_MODIFIED
+            assert response.headers["ETag"] == etag
+
     def _test_get_job_preview_403(self, username, jid, **kwargs):
         with make_api_client(username) as client:
             (_, response) = client.jobs_api.retrieve_preview(
@@ -86,6 +86,34 @@ def fxt_new_task(fxt_image_file: Path, fxt_login: Tuple[Client, str]):
     yield task
 
 
+@pytest.fixture
+def fxt_new_task_with_many_chunks(tmp_path: Path, fxt_login: Tuple[Client, str]):
+    client, _ = fxt_login
+
+    image_paths = []
+    for i in range(7):
+        image_path = tmp_path / f"img_{i}.png"
+        with image_path.open("wb") as f:
+            f.write(
+                generate_image_file(
+                    filename=str(image_path), size=(5, 10), color=(i * 30, i * 30, i * 30)
+                ).getvalue()
+            )
+        image_paths.append(image_path)
+
+    task = client.tasks.create_from_data(
+        spec={
+            "name": "test_task",
+            "labels": [{"name": "car"}, {"name": "person"}],
+            "segment_size": 4,
+        },
+        resources=image_paths,
+        data_params={"image_quality": 80, "chunk_size": 2, "sorting_method": "natural"},
+    )
+
+    yield task
+
+
 @pytest.fixture
 def fxt_new_task_with_target_storage(fxt_image_file: Path, fxt_login: Tuple[Client, str]):
     client, _ = fxt_login
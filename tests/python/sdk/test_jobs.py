@@ -18,7 +18,7 @@ from pytest_cases import fixture_ref, parametrize
 from shared.fixtures.data import CloudStorageAssets
 
 from .common import TestDatasetExport
-from .util import make_pbar
+from .util import check_frame_colors, make_pbar
 
 
 class TestJobUsecases(TestDatasetExport):
@@ -167,13 +167,17 @@ class TestJobUsecases(TestDatasetExport):
 
     @pytest.mark.parametrize("quality", ("compressed", "original"))
     @pytest.mark.parametrize("image_extension", (None, "bmp"))
-    def test_can_download_frames(self, fxt_new_task: Task, quality: str, image_extension: str):
+    @pytest.mark.parametrize("use_chunks", (False, True))
+    def test_can_download_frames(
+        self, fxt_new_task: Task, quality: str, image_extension: str, use_chunks: bool
+    ):
         fxt_new_task.get_jobs()[0].download_frames(
             [0],
             image_extension=image_extension,
             quality=quality,
             outdir=self.tmp_path,
             filename_pattern="frame-{frame_id}{frame_ext}",
+            use_chunks=use_chunks,
         )
 
         if image_extension is not None:
@@ -187,6 +191,21 @@ class TestJobUsecases(TestDatasetExport):
         assert (self.tmp_path / f"frame-0.{expected_frame_ext}").is_file()
         assert self.stdout.getvalue() == ""
 
+    @pytest.mark.parametrize("quality", ("compressed", "original"))
+    @pytest.mark.parametrize("use_chunks", (False, True))
+    def test_can_download_frames_from_job_with_offset(
+        self, fxt_new_task_with_many_chunks: Task, quality: str, use_chunks: bool
+    ):
+        # the segment size is 4, the second job includes the frames 4-6
+        job = next(j for j in fxt_new_task_with_many_chunks.get_jobs() if j.start_frame == 4)
+        frame_ids = [4, 6]
+
+        outdir = self.tmp_path / "frames"
+        job.download_frames(frame_ids, quality=quality, outdir=outdir, use_chunks=use_chunks)
+
+        check_frame_colors(outdir, frame_ids)
+        assert self.stdout.getvalue() == ""
+
     def test_can_upload_annotations(self, fxt_new_task: Task, fxt_coco_file: Path):
         pbar_out = io.StringIO()
         pbar = make_pbar(file=pbar_out)
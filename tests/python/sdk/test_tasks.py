@@ -22,7 +22,7 @@ from shared.fixtures.data import CloudStorageAssets
 from shared.utils.helpers import generate_image_files
 
 from .common import TestDatasetExport
-from .util import make_pbar
+from .util import check_frame_colors, make_pbar
 
 
 class TestTaskUsecases(TestDatasetExport):
@@ -363,8 +363,9 @@ class TestTaskUsecases(TestDatasetExport):
 
     @pytest.mark.parametrize("quality", ("compressed", "original"))
     @pytest.mark.parametrize("image_extension", (None, "bmp"))
+    @pytest.mark.parametrize("use_chunks", (False, True))
     def test_can_download_frames(
-        self, fxt_new_task: Task, quality: str, image_extension: Optional[str]
+        self, fxt_new_task: Task, quality: str, image_extension: Optional[str], use_chunks: bool
     ):
         fxt_new_task.download_frames(
             [0],
@@ -372,6 +373,7 @@ class TestTaskUsecases(TestDatasetExport):
             quality=quality,
             outdir=self.tmp_path,
             filename_pattern="frame-{frame_id}{frame_ext}",
+            use_chunks=use_chunks,
         )
 
         if image_extension is not None:
@@ -385,6 +387,22 @@ class TestTaskUsecases(TestDatasetExport):
         assert (self.tmp_path / f"frame-0.{expected_frame_ext}").is_file()
         assert self.stdout.getvalue() == ""
 
+    @pytest.mark.parametrize("quality", ("compressed", "original"))
+    @pytest.mark.parametrize("use_chunks", (False, True))
+    def test_can_download_frames_from_different_chunks(
+        self, fxt_new_task_with_many_chunks: Task, quality: str, use_chunks: bool
+    ):
+        # the chunk size is 2, the frames are in the chunks 0, 1, 2 and 3
+        frame_ids = [1, 2, 5, 6]
+
+        outdir = self.tmp_path / "frames"
+        fxt_new_task_with_many_chunks.download_frames(
+            frame_ids, quality=quality, outdir=outdir, use_chunks=use_chunks
+        )
+
+        check_frame_colors(outdir, frame_ids)
+        assert self.stdout.getvalue() == ""
+
     @pytest.mark.parametrize("quality", ("compressed", "original"))
     def test_can_download_chunk(self, fxt_new_task: Task, quality: str):
         chunk_path = self.tmp_path / "chunk.zip"
@@ -4,18 +4,31 @@
 
 import textwrap
 from pathlib import Path
-from typing import Container, Tuple
+from typing import Container, Sequence, Tuple
 from urllib.parse import urlparse
 
 import pytest
 from cvat_sdk.api_client.rest import RESTClientObject
 from cvat_sdk.core.helpers import DeferredTqdmProgressReporter
+from PIL import Image
 
 
 def make_pbar(file, **kwargs):
     return DeferredTqdmProgressReporter({"file": file, "mininterval": 0, **kwargs})
 
 
+def check_frame_colors(outdir: Path, frame_ids: Sequence[int]):
+    # the frames of fxt_new_task_with_many_chunks have the (30 * i, 30 * i, 30 * i) color
+    assert sorted(p.stem for p in outdir.iterdir()) == [
+        f"frame_{frame_id:06d}" for frame_id in frame_ids
+    ]
+
+    for frame_id in frame_ids:
+        (frame_path,) = outdir.glob(f"frame_{frame_id:06d}.*")
+        color = Image.open(frame_path).convert("RGB").getpixel((0, 0))
+        assert all(abs(c - 30 * frame_id) <= 5 for c in color)
+
+
 def generate_coco_json(filename: Path, img_info: Tuple[Path, int, int]):
     image_filename, image_width, image_height = img_info
 
@@ -3,32 +3,78 @@
 #
 # SPDX-License-Identifier: MIT
 
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
 from io import StringIO
 import av
 import json
+import math
+import mmap
 import os
+import struct
+import tempfile
+import threading
+import zlib
 
 from abc import ABC, abstractmethod, abstractproperty, abstractstaticmethod
 from contextlib import closing
-from itertools import islice
+from itertools import chain, islice, repeat
 from PIL import Image
 from json.decoder import JSONDecodeError
 from inspect import isgenerator
 
 from .errors import InvalidManifestError, InvalidVideoError
-from .utils import SortingMethod, md5_hash, rotate_image, sort
+from .utils import SortingMethod, md5_file_hash, md5_hash, rotate_image, sort
 from .types import NamedBytesIO
 
-from typing import Any, Dict, List, Union, Optional, Iterator, Tuple, Callable
+from typing import (
+    Any, BinaryIO, Deque, Dict, List, Union, Optional, Iterator, Sequence, Set, Tuple, Callable
+)
 
 
+def _find_invalid_key_frame_seeks(source_path: str, timestamps: Sequence[int]) -> List[int]:
+    "Returns the key frame timestamps, which can't be used for seeking"
+
+    invalid_timestamps = []
+    with closing(av.open(source_path, mode='r')) as container:
+        video_stream = VideoStreamReader._get_video_stream(container)
+        for timestamp in timestamps:
+            container.seek(offset=timestamp, stream=video_stream)
+            frame = next((
+                frame
+                for packet in container.demux(video_stream)
+                for frame in packet.decode()
+            ), None)
+
+            if frame is None or frame.pts != timestamp:
+                invalid_timestamps.append(timestamp)
+
+    return invalid_timestamps
+
 class VideoStreamReader:
-    def __init__(self, source_path, chunk_size, force):
+    def __init__(self, source_path, chunk_size, force, *,
+        fast: bool = False, seek_validation_step: int = 1, workers: int = 1,
+    ):
+        """
+        Args:
+            fast: read the video once, compute key frame checksums from the packet data
+                and validate seeking to the key frames after reading.
+                The produced manifest is compatible with the default mode,
+                but the checksums are different.
+            seek_validation_step: validate seeking to each N-th key frame only (in the fast mode).
+                With values > 1, the manifest can include key frames that cannot be seeked to.
+            workers: the number of processes used for key frame validation (in the fast mode)
+        """
+
         self._source_path = source_path
         self._frames_number = None
         self._force = force
         self._upper_bound = 3 * chunk_size + 1
+        self._fast = fast
+        self._seek_validation_step = max(1, seek_validation_step)
+        self._workers = max(1, workers)
 
         with closing(av.open(self.source_path, mode='r')) as container:
             video_stream = VideoStreamReader._get_video_stream(container)
@@ -78,6 +124,85 @@ class VideoStreamReader:
                     return False
                 return True
 
+    def _read_key_frames(self) -> Tuple[List[Tuple[int, int, str]], int]:
+        "Reads the video once, returns the key frames and the number of frames"
+
+        with closing(av.open(self.source_path, mode='r')) as container:
+            video_stream = self._get_video_stream(container)
+            prev_pts: Optional[int] = None
+            prev_dts: Optional[int] = None
+            index = 0
+            key_frames = []
+            key_packet_checksums: Dict[int, str] = {}
+
+            for packet in container.demux(video_stream):
+                # Decoded frames can be returned for the previous packets
+                if packet.is_keyframe and packet.pts is not None:
+                    key_packet_checksums[packet.pts] = md5_hash(packet)
+
+                for frame in packet.decode():
+                    # Check PTS and DTS sequences for validity
+                    if None not in {frame.pts, prev_pts} and frame.pts <= prev_pts:
+                        raise InvalidVideoError('Detected non-increasing PTS sequence in the video')
+                    if None not in {frame.dts, prev_dts} and frame.dts <= prev_dts:
+                        raise InvalidVideoError('Detected non-increasing DTS sequence in the video')
+                    prev_pts, prev_dts = frame.pts, frame.dts
+
+                    if frame.key_frame:
+                        checksum = key_packet_checksums.pop(frame.pts, None) or md5_hash(frame)
+                        key_frames.append((index, frame.pts, checksum))
+
+                    index += 1
+
+        return key_frames, index
+
+    def _find_invalid_key_frames(self, timestamps: Sequence[int]) -> Set[int]:
+        timestamps = timestamps[::self._seek_validation_step]
+
+        if self._workers == 1 or len(timestamps) < 2 * self._workers:
+            return set(_find_invalid_key_frame_seeks(self.source_path, timestamps))
+
+        # The key frames are validated independently, split them into sequential ranges
+        # to avoid long seeks in each process
+        batch_size = math.ceil(len(timestamps) / (4 * self._workers))
+        batches = [
+            timestamps[batch_start : batch_start + batch_size]
+            for batch_start in range(0, len(timestamps), batch_size)
+        ]
+
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            return set(chain.from_iterable(executor.map(
+                _find_invalid_key_frame_seeks, repeat(self.source_path), batches
+            )))
+
+    def _iterate_fast(self) -> Iterator[Union[int, Tuple[int, int, str]]]:
+        key_frames, frames_number = self._read_key_frames()
+
+        invalid_key_frames = self._find_invalid_key_frames([pts for _, pts, _ in key_frames])
+        key_frames_iter = iter([
+            key_frame for key_frame in key_frames if key_frame[1] not in invalid_key_frames
+        ])
+        next_key_frame = next(key_frames_iter, None)
+        key_frame_count = 0
+
+        for index in range(frames_number):
+            if next_key_frame and next_key_frame[0] == index:
+                key_frame_count += 1
+                yield next_key_frame
+                next_key_frame = next(key_frames_iter, None)
+            else:
+                yield index
+
+            key_frame_ratio = (index + 1) // (key_frame_count or 1)
+
+            # Check if the number of key frames meets the upper bound
+            if key_frame_ratio >= self._upper_bound and not self._force:
+                raise InvalidVideoError('The number of keyframes is not enough for smooth iteration over the video')
+
+        # Update frames number if not already set
+        if not self._frames_number:
+            self._frames_number = frames_number
+
     def __iter__(self) -> Iterator[Union[int, Tuple[int, int, str]]]:
         """
         Iterate over video frames and yield key frames or indexes.
@@ -85,6 +210,10 @@ class VideoStreamReader:
         Yields:
             Union[Tuple[int, int, str], int]: (frame index, frame timestamp, frame MD5) or frame index.
         """
+        if self._fast:
+            yield from self._iterate_fast()
+            return
+
         # Open containers for reading frames and checking movement on them
         with (
             closing(av.open(self.source_path, mode='r')) as reading_container,
@@ -151,8 +280,18 @@ class DatasetImagesReader:
         meta: Optional[Dict[str, List[str]]] = None,
         sorting_method: SortingMethod = SortingMethod.PREDEFINED,
         use_image_hash: bool = False,
+        use_file_hash: bool = False,
+        workers: int = 1,
         **kwargs
     ):
+        """
+        Args:
+            use_image_hash: compute checksums of the decoded image pixels
+            use_file_hash: compute checksums of the image file data, which doesn't
+                require image decoding. The sources must contain the full file data.
+            workers: the number of threads used for reading image properties
+        """
+
         self._is_generator_used = isgenerator(sources)
 
         if not self._is_generator_used:
@@ -166,6 +305,8 @@ class DatasetImagesReader:
         self._meta = meta
         self._data_dir = kwargs.get('data_dir', None)
         self._use_image_hash = use_image_hash
+        self._use_file_hash = use_file_hash
+        self._workers = max(1, workers)
         self._start = start
         self._stop = stop if stop or self._is_generator_used else len(sources) - 1
         if self._stop is None:
@@ -197,7 +338,12 @@ class DatasetImagesReader:
         self._step = int(value)
 
     def _get_img_properties(self, image: Union[str, NamedBytesIO]) -> Dict[str, Any]:
-        img = Image.open(image, mode='r')
+        with Image.open(image, mode='r') as img:
+            return self._get_opened_img_properties(image, img)
+
+    def _get_opened_img_properties(
+        self, image: Union[str, NamedBytesIO], img: Image.Image
+    ) -> Dict[str, Any]:
         if self._data_dir:
             img_name = os.path.relpath(image, self._data_dir)
         else:
@@ -222,17 +368,46 @@ class DatasetImagesReader:
         if self._use_image_hash:
             image_properties['checksum'] = md5_hash(img)
 
+        if self._use_file_hash:
+            image_properties['file_checksum'] = md5_file_hash(image)
+
         return image_properties
 
+    def _iterate_img_properties(
+        self, sources: Iterator[Union[str, NamedBytesIO]]
+    ) -> Iterator[Dict[str, Any]]:
+        if self._workers == 1:
+            yield from map(self._get_img_properties, sources)
+            return
+
+        # Reading image headers and hashing are mostly I/O and native code
+        # that releases the GIL, so threads are enough here.
+        # The results are returned in the source order, a limited number of images
+        # is processed at once, so that the sources can be downloaded on the fly.
+        executor = ThreadPoolExecutor(max_workers=self._workers)
+        try:
+            futures: Deque[Future] = deque()
+            for image in sources:
+                if 2 * self._workers <= len(futures):
+                    yield futures.popleft().result()
+
+                futures.append(executor.submit(self._get_img_properties, image))
+
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def __iter__(self):
         sources = self._sources if self._is_generator_used else islice(self._sources, self.start, self.stop + 1, self.step)
+        image_properties = self._iterate_img_properties(sources)
 
-        for idx in range(self.stop + 1):
-            if idx in range(self.start, self.stop + 1, self.step):
-                image = next(sources)
-                yield self._get_img_properties(image)
-            else:
-                yield dict()
+        with closing(image_properties):
+            for idx in range(self.stop + 1):
+                if idx in range(self.start, self.stop + 1, self.step):
+                    yield next(image_properties)
+                else:
+                    yield dict()
 
     @property
     def range_(self):
@@ -303,55 +478,185 @@ class _Manifest:
 # Needed for faster iteration over the manifest file, will be generated to work inside CVAT
 # and will not be generated when manually creating a manifest
 class _Index:
-    FILE_NAME = 'index.json'
+    """
+    The offsets of the manifest items in the manifest file.
+    The index is stored as a header and a packed array of uint64 numbers,
+    so it can be memory-mapped.
+
+    The header contains the index generation, which is incremented on incremental
+    index updates, and the information required to check that the indexed part
+    of the manifest is not changed.
+
+    The check is cheap, so it is limited: the indexed part is considered unchanged
+    if the manifest is not shorter than it, and its last item is the same.
+    Changes of the previous items are not detected if the offset of the last item
+    stays the same. Such manifest changes must be done with the manifest manager methods,
+    which update the index, or the index must be recreated.
+    """
+
+    FILE_NAME = 'index.bin'
+    LEGACY_FILE_NAME = 'index.json'
+    _TYPECODE = 'Q' # uint64
+    _FORMAT_VERSION = 1
+
+    # format version, generation, indexed manifest size, checksum of the last indexed item
+    _HEADER = struct.Struct('=4Q')
 
     def __init__(self, path):
         assert path and os.path.isdir(path), 'No index directory path'
         self._path = os.path.join(path, self.FILE_NAME)
-        self._index = {}
+        self._legacy_path = os.path.join(path, self.LEGACY_FILE_NAME)
+        self._index: Sequence[int] = array(self._TYPECODE)
+        self._generation = 0
+        self._manifest_size = 0 # 0 means the indexed manifest state is unknown
+        self._tail_checksum = 0
 
     @property
     def path(self):
         return self._path
 
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path) or os.path.exists(self._legacy_path)
+
+    def is_legacy(self) -> bool:
+        "Checks if the index is only available in the legacy format"
+        return not os.path.exists(self._path) and os.path.exists(self._legacy_path)
+
     def dump(self):
-        with open(self._path, 'w') as index_file:
-            json.dump(self._index, index_file,  separators=(',', ':'))
+        # The index file can be mapped in other processes, so it is replaced instead of rewriting
+        with tempfile.NamedTemporaryFile(
+            'wb', dir=os.path.dirname(self._path), suffix='.tmp', delete=False
+        ) as index_file:
+            index_file.write(self._HEADER.pack(
+                self._FORMAT_VERSION, self._generation, self._manifest_size, self._tail_checksum
+            ))
+            index_file.write(self._index.tobytes())
+
+        os.replace(index_file.name, self._path)
 
     def load(self):
-        with open(self._path, 'r') as index_file:
-            self._index = json.load(index_file,
+        if self.is_legacy():
+            # The legacy index is converted in memory, the caller decides if it must be saved
+            self._load_legacy()
+            return
+
+        with open(self._path, 'rb') as index_file:
+            if os.fstat(index_file.fileno()).st_size < self._HEADER.size:
+                raise InvalidManifestError(f"Invalid index file '{self._path}'")
+
+            index_data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            format_version, self._generation, self._manifest_size, self._tail_checksum
+        ) = self._HEADER.unpack_from(index_data)
+
+        try:
+            if format_version != self._FORMAT_VERSION:
+                raise TypeError(f"Unknown index format version {format_version}")
+
+            self._index = memoryview(index_data)[self._HEADER.size:].cast(self._TYPECODE)
+        except TypeError as e:
+            raise InvalidManifestError(f"Invalid index file '{self._path}'") from e
+
+    def _load_legacy(self):
+        with open(self._legacy_path, 'r') as index_file:
+            legacy_index = json.load(index_file,
                 object_hook=lambda d: {int(k): v for k, v in d.items()})
 
+        self._index = array(self._TYPECODE, (legacy_index[i] for i in range(len(legacy_index))))
+        self._generation = 0
+        self._manifest_size = 0
+        self._tail_checksum = 0
+
     def remove(self):
-        os.remove(self._path)
+        for path in (self._path, self._legacy_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def remove_legacy(self):
+        try:
+            os.remove(self._legacy_path)
+        except FileNotFoundError:
+            pass # converted concurrently
+
+    def _read_tail_checksum(self, manifest_file: BinaryIO, manifest_size: int) -> int:
+        if not self._index:
+            return 0
+
+        manifest_file.seek(self._index[-1])
+        return zlib.crc32(manifest_file.read(manifest_size - self._index[-1]))
+
+    def _index_lines(self, manifest_file: BinaryIO, index: array):
+        position = manifest_file.tell()
+        for line in manifest_file:
+            if line.strip():
+                index.append(position)
+            position += len(line)
+
+        self._index = index
+        self._manifest_size = position
+        self._tail_checksum = self._read_tail_checksum(manifest_file, position)
 
     def create(self, manifest, *, skip):
         assert os.path.exists(manifest), 'A manifest file not exists, index cannot be created'
-        with open(manifest, 'r+') as manifest_file:
+        with open(manifest, 'rb') as manifest_file:
             while skip:
                 manifest_file.readline()
                 skip -= 1
-            image_number = 0
-            position = manifest_file.tell()
-            line = manifest_file.readline()
-            while line:
-                if line.strip():
-                    self._index[image_number] = position
-                    image_number += 1
-                    position = manifest_file.tell()
-                line = manifest_file.readline()
+
+            self._index_lines(manifest_file, array(self._TYPECODE))
+
+        self._generation = 0
 
     def partial_update(self, manifest, number):
+        """
+        Updates the offsets of the items starting from the specified one.
+        The item number can be equal to the index length to index the appended items.
+        """
+
         assert os.path.exists(manifest), 'A manifest file not exists, index cannot be updated'
-        with open(manifest, 'r+') as manifest_file:
-            manifest_file.seek(self._index[number])
-            line = manifest_file.readline()
-            while line:
-                if line.strip():
-                    self._index[number] = manifest_file.tell()
-                    number += 1
-                line = manifest_file.readline()
+        assert 0 <= number <= len(self) and self._index, 'Invalid index number: {}'.format(number)
+
+        index = array(self._TYPECODE)
+        index.frombytes(self._index[:number].tobytes())
+
+        with open(manifest, 'rb') as manifest_file:
+            if number < len(self):
+                manifest_file.seek(self._index[number])
+            else:
+                manifest_file.seek(self._index[number - 1])
+                manifest_file.readline()
+
+            self._index_lines(manifest_file, index)
+
+        self._generation += 1
+
+    def extend(self, manifest) -> bool:
+        """
+        Indexes the items appended to the manifest after the index was updated.
+        Returns False if the indexed part of the manifest was changed,
+        and the index has to be recreated. See the class description for the check limitations.
+        """
+
+        if not self._index or not self._manifest_size:
+            return False
+
+        with open(manifest, 'rb') as manifest_file:
+            manifest_size = manifest_file.seek(0, os.SEEK_END)
+            if (
+                manifest_size < self._manifest_size or
+                self._read_tail_checksum(manifest_file, self._manifest_size) != self._tail_checksum
+            ):
+                return False
+
+        if manifest_size != self._manifest_size:
+            self.partial_update(manifest, len(self))
+
+        return True
 
     def __getitem__(self, number):
         if not 0 <= number < len(self):
@@ -359,6 +664,9 @@ class _Index:
 
         return self._index[number]
 
+    def __iter__(self):
+        return iter(self._index)
+
     def __len__(self):
         return len(self._index)
 
@@ -379,51 +687,147 @@ class _ManifestManager(ABC):
                     f"'{item}' is required, but not found"
                 )
 
+    # The number of manifest lines read from the file at once
+    _READ_BATCH_SIZE = 1000
+
     def __init__(self, path, create_index, upload_dir=None):
         self._manifest = _Manifest(path, upload_dir)
         self._index = _Index(os.path.dirname(self._manifest.path))
         self._reader = None
         self._create_index = create_index
+        self._manifest_file: Optional[BinaryIO] = None
+        self._manifest_file_lock = threading.Lock()
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def close(self):
+        "Closes the manifest file handle, which is reused for reading the manifest items"
+        manifest_file = getattr(self, '_manifest_file', None)
+        if manifest_file:
+            manifest_file.close()
+            self._manifest_file = None
 
     @property
     def reader(self):
         return self._reader
 
+    def _read_manifest_bytes(self, start: int, stop: Optional[int]) -> bytes:
+        with self._manifest_file_lock:
+            if not self._manifest_file:
+                self._manifest_file = open(self._manifest.path, 'rb', buffering=0)
+
+            self._manifest_file.seek(start)
+            return self._manifest_file.readall() if stop is None else \
+                self._manifest_file.read(stop - start)
+
+    def _read_lines(self, numbers: range) -> Iterator[bytes]:
+        "Reads the manifest item lines. Sequential lines are read in batches."
+
+        if numbers.step != 1:
+            for number in numbers:
+                yield from self._read_lines(range(number, number + 1))
+            return
+
+        for batch_start in range(numbers.start, numbers.stop, self._READ_BATCH_SIZE):
+            batch_stop = min(batch_start + self._READ_BATCH_SIZE, numbers.stop)
+
+            start_offset = self._index[batch_start]
+            stop_offset = self._index[batch_stop] if batch_stop < len(self._index) else None
+            data = self._read_manifest_bytes(start_offset, stop_offset)
+
+            for number in range(batch_start, batch_stop):
+                line_start = self._index[number] - start_offset
+                line_end = data.find(b'\n', line_start)
+                yield data[line_start:line_end] if line_end != -1 else data[line_start:]
+
+    def _parse_item(self, line: bytes) -> 'ImageProperties':
+        parsed_properties = ImageProperties(json.loads(line))
+        self._json_item_is_valid(**parsed_properties)
+        return parsed_properties
+
     def _parse_line(self, line):
         """ Getting a random line from the manifest file """
-        with open(self._manifest.path, 'r') as manifest_file:
-            if isinstance(line, str):
-                assert line in self.BASE_INFORMATION.keys(), \
-                    'An attempt to get non-existent information from the manifest'
+        if isinstance(line, str):
+            assert line in self.BASE_INFORMATION.keys(), \
+                'An attempt to get non-existent information from the manifest'
+            with open(self._manifest.path, 'r') as manifest_file:
                 for _ in range(self.BASE_INFORMATION[line]):
                     fline = manifest_file.readline()
-                return json.loads(fline)[line]
-            else:
-                assert self._index, 'No prepared index'
-                offset = self._index[line]
-                manifest_file.seek(offset)
-                properties = manifest_file.readline()
-                parsed_properties = ImageProperties(json.loads(properties))
-                self._json_item_is_valid(**parsed_properties)
-                return parsed_properties
+            return json.loads(fline)[line]
+        else:
+            assert self._index, 'No prepared index'
+            return self._parse_item(next(self._read_lines(range(line, line + 1))))
+
+    def _load_index(self):
+        is_legacy = self._index.is_legacy()
+        self._index.load()
+
+        # The manifest directory can be read-only, e.g. in the share directory,
+        # so the legacy index is only converted on disk when the index can be created
+        if is_legacy and self._create_index:
+            self._index.dump()
+            self._index.remove_legacy()
 
     def init_index(self):
-        if os.path.exists(self._index.path):
-            self._index.load()
-        else:
-            self._index.create(self._manifest.path, skip=self._manifest.get_header_lines_count())
-            if self._create_index:
-                self._index.dump()
+        if self._index.exists():
+            try:
+                self._load_index()
+                return
+            except InvalidManifestError:
+                pass # the index will be recreated
+
+        self._index.create(self._manifest.path, skip=self._manifest.get_header_lines_count())
+        if self._create_index:
+            self._index.dump()
 
     def reset_index(self):
-        if self._create_index and os.path.exists(self._index.path):
+        if self._create_index and self._index.exists():
             self._index.remove()
 
     def set_index(self):
+        self.close() # the manifest file could be replaced
         self.reset_index()
         self.init_index()
 
+    def update_index(self):
+        """
+        Updates the index after the manifest file is changed.
+        If the new items were only appended to the manifest, only these items are indexed.
+        """
+
+        self.close() # the manifest file could be replaced
+
+        if self._index.exists():
+            try:
+                self._load_index()
+            except InvalidManifestError:
+                pass # the index will be recreated
+
+        generation = self._index.generation
+        if self._index.extend(self._manifest.path):
+            if generation != self._index.generation:
+                self._dump_index()
+        else:
+            self.set_index()
+
+    def _dump_index(self):
+        if self._create_index:
+            self._index.dump()
+
+    @property
+    def generation(self) -> int:
+        "The number of incremental updates since the manifest was created"
+        return self._index.generation
+
     def remove(self):
+        self.close()
         self.reset_index()
         if os.path.exists(self.manifest.path):
             os.remove(self.manifest.path)
@@ -437,16 +841,10 @@ class _ManifestManager(ABC):
         ...
 
     def __iter__(self):
-        self.set_index()
+        self.update_index()
 
-        with open(self._manifest.path, 'r') as manifest_file:
-            manifest_file.seek(self._index[0])
-            for idx, line_start in enumerate(self._index):
-                manifest_file.seek(line_start)
-                line = manifest_file.readline()
-                item = ImageProperties(json.loads(line))
-                self._json_item_is_valid(**item)
-                yield (idx, item)
+        for idx, line in enumerate(self._read_lines(range(len(self)))):
+            yield (idx, self._parse_item(line))
 
     @property
     def manifest(self):
@@ -457,12 +855,16 @@ class _ManifestManager(ABC):
 
     def is_empty(self) -> bool:
         if self._index.is_empty():
-            self._index.load()
+            self._load_index()
         return self._index.is_empty()
 
     def __getitem__(self, item):
         if isinstance(item, slice):
-            return [self._parse_line(i) for i in range(item.start or 0, item.stop or len(self), item.step or 1)]
+            item = range(len(self))[item]
+
+        if isinstance(item, range):
+            return [self._parse_item(line) for line in self._read_lines(item)]
+
         return self._parse_line(item)
 
     @property
@@ -489,11 +891,16 @@ class VideoManifestManager(_ManifestManager):
         setattr(self._manifest, 'TYPE', 'video')
         self.BASE_INFORMATION['properties'] = 3
 
-    def link(self, media_file, upload_dir=None, chunk_size=36, force=False, **kwargs):
+    def link(self, media_file, upload_dir=None, chunk_size=36, force=False,
+        fast=False, seek_validation_step=1, workers=1, **kwargs
+    ):
         self._reader = VideoStreamReader(
             os.path.join(upload_dir, media_file) if upload_dir else media_file,
             chunk_size,
-            force)
+            force,
+            fast=fast,
+            seek_validation_step=seek_validation_step,
+            workers=workers)
 
     def _write_base_information(self, file):
         base_info = {
@@ -631,8 +1038,52 @@ class ImageManifestManager(_ManifestManager):
 
         self.set_index()
 
+    def append(self, content=None, _tqdm=None):
+        """
+        Appends new items to the existing manifest file.
+        Only the new items are indexed, the existing part of the manifest is not rewritten.
+        """
+
+        self.update_index()
+
+        with open(self._manifest.path, 'rb') as manifest_file:
+            manifest_file.seek(-1, os.SEEK_END)
+            has_trailing_line_break = manifest_file.read(1) == b'\n'
+
+        with open(self._manifest.path, 'a') as manifest_file:
+            if not has_trailing_line_break:
+                manifest_file.write('\n')
+
+            obj = content if content else self._reader
+            self._write_core_part(manifest_file, obj, _tqdm)
+
+        if self._index.is_empty():
+            self.set_index()
+        else:
+            self._index.partial_update(self._manifest.path, len(self._index))
+            self._dump_index()
+
     def partial_update(self, number, properties):
-        pass
+        """
+        Replaces the manifest item. Only the following items are rewritten and reindexed.
+        """
+
+        self.update_index()
+
+        json_line = json.dumps(properties, separators=(',', ':'))
+        offset = self._index[number]
+        with open(self._manifest.path, 'r+b') as manifest_file:
+            manifest_file.seek(offset)
+            manifest_file.readline()
+            tail = manifest_file.read()
+
+            manifest_file.seek(offset)
+            manifest_file.write(f"{json_line}\n".encode())
+            manifest_file.write(tail)
+            manifest_file.truncate()
+
+        self._index.partial_update(self._manifest.path, number)
+        self._dump_index()
 
     @property
     def data(self):
@@ -651,7 +1102,7 @@ class ImageManifestManager(_ManifestManager):
                     'width': image['width'],
                     'height': image['height'],
                 }
-                for optional_field in {'meta', 'checksum'}:
+                for optional_field in {'meta', 'checksum', 'file_checksum'}:
                     value = image.get(optional_field)
                     if value:
                         properties[optional_field] =  value
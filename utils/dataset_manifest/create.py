@@ -24,6 +24,19 @@ def get_args():
         default=os.getcwd())
     parser.add_argument('--sorting', choices=[v[0] for v in SortingMethod.choices()],
         type=str, default=SortingMethod.LEXICOGRAPHICAL.value)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+        help='The number of threads used for reading images or the number of processes '
+             'used for validating video key frames in the fast mode (default: the number of CPUs)')
+    parser.add_argument('--file-hash', action='store_true',
+        help='Use this flag to compute image checksums from the file data '
+             'instead of the decoded pixels, which is much faster')
+    parser.add_argument('--fast', action='store_true',
+        help='Use this flag to read the video only once, compute key frame checksums '
+             'from the encoded data and validate the key frames in parallel')
+    parser.add_argument('--seek-validation-step', type=int, default=1,
+        help='Validate only each N-th video key frame in the fast mode (default: 1). '
+             'Warning: with N > 1, the manifest can include key frames that cannot be seeked to, '
+             'which can result in wrong frames being returned for the video')
     parser.add_argument('source', type=str, help='Source paths')
     return parser.parse_args()
 
@@ -71,7 +84,8 @@ def main():
             assert len(sources), 'A images was not found'
             manifest = ImageManifestManager(manifest_path=manifest_directory)
             manifest.link(sources=sources, meta=meta, sorting_method=args.sorting,
-                    use_image_hash=True, data_dir=data_dir)
+                    use_image_hash=not args.file_hash, use_file_hash=args.file_hash,
+                    data_dir=data_dir, workers=args.workers)
             manifest.create(_tqdm=tqdm)
         except Exception as ex:
             sys.exit(str(ex))
@@ -79,7 +93,8 @@ def main():
         try:
             assert is_video(source), 'You can specify a video path or a directory/pattern with images'
             manifest = VideoManifestManager(manifest_path=manifest_directory)
-            manifest.link(media_file=source, force=args.force)
+            manifest.link(media_file=source, force=args.force, fast=args.fast,
+                seek_validation_step=args.seek_validation_step, workers=args.workers)
             try:
                 manifest.create(_tqdm=tqdm)
             except AssertionError as ex:
@@ -7,7 +7,7 @@ import re
 import hashlib
 import mimetypes
 import cv2 as cv
-from av import VideoFrame
+from av import Packet, VideoFrame
 from enum import Enum
 from natsort import os_sorted
 from random import shuffle
@@ -26,10 +26,22 @@ def rotate_image(image, angle):
     return matrix
 
 def md5_hash(frame):
+    if isinstance(frame, Packet):
+        return hashlib.md5(bytes(frame)).hexdigest() # nosec
     if isinstance(frame, VideoFrame):
         frame = frame.to_image()
     return hashlib.md5(frame.tobytes()).hexdigest() # nosec
 
+def md5_file_hash(source, chunk_size=1024 * 1024):
+    if not isinstance(source, str):
+        return hashlib.md5(source.getbuffer()).hexdigest() # nosec
+
+    file_hash = hashlib.md5() # nosec
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
 def _define_data_type(media):
     return mimetypes.guess_type(media)[0]
 